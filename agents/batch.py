@@ -0,0 +1,248 @@
+# batch.py
+
+"""
+Run many development workflows from a JSONL manifest.
+
+Each manifest line is an object with "task", "workspace" and optionally "id"
+and "config" (overrides for the workflow configuration):
+
+    {"id": "ticket-1", "task": "Add a /health endpoint", "workspace": "./repos/api", "config": {"max_retries": 1}}
+
+Sessions run concurrently on one event loop, bounded by --concurrency. They
+share one chat model per (model, temperature), the LLM response cache and
+one rate limiter, and checkpoint to one shared SQLite connection. One result line per finished session is appended to the
+output file as soon as it completes. Rerunning with the same output skips
+entries that already have a result, so a crashed batch resumes where it stopped.
+
+With --retry-failed, failed entries run again. A failed session that still has
+checkpoints (one that raised rather than finishing) is resumed from its last
+checkpoint instead of starting over. If the resumed session fails again, the
+failure is final: its checkpoints are pruned, and a later retry starts a new session.
+"""
+
+import sys
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+import argparse
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import config as app_config
+from state import WorkflowConfig
+from llm.rate_limit import RateLimiter
+from main import (
+    arun_development_workflow, aresume_development_workflow, aopen_checkpointer, adrop_session, session_thread
+)
+
+
+# Config keys an entry cannot override: sessions share the batch's checkpointer and
+# rate limiter, and the search engines read the process-wide SEARCH_CONFIG
+BATCH_WIDE_KEYS = ("checkpoints_enabled", "checkpoint_path", "search_config",
+                   "llm_max_concurrency", "llm_requests_per_minute")
+
+
+class ManifestError(ValueError):
+    """Raised for a manifest line that is not a valid batch entry"""
+
+
+def entry_id(entry: Dict[str, Any]) -> str:
+    """The entry's "id", else a stable hash of its task and workspace"""
+    if entry.get("id") is not None:
+        return str(entry["id"])
+    return hashlib.sha1(f"{entry['task']}\0{entry['workspace']}".encode('utf-8')).hexdigest()[:12]
+
+
+def read_manifest(path: Path) -> List[Dict[str, Any]]:
+    entries = []
+    seen = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ManifestError(f"{path}:{line_no}: invalid JSON ({e.msg})")
+            if not isinstance(entry, dict) or not entry.get("task") or not entry.get("workspace"):
+                raise ManifestError(f"{path}:{line_no}: an entry needs \"task\" and \"workspace\"")
+            if not isinstance(entry.get("config", {}), dict):
+                raise ManifestError(f"{path}:{line_no}: \"config\" must be an object")
+            batch_wide = [key for key in BATCH_WIDE_KEYS if key in entry.get("config", {})]
+            if batch_wide:
+                raise ManifestError(f"{path}:{line_no}: config key(s) {', '.join(batch_wide)} apply to the whole batch and cannot be set per entry")
+            entry["id"] = entry_id(entry)
+            if entry["id"] in seen:
+                raise ManifestError(f"{path}:{line_no}: duplicate id {entry['id']}")
+            seen.add(entry["id"])
+            entries.append(entry)
+    return entries
+
+
+def finished_ids(output_path: Path, retry_failed: bool) -> Tuple[Set[str], Dict[str, Optional[str]]]:
+    """
+    Ids with a result in the output file, and the session id of each failed entry
+    to retry. A line cut off by a crash is ignored, and a later line for an id wins.
+    """
+    done = set()
+    failed_sessions: Dict[str, Optional[str]] = {}
+    if not output_path.exists():
+        return done, failed_sessions
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            result_id = str(result.get("id"))
+            if not retry_failed or result.get("success"):
+                done.add(result_id)
+            else:
+                failed_sessions[result_id] = result.get("session_id")
+    return done, failed_sessions
+
+
+def _ends_mid_line(path: Path) -> bool:
+    with open(path, 'rb') as f:
+        f.seek(0, 2)
+        if f.tell() == 0:
+            return False
+        f.seek(-1, 2)
+        return f.read(1) != b"\n"
+
+
+def session_config(entry: Dict[str, Any], base_overrides: Dict[str, Any]) -> WorkflowConfig:
+    config = app_config.get_workflow_config(entry["workspace"])
+    for key, value in {**base_overrides, **entry.get("config", {})}.items():
+        if key not in WorkflowConfig.__annotations__:
+            print(f"[DEBUG] Ignoring unknown config key '{key}' for entry {entry['id']}")
+            continue
+        config[key] = value
+    return config
+
+
+class BatchRunner:
+    """Runs manifest entries on one event loop with shared LLM clients and a shared rate limiter"""
+
+    def __init__(self, output_path: Path, concurrency: int, base_overrides: Optional[Dict[str, Any]] = None,
+                 llm: Optional[Any] = None):
+        """`llm`, when given, serves every session instead of the models built from their configs"""
+        self.output_path = output_path
+        self.concurrency = max(concurrency, 1)
+        self.base_overrides = base_overrides or {}
+        # One limiter for the whole batch, sized from the batch-wide config like the checkpointer
+        batch_config = self._batch_config()
+        self.rate_limiter = RateLimiter(batch_config["llm_max_concurrency"], batch_config["llm_requests_per_minute"])
+        self.llm = llm
+        self._llms: Dict[Tuple[str, float], Any] = {}
+
+    def _batch_config(self) -> WorkflowConfig:
+        return {**app_config.get_workflow_config(), **self.base_overrides}
+
+    def _llm(self, config: WorkflowConfig) -> Any:
+        """One chat model per (model, temperature), shared by every session using it"""
+        if self.llm is not None:
+            return self.llm
+        key = (config["model_name"], config["temperature"])
+        if key not in self._llms:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            self._llms[key] = ChatGoogleGenerativeAI(model=key[0], temperature=key[1])
+        return self._llms[key]
+
+    async def _resumable(self, checkpointer, session_id: Optional[str]) -> bool:
+        """Whether `session_id` left checkpoints behind; sessions that finished dropped theirs"""
+        if checkpointer is None or session_id is None:
+            return False
+        return await checkpointer.aget_tuple(session_thread(session_id)) is not None
+
+    async def _run_entry(self, entry: Dict[str, Any], slots: asyncio.Semaphore, out, checkpointer,
+                         failed_session: Optional[str] = None) -> bool:
+        async with slots:
+            start = time.perf_counter()
+            resuming = await self._resumable(checkpointer, failed_session)
+            session_id = failed_session if resuming else str(uuid.uuid4())
+            # The session id is recorded up front so a session that raises can still be resumed
+            record: Dict[str, Any] = {"id": entry["id"], "task": entry["task"], "workspace": entry["workspace"],
+                                      "session_id": session_id}
+            try:
+                config = session_config(entry, self.base_overrides)
+                if resuming:
+                    print(f"[BATCH] {entry['id']}: resuming failed session {session_id}")
+                    result = await aresume_development_workflow(
+                        session_id, llm=self._llm(config), rate_limiter=self.rate_limiter, checkpointer=checkpointer
+                    )
+                else:
+                    result = await arun_development_workflow(
+                        entry["task"], entry["workspace"], config, llm=self._llm(config), rate_limiter=self.rate_limiter,
+                        checkpointer=checkpointer, session_id=session_id
+                    )
+                developer_state = result.get("developer_state", {})
+                record.update({
+                    "success": bool(result.get("success")),
+                    "tasks_completed": len(result.get("completed_tasks", [])),
+                    "tasks_total": len(developer_state.get("atomic_tasks", [])),
+                    "files_created": developer_state.get("files_created", []),
+                    "files_modified": developer_state.get("files_modified", []),
+                    "errors": developer_state.get("errors_encountered", []),
+                })
+            except Exception as e:
+                traceback.print_exc()
+                record.update({"success": False, "errors": [f"{type(e).__name__}: {e}"]})
+                if resuming:
+                    # A retry that fails again is final; its checkpoints would only pile up
+                    await adrop_session(checkpointer, session_id)
+            record["seconds"] = round(time.perf_counter() - start, 3)
+
+            # One complete line per session, flushed at once, so a crash loses at most the sessions in flight
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            print(f"[BATCH] {entry['id']}: {'SUCCESS' if record['success'] else 'FAILED'} in {record['seconds']}s")
+            return record["success"]
+
+    async def run(self, entries: List[Dict[str, Any]],
+                  failed_sessions: Optional[Dict[str, Optional[str]]] = None) -> Tuple[int, int]:
+        """Run the entries and return (succeeded, failed); entries in `failed_sessions` resume that session"""
+        failed_sessions = failed_sessions or {}
+        slots = asyncio.Semaphore(self.concurrency)
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        async with aopen_checkpointer(self._batch_config()) as checkpointer:
+            with open(self.output_path, 'a', encoding='utf-8') as out:
+                if _ends_mid_line(self.output_path):
+                    out.write("\n")  # End a line cut off by a crash so the next result starts cleanly
+                outcomes = await asyncio.gather(*(
+                    self._run_entry(entry, slots, out, checkpointer, failed_sessions.get(entry["id"])) for entry in entries
+                ))
+        succeeded = sum(1 for outcome in outcomes if outcome)
+        return succeeded, len(outcomes) - succeeded
+
+
+if __name__ == "__main__":
+    if not app_config.GOOGLE_API_KEY:
+        sys.exit("Error: GOOGLE_API_KEY not set. Please create a .env file and add GOOGLE_API_KEY='your-key-here'")
+
+    parser = argparse.ArgumentParser(description="Run AI development workflows from a JSONL manifest")
+    parser.add_argument("manifest", help="JSONL file with one {\"task\", \"workspace\", \"id\"?, \"config\"?} object per line")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSONL file results are appended to (default: batch_results.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Sessions running at the same time (default: 4)")
+    parser.add_argument("--retry-failed", action="store_true", help="Rerun entries whose recorded result failed")
+    parser.add_argument("--no-llm-cache", action="store_true", help="Bypass the LLM response cache for this run")
+    args = parser.parse_args()
+
+    try:
+        entries = read_manifest(Path(args.manifest))
+    except (OSError, ManifestError) as e:
+        sys.exit(f"Error: {e}")
+
+    output_path = Path(args.output)
+    done, failed_sessions = finished_ids(output_path, args.retry_failed)
+    pending = [entry for entry in entries if entry["id"] not in done]
+    print(f"Batch: {len(entries)} entries, {len(entries) - len(pending)} already finished, {len(pending)} to run")
+
+    overrides = {"llm_cache_enabled": False} if args.no_llm_cache else {}
+    runner = BatchRunner(output_path, args.concurrency, overrides)
+    succeeded, failed = asyncio.run(runner.run(pending, failed_sessions))
+    print(f"Batch complete: {succeeded} succeeded, {failed} failed. Results in {output_path}")
+    sys.exit(0 if failed == 0 else 1)
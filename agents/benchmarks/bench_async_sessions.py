@@ -0,0 +1,133 @@
+# benchmarks/bench_async_sessions.py
+
+"""
+Throughput of N full workflow sessions against a fixed-latency fake LLM.
+
+"sync" runs the sessions one after another through run_development_workflow,
+which is all one process could do with blocking nodes. "async" drives every
+session concurrently on a single event loop through arun_development_workflow.
+Each session plans two tasks and writes three files, so it makes four LLM
+calls. Workflow console output is suppressed while timing, and the LLM cache
+and checkpoints are off so only the LLM latency is measured.
+
+Usage:
+    python benchmarks/bench_async_sessions.py [--sessions 1 10 50] [--latency 0.3]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENTS_DIR))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+PLAN = json.dumps([
+    {"id": "1", "description": "Create index.html and style.css for a landing page", "type": "create_file",
+     "target_files": ["index.html", "style.css"], "prerequisites": []},
+    {"id": "2", "description": "Create app.py serving the page", "type": "create_file",
+     "target_files": ["app.py"], "prerequisites": ["1"]},
+])
+
+
+class FakeLLM:
+    """Answers planner and developer prompts after `latency` seconds, blocking or awaiting"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def _answer(self, messages) -> str:
+        if "software architect" in messages[0].content:
+            return PLAN
+        return "<!-- generated -->\n"
+
+    def invoke(self, messages, config=None, **kwargs):
+        time.sleep(self.latency)
+        return AIMessage(content=self._answer(messages))
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return AIMessage(content=self._answer(messages))
+
+    def stream(self, messages, config=None, **kwargs):
+        yield AIMessageChunk(content=self.invoke(messages).content)
+
+    async def astream(self, messages, config=None, **kwargs):
+        yield AIMessageChunk(content=(await self.ainvoke(messages)).content)
+
+
+def make_config(workspace: Path):
+    import config as app_config
+
+    config = app_config.get_workflow_config(str(workspace))
+    config["llm_cache_enabled"] = False
+    config["validation_workers"] = 0
+    config["checkpoints_enabled"] = False
+    return config
+
+
+def check(results) -> None:
+    for result in results:
+        assert result["success"], result.get("final_summary")
+
+
+def run_sync(root: Path, sessions: int, llm: FakeLLM) -> float:
+    from main import run_development_workflow
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = [run_development_workflow("Build a landing page", str(root / f"s{i}"), make_config(root / f"s{i}"), llm=llm)
+                   for i in range(sessions)]
+    seconds = time.perf_counter() - start
+    check(results)
+    return seconds
+
+
+def run_async(root: Path, sessions: int, llm: FakeLLM) -> float:
+    from main import arun_development_workflow
+
+    async def run_all():
+        return await asyncio.gather(*(
+            arun_development_workflow("Build a landing page", str(root / f"a{i}"), make_config(root / f"a{i}"), llm=llm)
+            for i in range(sessions)
+        ))
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = asyncio.run(run_all())
+    seconds = time.perf_counter() - start
+    check(results)
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Workflow sessions per second, blocking vs one event loop")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds per LLM call")
+    args = parser.parse_args()
+
+    llm = FakeLLM(args.latency)
+    print(f"{'sessions':>8} {'sync s':>8} {'async s':>8} {'sync/s':>8} {'async/s':>8}")
+    for sessions in args.sessions:
+        root = Path(tempfile.mkdtemp(prefix="agentcode-sessions-"))
+        try:
+            sync_seconds = run_sync(root, sessions, llm)
+            async_seconds = run_async(root, sessions, llm)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+        print(f"{sessions:>8} {sync_seconds:>8.2f} {async_seconds:>8.2f} "
+              f"{sessions / sync_seconds:>8.2f} {sessions / async_seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/bench_content_search.py
+
+"""
+Cost of content search with and without the inverted index, including the cold build.
+
+    scan   - the original search: read every file, then lowercase and count each
+             file per query
+    index  - InternalSearchEngine: a cold index build, then BM25 over the postings
+
+"first search" is what the first query of a session pays: the file reads for
+the scan, the whole index build for the engine. "per query" is the average of
+the queries that follow. The index is built with each worker count given.
+
+Usage:
+    python benchmarks/bench_content_search.py [--files 1500] [--kb 24] [--workers 1 4]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENTS_DIR))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+
+from bench_index_memory import make_workspace
+
+QUERIES = ["handler value", "total items", "Service", "lorem ipsum", "missing_symbol_xyz"]
+ROUNDS = 5
+
+
+def scan(workspace: Path):
+    from search.internal_search import InternalSearchEngine
+
+    engine = InternalSearchEngine(str(workspace))
+    start = time.perf_counter()
+    contents = {}
+    for relative_path, file_path, _ in engine._iter_workspace_files():
+        content = engine._read_file_content(file_path)
+        if content:
+            contents[relative_path] = content
+    loaded = time.perf_counter() - start
+
+    def query(text: str) -> None:
+        text_lower = text.lower()
+        for content in contents.values():
+            content_lower = content.lower()
+            score = 10 if text_lower in content_lower else 0
+            for word in text_lower.split():
+                score += content_lower.count(word)
+
+    return loaded, query
+
+
+def index(workspace: Path, index_dir: Path, workers: int):
+    import config as app_config
+    from search.internal_search import InternalSearchEngine
+
+    search_config = {**app_config.SEARCH_CONFIG, "index_workers": workers, "index_dir": str(index_dir)}
+    engine = InternalSearchEngine(str(workspace), search_config)
+    start = time.perf_counter()
+    file_index = engine.index_workspace(use_cache=False)
+    built = time.perf_counter() - start
+    return built, lambda text: engine.search_by_content(text, file_index)
+
+
+def report(name: str, setup: float, query) -> None:
+    start = time.perf_counter()
+    query(QUERIES[0])
+    first = setup + time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for text in QUERIES:
+            query(text)
+    per_query = (time.perf_counter() - start) / (ROUNDS * len(QUERIES))
+    print(f"{name:>10} {setup:>10.2f} {first:>15.2f} {per_query * 1000:>13.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content search: file scan vs. inverted index")
+    parser.add_argument("--files", type=int, default=1500, help="Number of synthetic files")
+    parser.add_argument("--kb", type=int, default=24, help="Approximate size of each file in KB")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}),
+                        help="Index worker counts to try")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="agentcode-content-"))
+    workspace = root / "workspace"
+    workspace.mkdir()
+    try:
+        make_workspace(workspace, args.files, args.kb)
+        print(f"{args.files} files x ~{args.kb} KB, {len(QUERIES)} queries on {os.cpu_count()} CPU(s)")
+        print(f"{'mode':>10} {'setup s':>10} {'first search s':>15} {'per query ms':>13}")
+        report("scan", *scan(workspace))
+        for workers in args.workers:
+            report(f"index x{workers}", *index(workspace, root / f"index-{workers}", workers))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
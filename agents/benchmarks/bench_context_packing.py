@@ -0,0 +1,107 @@
+# benchmarks/bench_context_packing.py
+
+"""
+Prompt size of patch-mode modify requests with and without context packing.
+
+The workspace holds a large module with one function to edit, which calls a
+helper defined in another file. The fake LLM records the input tokens of each
+prompt and answers with a SEARCH/REPLACE block, failing loudly if the lines it
+must search for (or the helper's definition) are missing from the prompt.
+The helper is found through the search index, which the modify request
+builds on first use, so the timed edit includes that build. "Unpacked" runs
+with a budget larger than any file, which reproduces sending the whole file. Tokens are approximated as characters / 4.
+
+Usage:
+    python benchmarks/bench_context_packing.py [--lines 1000 4000 16000] [--budget 6000]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENTS_DIR))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+
+from langchain_core.messages import AIMessage
+
+OLD_LINE = "    return scale_value(value, 2)  # target"
+NEW_LINE = "    return scale_value(value, 3)  # target"
+HELPER = "def scale_value(value, factor):\n    \"\"\"Multiply value by factor.\"\"\"\n    return value * factor\n"
+
+
+def make_source(line_count: int) -> str:
+    lines = ["import math", "from helpers import scale_value", ""]
+    i = 0
+    while len(lines) < line_count:
+        lines += [f"def handler_{i}(value):", f"    \"\"\"Handle case {i}.\"\"\"", f"    return math.floor(value) + {i}", ""]
+        i += 1
+    middle = len(lines) // 2 // 4 * 4 + 3
+    lines[middle:middle + 3] = ["def target(value):", "    \"\"\"The function being edited.\"\"\"", OLD_LINE]
+    return "\n".join(lines) + "\n"
+
+
+class RecordingLLM:
+    """Fake model that checks its prompt and answers with a fixed edit"""
+
+    def __init__(self):
+        self.input_tokens = 0
+
+    def invoke(self, messages, config=None, **kwargs):
+        prompt = "".join(message.content for message in messages)
+        assert OLD_LINE in prompt, "target lines missing from the prompt"
+        assert "def scale_value" in prompt, "helper definition missing from the prompt"
+        self.input_tokens += len(prompt) / 4
+        return AIMessage(content=f"<<<<<<< SEARCH\n{OLD_LINE}\n=======\n{NEW_LINE}\n>>>>>>> REPLACE")
+
+
+def run(source: str, budget: int):
+    import config as app_config
+    from developer.developer import DeveloperAgent
+    from state import AtomicTask, TaskType
+
+    root = Path(tempfile.mkdtemp(prefix="agentcode-context-"))
+    workspace = root / "workspace"
+    app_config.SEARCH_CONFIG["index_dir"] = str(root / "index")
+    try:
+        workspace.mkdir()
+        (workspace / "module.py").write_text(source, encoding="utf-8")
+        (workspace / "helpers.py").write_text(HELPER, encoding="utf-8")
+        llm = RecordingLLM()
+        agent = DeveloperAgent(llm, modify_mode="patch", context_budget=budget)
+        task = AtomicTask(
+            id="edit", description="Make target() triple its input", type=TaskType.MODIFY_FILE,
+            target_files=["module.py"], prerequisites=[], success_criteria="", priority=1, estimated_complexity=1
+        )
+        errors = []
+        start = time.perf_counter()
+        assert agent._modify_file(task, workspace, [], errors), errors
+        seconds = time.perf_counter() - start
+        expected = source.replace(OLD_LINE, NEW_LINE)
+        assert (workspace / "module.py").read_text(encoding="utf-8") == expected, "wrong file after the edit"
+        return llm.input_tokens, seconds
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Modify prompt size with and without context packing")
+    parser.add_argument("--lines", type=int, nargs="+", default=[1000, 4000, 16000], help="File sizes in lines")
+    parser.add_argument("--budget", type=int, default=6000, help="Context budget in estimated tokens")
+    args = parser.parse_args()
+
+    print(f"{'lines':>6} {'unpacked tokens':>16} {'packed tokens':>14} {'packed s':>9} {'token ratio':>12}")
+    for line_count in args.lines:
+        source = make_source(line_count)
+        unpacked_tokens, _ = run(source, budget=10 ** 9)
+        packed_tokens, packed_seconds = run(source, budget=args.budget)
+        print(f"{line_count:>6} {unpacked_tokens:>16.0f} {packed_tokens:>14.0f} {packed_seconds:>9.2f} "
+              f"{unpacked_tokens / packed_tokens:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# benchmarks/bench_html_extract.py
+
+"""
+Compare the original BeautifulSoup extraction with the streaming extractor on
+large saved HTML pages.
+
+    legacy     - read the whole file, build a BeautifulSoup tree, join all text,
+                 keep the first 5000 characters
+    streaming  - decode 16 KB chunks into an incremental HTML tokenizer that
+                 skips script/style and stops once 5000 characters are collected
+
+Fixtures are written to a temporary directory, or read from --fixtures if
+given (every *.html file in it). Outputs are checked to be identical.
+
+Usage:
+    python benchmarks/bench_html_extract.py [--sizes 0.5 5] [--fixtures DIR]
+"""
+
+import os
+import gc
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENTS_DIR))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+
+CHUNK_SIZE = 16 * 1024
+
+
+def make_fixture(path: Path, megabytes: float) -> None:
+    """Documentation-like page: inline scripts and styles around many sections"""
+    section = (
+        "<section><h2>Parameter reference</h2>\n"
+        "<script>window.dataLayer = window.dataLayer || []; function gtag(){dataLayer.push(arguments);}</script>\n"
+        "<p>The <code>timeout</code> argument bounds each request &amp; defaults to  10 seconds.</p>\n"
+        "<style>.note { color: #333; margin: 0 auto; }</style>\n"
+        "<ul><li>retries</li>\t<li>backoff</li>\n<li>pool size</li></ul></section>\n"
+    )
+    body = section * int(megabytes * 1024 * 1024 / len(section))
+    path.write_text(f"<!DOCTYPE html><html><head><title>Docs</title></head><body>{body}</body></html>",
+                    encoding="utf-8")
+
+
+def legacy(path: Path) -> str:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(path.read_bytes(), 'html.parser')
+    for script_or_style in soup(["script", "style"]):
+        script_or_style.decompose()
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)[:5000]
+
+
+def streaming(path: Path) -> str:
+    import codecs
+    from search.html_text import extract_text
+
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    def chunks():
+        with open(path, 'rb') as f:
+            while True:
+                data = f.read(CHUNK_SIZE)
+                if not data:
+                    break
+                yield decoder.decode(data)
+        yield decoder.decode(b'', final=True)
+
+    return extract_text(chunks(), 5000)
+
+
+def measure(fn, path: Path):
+    # Collect the previous run's parse tree so its teardown is not timed here
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(path)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BeautifulSoup vs streaming HTML text extraction")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[0.5, 5], help="Fixture sizes in MB")
+    parser.add_argument("--fixtures", help="Directory of saved *.html pages to use instead")
+    args = parser.parse_args()
+
+    directory = Path(args.fixtures) if args.fixtures else Path(tempfile.mkdtemp(prefix="agentcode-html-"))
+    try:
+        if not args.fixtures:
+            for size in args.sizes:
+                make_fixture(directory / f"page-{size:g}mb.html", size)
+
+        print(f"{'fixture':>18} {'legacy s':>9} {'legacy MB':>10} {'stream s':>9} {'stream MB':>10}")
+        for path in sorted(directory.glob("*.html"), key=lambda p: p.stat().st_size):
+            old_text, old_seconds, old_peak = measure(legacy, path)
+            new_text, new_seconds, new_peak = measure(streaming, path)
+            assert old_text == new_text, f"output differs for {path.name}"
+            print(f"{path.name:>18} {old_seconds:>9.3f} {old_peak:>10.1f} {new_seconds:>9.4f} {new_peak:>10.2f}")
+    finally:
+        if not args.fixtures:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
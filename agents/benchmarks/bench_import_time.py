@@ -0,0 +1,69 @@
+# benchmarks/bench_import_time.py
+
+"""
+Measure cold import time of the agent's entry points with `python -X importtime`.
+
+Each module is imported in a fresh interpreter; the report shows the total
+cumulative time and the heaviest top-level dependencies pulled in.
+
+Usage:
+    python benchmarks/bench_import_time.py [--runs 3] [--top 8] [module ...]
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Dict, Tuple
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_MODULES = ["main", "search.internal_search", "search.external_search"]
+
+
+def import_times(module: str) -> Tuple[int, Dict[str, int]]:
+    """Cumulative microseconds for `module` and for each top-level package it imports"""
+    env = {**os.environ, "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "benchmark-placeholder")}
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=AGENTS_DIR, env=env, capture_output=True, text=True, check=True
+    ).stderr
+
+    total = 0
+    packages: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        cumulative = int(cumulative)
+        stripped = name.strip()
+        # Nesting depth is encoded as two spaces per level after the first
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if stripped == module:
+            total = cumulative
+        elif depth == 1 or (depth == 0 and stripped != module):
+            top = stripped.split(".")[0]
+            packages[top] = max(packages.get(top, 0), cumulative)
+    return total, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold import time of agent modules")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per module; the best run is kept")
+    parser.add_argument("--top", type=int, default=8, help="Heaviest dependencies to list per module")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        runs = [import_times(module) for _ in range(args.runs)]
+        total, packages = min(runs, key=lambda run: run[0])
+        print(f"{module}: {total / 1e6:.3f}s (best of {args.runs})")
+        for name, micros in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+            print(f"    {name:<32} {micros / 1e6:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# benchmarks/bench_index_memory.py
+
+"""
+Compare peak RSS of a build + search cycle for three index representations:
+
+    legacy   - the original dict-of-dicts index holding every file's content,
+               searched by lowercasing each file per query
+    full     - FileRecord index with content kept in memory (compact_index=False)
+    compact  - FileRecord index with content read lazily via mmap (compact_index=True)
+
+Each mode runs in a fresh interpreter so peak RSS is not shared between them.
+
+Usage:
+    python benchmarks/bench_index_memory.py [--files 3000] [--kb 24]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import resource
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENTS_DIR))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+
+QUERIES = ["handler value", "total items", "Service", "missing_symbol_xyz"]
+
+
+def make_workspace(root: Path, file_count: int, kb_per_file: int) -> None:
+    line = "    # lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod\n"
+    filler = line * (kb_per_file * 1024 // len(line))
+    for i in range(file_count):
+        package = root / f"pkg_{i % 50}"
+        package.mkdir(exist_ok=True)
+        source = (
+            f"class Service{i}:\n"
+            f"    def handler(self, value, items):\n"
+            f"        total = value + sum(items)\n"
+            f"        return total\n\n"
+            f"def helper_{i}():\n{filler}    return {i}\n"
+        )
+        (package / f"module_{i}.py").write_text(source, encoding="utf-8")
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_legacy(workspace: Path) -> None:
+    from search.internal_search import InternalSearchEngine
+
+    engine = InternalSearchEngine(str(workspace))
+    file_index = {}
+    for relative_path, file_path, _ in engine._iter_workspace_files():
+        content = engine._read_file_content(file_path)
+        if content:
+            file_index[relative_path] = {
+                "content": content,
+                "structure": engine._extract_code_structure(content, file_path),
+            }
+
+    for query in QUERIES:
+        query_lower = query.lower()
+        results = []
+        for relative_path, file_info in file_index.items():
+            content = file_info["content"].lower()
+            score = 10 if query_lower in content else 0
+            for word in query_lower.split():
+                score += content.count(word)
+            if score:
+                results.append({"file_path": relative_path, "content_preview": file_info["content"][:500]})
+        json.dumps(results)
+
+
+def run_engine(workspace: Path, compact: bool) -> None:
+    import config as app_config
+    from search.internal_search import InternalSearchEngine
+
+    search_config = {**app_config.SEARCH_CONFIG, "compact_index": compact, "index_dir": str(workspace.parent / f"{workspace.name}-index")}
+    engine = InternalSearchEngine(str(workspace), search_config)
+    file_index = engine.index_workspace(use_cache=False)
+    for query in QUERIES:
+        json.dumps(engine.search_by_content(query, file_index))
+
+
+def child(mode: str, workspace: Path) -> None:
+    start = time.perf_counter()
+    if mode == "legacy":
+        run_legacy(workspace)
+    else:
+        run_engine(workspace, compact=(mode == "compact"))
+    print(json.dumps({"mode": mode, "seconds": time.perf_counter() - start, "peak_rss_mb": peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS of index representations")
+    parser.add_argument("--files", type=int, default=3000, help="Number of synthetic files")
+    parser.add_argument("--kb", type=int, default=24, help="Approximate size of each file in KB")
+    parser.add_argument("--child", choices=["legacy", "full", "compact"], help=argparse.SUPPRESS)
+    parser.add_argument("--workspace", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, Path(args.workspace))
+        return
+
+    workspace = Path(tempfile.mkdtemp(prefix="agentcode-bench-"))
+    try:
+        make_workspace(workspace, args.files, args.kb)
+        print(f"{args.files} files x ~{args.kb} KB, {len(QUERIES)} queries")
+        print(f"{'mode':>8} {'seconds':>9} {'peak RSS MB':>12}")
+        for mode in ["legacy", "full", "compact"]:
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode, "--workspace", str(workspace)],
+                capture_output=True, text=True, check=True, env={**os.environ, "INDEX_WORKERS": "1"}
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{result['mode']:>8} {result['seconds']:>9.2f} {result['peak_rss_mb']:>12.1f}")
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+        shutil.rmtree(workspace.parent / f"{workspace.name}-index", ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
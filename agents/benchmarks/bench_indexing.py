@@ -0,0 +1,76 @@
+# benchmarks/bench_indexing.py
+
+"""
+Measure InternalSearchEngine.index_workspace cold-build time against worker count.
+
+Usage:
+    python benchmarks/bench_indexing.py [--files 4000] [--workers 1 2 4 8]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+
+from search.internal_search import InternalSearchEngine
+import config as app_config
+
+
+def make_workspace(root: Path, file_count: int) -> None:
+    """Write a synthetic workspace of mid-sized Python modules"""
+    for i in range(file_count):
+        package = root / f"pkg_{i % 50}"
+        package.mkdir(exist_ok=True)
+        body = [f"import os\nfrom typing import List\n\n\nclass Service{i}:\n    \"\"\"Service {i}\"\"\"\n"]
+        for j in range(40):
+            body.append(
+                f"    def handler_{j}(self, value: int, items: List[int]) -> int:\n"
+                f"        total = value * {j}\n"
+                f"        for item in items:\n"
+                f"            total += item % {j + 1}\n"
+                f"        return total\n\n"
+            )
+        (package / f"module_{i}.py").write_text("".join(body), encoding="utf-8")
+
+
+def time_index(workspace: Path, workers: int) -> float:
+    search_config = {**app_config.SEARCH_CONFIG, "index_workers": workers, "index_dir": str(workspace.parent / f"{workspace.name}-index")}
+    engine = InternalSearchEngine(str(workspace), search_config)
+    start = time.perf_counter()
+    engine.index_workspace(use_cache=False)
+    return time.perf_counter() - start
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, 8, cpu_count} & set(range(1, cpu_count + 1)))
+
+    parser = argparse.ArgumentParser(description="Index build speedup vs. worker count")
+    parser.add_argument("--files", type=int, default=4000, help="Number of synthetic Python files")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers, help="Worker counts to try")
+    args = parser.parse_args()
+
+    workspace = Path(tempfile.mkdtemp(prefix="agentcode-bench-"))
+    try:
+        make_workspace(workspace, args.files)
+        print(f"Indexing {args.files} files on {cpu_count} CPU(s)")
+        print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+
+        baseline = None
+        for workers in args.workers:
+            elapsed = time_index(workspace, workers)
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>10.3f} {baseline / elapsed:>7.2f}x")
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+        shutil.rmtree(workspace.parent / f"{workspace.name}-index", ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
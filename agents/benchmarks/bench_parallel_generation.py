@@ -0,0 +1,102 @@
+# benchmarks/bench_parallel_generation.py
+
+"""
+Wall-clock time of the developer graph with a fake LLM of fixed latency.
+
+Runs the same plan with the shared rate limiter at concurrency 1, which
+reproduces the original one-request-at-a-time behaviour, and at higher
+limits. The plan mixes multi-file tasks, independent tasks and a dependency.
+
+Usage:
+    python benchmarks/bench_parallel_generation.py [--latency 0.5] [--concurrency 1 2 4 8]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENTS_DIR))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+
+from langchain_core.messages import AIMessage
+
+
+class FixedLatencyLLM:
+    """Answers every request after `latency` seconds and records peak concurrency"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages, config=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+        return AIMessage(content="<!-- generated -->\n")
+
+
+def make_plan():
+    from state import AtomicTask, TaskType
+
+    def task(task_id, files, prerequisites=()):
+        return AtomicTask(
+            id=task_id, description=f"Build {task_id}", type=TaskType.CREATE_FILE,
+            target_files=list(files), prerequisites=list(prerequisites),
+            success_criteria="", priority=1, estimated_complexity=3
+        )
+
+    return [
+        task("site", ["index.html", "style.css", "script.js"]),
+        task("docs", ["docs/intro.md", "docs/usage.md", "docs/api.md", "docs/faq.md"]),
+        task("server", ["server/app.py", "server/routes.py"], prerequisites=["site"]),
+        task("config", ["config.json"]),
+    ]
+
+
+def run(concurrency: int, latency: float):
+    from developer.developer import create_developer_service
+    from llm.rate_limit import RateLimiter
+
+    llm = FixedLatencyLLM(latency)
+    workspace = Path(tempfile.mkdtemp(prefix="agentcode-gen-"))
+    try:
+        graph = create_developer_service(llm, RateLimiter(concurrency))
+        start = time.perf_counter()
+        result = graph.invoke({
+            "atomic_tasks": make_plan(), "workspace_path": str(workspace),
+            "max_retries": 0, "max_parallel_tasks": concurrency
+        })
+        seconds = time.perf_counter() - start
+        assert all(result["task_completion_status"].values()), result.get("errors_encountered")
+        return seconds, llm.calls, llm.peak
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Developer wall-clock time with a fixed-latency fake LLM")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per LLM call")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print(f"{'concurrency':>11} {'seconds':>8} {'calls':>6} {'peak in flight':>15}")
+    for concurrency in args.concurrency:
+        seconds, calls, peak = run(concurrency, args.latency)
+        print(f"{concurrency:>11} {seconds:>8.2f} {calls:>6} {peak:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/bench_patch_modify.py
+
+"""
+Compare full-file regeneration with patch mode for small edits to large files.
+
+The fake LLM answers each modify request with the smallest correct response
+for the prompt it receives: the whole edited file for "full" mode, or one
+SEARCH/REPLACE block for "patch" mode. Its latency is a fixed overhead plus a
+per-output-token decode time, so output size drives wall-clock time as it does
+for a real model. Tokens are approximated as characters / 4.
+
+Usage:
+    python benchmarks/bench_patch_modify.py [--lines 200 1000 4000] [--tokens-per-second 500]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENTS_DIR))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+
+from langchain_core.messages import AIMessage
+
+OLD_LINE = "    return value * 2  # target"
+NEW_LINE = "    return value * 3  # target"
+
+
+def make_source(line_count: int) -> str:
+    lines = []
+    i = 0
+    while len(lines) < line_count:
+        lines += [f"def handler_{i}(value):", f"    \"\"\"Handle case {i}.\"\"\"", f"    return value + {i}", ""]
+        i += 1
+    middle = len(lines) // 2 // 4 * 4
+    lines[middle:middle + 3] = ["def target(value):", "    \"\"\"The function being edited.\"\"\"", OLD_LINE]
+    return "\n".join(lines) + "\n"
+
+
+class DecodingLLM:
+    """Fake model whose latency grows with the size of its answer"""
+
+    def __init__(self, overhead: float, tokens_per_second: float):
+        self.overhead = overhead
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = 0
+
+    def invoke(self, messages, config=None, **kwargs):
+        system, human = messages[0].content, messages[1].content
+        if "SEARCH/REPLACE" in system:
+            answer = (
+                "<<<<<<< SEARCH\ndef target(value):\n    \"\"\"The function being edited.\"\"\"\n"
+                f"{OLD_LINE}\n=======\ndef target(value):\n    \"\"\"The function being edited.\"\"\"\n"
+                f"{NEW_LINE}\n>>>>>>> REPLACE"
+            )
+        else:
+            current = human.split("```\n", 1)[1].rsplit("\n```", 1)[0]
+            answer = current.replace(OLD_LINE, NEW_LINE)
+        tokens = len(answer) / 4
+        self.output_tokens += tokens
+        time.sleep(self.overhead + tokens / self.tokens_per_second)
+        return AIMessage(content=answer)
+
+
+def run(mode: str, source: str, overhead: float, tokens_per_second: float):
+    from developer.developer import DeveloperAgent
+    from state import AtomicTask, TaskType
+
+    workspace = Path(tempfile.mkdtemp(prefix="agentcode-patch-"))
+    try:
+        (workspace / "module.py").write_text(source, encoding="utf-8")
+        llm = DecodingLLM(overhead, tokens_per_second)
+        agent = DeveloperAgent(llm, modify_mode=mode)
+        task = AtomicTask(
+            id="edit", description="Make target() triple its input", type=TaskType.MODIFY_FILE,
+            target_files=["module.py"], prerequisites=[], success_criteria="", priority=1, estimated_complexity=1
+        )
+        errors = []
+        start = time.perf_counter()
+        assert agent._modify_file(task, workspace, [], errors), errors
+        seconds = time.perf_counter() - start
+        expected = source.replace(OLD_LINE, NEW_LINE)
+        assert (workspace / "module.py").read_text(encoding="utf-8") == expected, f"{mode} produced a wrong file"
+        return llm.output_tokens, seconds
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-file vs patch-mode modification")
+    parser.add_argument("--lines", type=int, nargs="+", default=[200, 1000, 4000], help="File sizes in lines")
+    parser.add_argument("--tokens-per-second", type=float, default=500.0, help="Simulated decode speed")
+    parser.add_argument("--overhead", type=float, default=0.3, help="Simulated per-request latency in seconds")
+    args = parser.parse_args()
+
+    print(f"{'lines':>6} {'full tokens':>12} {'full s':>8} {'patch tokens':>13} {'patch s':>8} {'token ratio':>12}")
+    for line_count in args.lines:
+        source = make_source(line_count)
+        full_tokens, full_seconds = run("full", source, args.overhead, args.tokens_per_second)
+        patch_tokens, patch_seconds = run("patch", source, args.overhead, args.tokens_per_second)
+        print(f"{line_count:>6} {full_tokens:>12.0f} {full_seconds:>8.2f} {patch_tokens:>13.0f} "
+              f"{patch_seconds:>8.2f} {full_tokens / patch_tokens:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# benchmarks/bench_scrape.py
+
+"""
+Time scrape_content against a local HTTP stand-in server with injected latency.
+
+Pages are served from http://127.0.0.1:<port>/page/<n>?delay=<seconds>; the
+sequential baseline is the original one-request-at-a-time loop. Pages carry an
+ETag, so repeat runs show the HTTP cache revalidating (304) and, with a TTL,
+skipping the network altogether. A final run with one URL slower than
+SEARCH_TIMEOUT checks the overall deadline and that results come back in
+input order.
+
+Usage:
+    python benchmarks/bench_scrape.py [--urls 20] [--delay 0.5] [--hosts 2]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+import argparse
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENTS_DIR))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+CACHE_DIR = tempfile.mkdtemp(prefix="agentcode-http-cache-")
+os.environ["HTTP_CACHE_DIR"] = CACHE_DIR
+
+PAGE = (
+    "<html><head><style>body {{ color: red; }}</style><script>var x = 1;</script></head>"
+    "<body><h1>Page {n}</h1>" + "<p>lorem ipsum dolor sit amet</p>" * 200 + "</body></html>"
+)
+
+
+class LatencyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        time.sleep(float(parse_qs(parts.query).get("delay", ["0"])[0]))
+        body = PAGE.format(n=parts.path.rsplit("/", 1)[-1]).encode("utf-8")
+        etag = f'"{len(body)}-{parts.path}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LatencyHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def sequential_scrape(urls):
+    """The original implementation: a fresh session and one request at a time"""
+    import requests
+    from search.html_text import extract_text
+
+    session = requests.Session()
+    results = []
+    for url in urls:
+        response = session.get(url, timeout=10)
+        if response.status_code == 200:
+            results.append({'url': url, 'content': extract_text([response.text])})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential vs pooled scraping")
+    parser.add_argument("--urls", type=int, default=20, help="Number of URLs per run")
+    parser.add_argument("--delay", type=float, default=0.5, help="Mean injected latency in seconds")
+    parser.add_argument("--hosts", type=int, default=2, help="Distinct hosts (ports) to spread URLs over")
+    args = parser.parse_args()
+
+    servers = [start_server() for _ in range(args.hosts)]
+    rng = random.Random(0)
+    urls = [
+        f"http://127.0.0.1:{servers[i % args.hosts].server_port}/page/{i}?delay={rng.uniform(0, 2 * args.delay):.3f}"
+        for i in range(args.urls)
+    ]
+
+    import config as app_config
+    from search.external_search import scrape_content, get_http_cache
+
+    start = time.perf_counter()
+    sequential = sequential_scrape(urls)
+    sequential_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pooled = json.loads(scrape_content.invoke({"urls": urls}))
+    pooled_seconds = time.perf_counter() - start
+
+    assert [r["url"] for r in pooled] == urls, "results out of input order"
+    assert [r["content"] for r in pooled] == [r["content"] for r in sequential]
+
+    def timed_run():
+        start = time.perf_counter()
+        results = json.loads(scrape_content.invoke({"urls": urls}))
+        assert [r["content"] for r in results] == [r["content"] for r in sequential]
+        return time.perf_counter() - start
+
+    revalidated_seconds = timed_run()
+    get_http_cache().ttl = 3600
+    fresh_seconds = timed_run()
+
+    print(f"{args.urls} URLs over {args.hosts} hosts, mean latency {args.delay}s")
+    print(f"  sequential {sequential_seconds:7.2f}s")
+    print(f"  pooled     {pooled_seconds:7.2f}s  "
+          f"(workers={app_config.SEARCH_CONFIG['scrape_workers']}, "
+          f"per host={app_config.SEARCH_CONFIG['scrape_connections_per_host']})")
+    print(f"  cached 304 {revalidated_seconds:7.2f}s  (conditional revalidation, no re-parse)")
+    print(f"  cached TTL {fresh_seconds:7.2f}s  (served from disk, no network)")
+
+    # Deadline: one URL outlives the overall budget and must come back as an error in place
+    app_config.SEARCH_CONFIG["search_timeout"] = 2
+    slow = [urls[0], f"http://127.0.0.1:{servers[0].server_port}/page/slow?delay=5", urls[1]]
+    start = time.perf_counter()
+    results = json.loads(scrape_content.invoke({"urls": slow}))
+    elapsed = time.perf_counter() - start
+    assert [r["url"] for r in results] == slow and "error" in results[1], results
+    print(f"  deadline   {elapsed:7.2f}s  (search_timeout=2s, slow URL reported as error)")
+
+    for server in servers:
+        server.shutdown()
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# benchmarks/bench_state_updates.py
+
+"""
+Per-node cost and peak memory of the developer graph on a long plan.
+
+Runs a plan of N independent single-file tasks with an instant fake LLM, so
+the time measured is graph overhead: node bodies, state merging and, with
+--checkpoint, saving every step to SQLite. Node times are taken from the
+gaps between streamed updates. Peak memory is traced in a second run. With
+--checkpoint, the size of the final serialized developer state and of the checkpoint
+database are reported too.
+
+Usage:
+    python benchmarks/bench_state_updates.py [--tasks 500] [--parallel 4] [--checkpoint]
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import contextlib
+import tracemalloc
+from pathlib import Path
+from collections import defaultdict
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENTS_DIR))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+
+from langchain_core.messages import AIMessage
+
+
+class InstantLLM:
+    def invoke(self, messages, config=None, **kwargs):
+        return AIMessage(content="generated = True\n")
+
+
+def make_plan(tasks: int):
+    from state import AtomicTask, TaskType
+
+    return [
+        AtomicTask(
+            id=str(i), description=f"Create module{i}.py", type=TaskType.CREATE_FILE,
+            target_files=[f"module{i}.py"], prerequisites=[], success_criteria="", priority=1, estimated_complexity=1
+        )
+        for i in range(tasks)
+    ]
+
+
+def run(tasks: int, parallel: int, checkpoint: bool, trace: bool):
+    """(seconds per node name, total seconds, peak traced bytes, (final state bytes, database bytes)) of one run"""
+    from developer.developer import DeveloperAgent
+    from llm.rate_limit import RateLimiter
+
+    root = Path(tempfile.mkdtemp(prefix="agentcode-state-"))
+    conn = None
+    try:
+        agent = DeveloperAgent(InstantLLM(), RateLimiter(parallel))
+        config = {}
+        if checkpoint:
+            from langgraph.checkpoint.sqlite import SqliteSaver
+            from main import CHECKPOINT_SERDE
+
+            conn = sqlite3.connect(str(root / "checkpoints.sqlite"), check_same_thread=False)
+            graph = agent.create_developer_graph(SqliteSaver(conn, serde=CHECKPOINT_SERDE))
+            config = {"configurable": {"thread_id": "bench"}}
+        else:
+            graph = agent.create_developer_graph()
+
+        state = {
+            "atomic_tasks": make_plan(tasks), "workspace_path": str(root / "workspace"),
+            "max_retries": 1, "max_parallel_tasks": parallel
+        }
+        node_seconds = defaultdict(list)
+        if trace:
+            tracemalloc.start()
+        start = last = time.perf_counter()
+        stream_kwargs = {"durability": "sync"} if checkpoint else {}
+        for update in graph.stream(state, config, stream_mode="updates", **stream_kwargs):
+            now = time.perf_counter()
+            for node in update:
+                node_seconds[node].append(now - last)
+            last = now
+        total = time.perf_counter() - start
+        peak = 0
+        if trace:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        sizes = (0, 0)
+        if checkpoint:
+            final = graph.get_state(config).values
+            assert sum(final["task_completion_status"].values()) == tasks, "not every task completed"
+            conn.commit()
+            sizes = (len(CHECKPOINT_SERDE.dumps_typed(final)[1]), (root / "checkpoints.sqlite").stat().st_size)
+        return node_seconds, total, peak, sizes
+    finally:
+        if conn is not None:
+            conn.close()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Developer graph overhead per node on a long plan")
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--parallel", type=int, default=4, help="max_parallel_tasks")
+    parser.add_argument("--checkpoint", action="store_true", help="Save every step to a SQLite checkpointer")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        node_seconds, total, _, (state_bytes, db_bytes) = run(args.tasks, args.parallel, args.checkpoint, trace=False)
+        _, _, peak, _ = run(args.tasks, args.parallel, args.checkpoint, trace=True)
+
+    print(f"{args.tasks} tasks, {args.parallel} per batch, checkpoints {'on' if args.checkpoint else 'off'}")
+    print(f"{'node':>10} {'calls':>6} {'mean ms':>8} {'last ms':>8} {'total s':>8}")
+    for node, seconds in node_seconds.items():
+        print(f"{node:>10} {len(seconds):>6} {1000 * sum(seconds) / len(seconds):>8.2f} "
+              f"{1000 * seconds[-1]:>8.2f} {sum(seconds):>8.2f}")
+    print(f"total {total:.2f}s, peak traced memory {peak / 2 ** 20:.1f} MiB")
+    if args.checkpoint:
+        print(f"final developer state {state_bytes / 1024:.1f} KiB serialized, checkpoint database {db_bytes / 2 ** 20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
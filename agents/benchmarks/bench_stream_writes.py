@@ -0,0 +1,111 @@
+# benchmarks/bench_stream_writes.py
+
+"""
+Time to first byte on disk and peak memory for buffered vs streamed file writes.
+
+The fake LLM produces a fenced file of the requested size in chunks at a fixed
+decode rate, through invoke() (buffered) or stream() (streamed). A watcher
+thread polls the workspace for the first non-empty file, including the
+streaming temp file, and tracemalloc records peak memory during generation.
+Both modes must leave identical files.
+
+Usage:
+    python benchmarks/bench_stream_writes.py [--kb 256 1024 4096] [--chunks-per-second 200]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import tracemalloc
+from pathlib import Path
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENTS_DIR))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+CHUNK_CHARS = 2048
+
+
+class DecodingLLM:
+    """Fake model that emits a fenced file chunk by chunk at a fixed rate"""
+
+    def __init__(self, size: int, chunks_per_second: float):
+        body = "".join(f"line {i:08d} of the generated file\n" for i in range(size // 32 + 1))[:size]
+        text = f"```python\n{body}```\n"
+        self.chunks = [text[i:i + CHUNK_CHARS] for i in range(0, len(text), CHUNK_CHARS)]
+        self.delay = 1.0 / chunks_per_second
+
+    def stream(self, messages, config=None, **kwargs):
+        for chunk in self.chunks:
+            time.sleep(self.delay)
+            yield AIMessageChunk(content=chunk)
+
+    def invoke(self, messages, config=None, **kwargs):
+        parts = []
+        for chunk in self.stream(messages):
+            parts.append(chunk.content)
+        return AIMessage(content="".join(parts))
+
+
+def first_byte_watcher(directory: Path, start: float, result: dict, stop: threading.Event) -> None:
+    while not stop.is_set():
+        for path in directory.iterdir():
+            if path.is_file() and path.stat().st_size > 0:
+                result["first_byte"] = time.perf_counter() - start
+                return
+        time.sleep(0.002)
+
+
+def run(stream: bool, size: int, chunks_per_second: float):
+    from developer.developer import DeveloperAgent
+    from state import AtomicTask, TaskType
+
+    workspace = Path(tempfile.mkdtemp(prefix="agentcode-stream-"))
+    try:
+        agent = DeveloperAgent(DecodingLLM(size, chunks_per_second), stream_writes=stream)
+        task = AtomicTask(
+            id="big", description="Generate a large file", type=TaskType.CREATE_FILE,
+            target_files=["big.py"], prerequisites=[], success_criteria="", priority=1, estimated_complexity=1
+        )
+        watched, stop = {}, threading.Event()
+        start = time.perf_counter()
+        watcher = threading.Thread(target=first_byte_watcher, args=(workspace, start, watched, stop))
+        watcher.start()
+        tracemalloc.start()
+        errors = []
+        assert agent._create_file(task, workspace, [], errors), errors
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        total = time.perf_counter() - start
+        stop.set()
+        watcher.join()
+        content = (workspace / "big.py").read_text(encoding="utf-8")
+        return watched.get("first_byte", total), total, peak, content
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Buffered vs streamed file writes")
+    parser.add_argument("--kb", type=int, nargs="+", default=[256, 1024, 4096], help="Generated file sizes in KiB")
+    parser.add_argument("--chunks-per-second", type=float, default=200.0, help="Simulated decode rate")
+    args = parser.parse_args()
+
+    print(f"{'KiB':>6} {'mode':>9} {'first byte s':>13} {'total s':>8} {'peak MiB':>9}")
+    for kb in args.kb:
+        results = {}
+        for mode in ("buffered", "streamed"):
+            first_byte, total, peak, content = run(mode == "streamed", kb * 1024, args.chunks_per_second)
+            results[mode] = content
+            print(f"{kb:>6} {mode:>9} {first_byte:>13.3f} {total:>8.2f} {peak / 2 ** 20:>9.2f}")
+        assert results["buffered"] == results["streamed"], "streamed file differs from buffered file"
+
+
+if __name__ == "__main__":
+    main()
@@ -20,14 +20,57 @@ if not GOOGLE_API_KEY:
 DEFAULT_WORKSPACE_PATH = os.getenv("WORKSPACE_PATH", "./workspace")
 MAX_ITERATIONS = int(os.getenv("MAX_ITERATIONS", 10))
 MAX_RETRIES = int(os.getenv("MAX_RETRIES", 3))
+MAX_PARALLEL_TASKS = int(os.getenv("MAX_PARALLEL_TASKS", 4))
+MODIFY_MODE = os.getenv("MODIFY_MODE", "patch")  # "patch" or "full"
+STREAM_WRITES = os.getenv("STREAM_WRITES", "true").lower() == "true"  # Stream whole-file responses to disk
+VALIDATION_WORKERS = int(os.getenv("VALIDATION_WORKERS", 2))  # Processes parsing written files; 0 disables local validation
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 6000))  # File context per modify prompt, in estimated tokens
 
+# LLM Request Limits (shared by all parallel tasks and files; 0 requests per minute means unlimited)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", 0))
+
+# LLM Response Cache
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(os.path.expanduser("~"), ".cache", "agentcode", "llm_cache.sqlite"))
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", 256))
+
+# Workflow Checkpoints (an interrupted session continues with `python main.py --resume <session_id>`)
+CHECKPOINTS_ENABLED = os.getenv("CHECKPOINTS", "true").lower() == "true"
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", os.path.join(os.path.expanduser("~"), ".cache", "agentcode", "checkpoints.sqlite"))
+
+# Event Logs (newest entries kept per log; longer payloads are stored on disk under their hash)
+EVENT_LOG_CAP = int(os.getenv("EVENT_LOG_CAP", 200))
+EVENT_INLINE_CHARS = int(os.getenv("EVENT_INLINE_CHARS", 1024))
+EVENT_BLOB_DIR = os.getenv("EVENT_BLOB_DIR", os.path.join(os.path.expanduser("~"), ".cache", "agentcode", "blobs"))
+EVENT_BLOB_MAX_MB = int(os.getenv("EVENT_BLOB_MAX_MB", 512))
 
 SEARCH_CONFIG: SearchConfig = {
     "internal_enabled": True,
     "external_enabled": True,
     "max_results_per_query": int(os.getenv("MAX_SEARCH_RESULTS", 10)),
     "relevance_threshold": float(os.getenv("RELEVANCE_THRESHOLD", 0.5)),
-    "search_timeout": int(os.getenv("SEARCH_TIMEOUT", 30))
+    "search_timeout": int(os.getenv("SEARCH_TIMEOUT", 30)),
+    "index_workers": int(os.getenv("INDEX_WORKERS", os.cpu_count() or 1)),
+    "compact_index": os.getenv("COMPACT_INDEX", "true").lower() == "true",
+    # Search indexes are kept here, one directory per workspace, never inside the workspaces themselves
+    "index_dir": os.getenv("INDEX_DIR", os.path.join(os.path.expanduser("~"), ".cache", "agentcode", "index")),
+    # Largest workspace a modify request indexes by itself to find related definitions
+    "lazy_index_max_files": int(os.getenv("LAZY_INDEX_MAX_FILES", 5000)),
+    "semantic_enabled": os.getenv("SEMANTIC_SEARCH", "false").lower() == "true",
+    "embedding_backend": os.getenv("EMBEDDING_BACKEND", "google"),  # "google" or "hashing"
+    "scrape_workers": int(os.getenv("SCRAPE_WORKERS", 8)),
+    "scrape_connections_per_host": int(os.getenv("SCRAPE_CONNECTIONS_PER_HOST", 4)),
+    "scrape_max_bytes": int(os.getenv("SCRAPE_MAX_BYTES", 2 * 1024 * 1024)),
+    "http_cache_enabled": os.getenv("HTTP_CACHE", "true").lower() == "true",
+    "http_cache_dir": os.getenv("HTTP_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "agentcode", "http")),
+    "http_cache_max_mb": int(os.getenv("HTTP_CACHE_MAX_MB", 64)),
+    # Seconds a cached page is served without revalidation; raise it for offline runs
+    "http_cache_ttl": float(os.getenv("HTTP_CACHE_TTL", 0)),
+    "search_backend": os.getenv("SEARCH_BACKEND", "tavily"),  # "tavily" or "mock"
+    "query_cache_dir": os.getenv("QUERY_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "agentcode", "queries")),
+    # Seconds search results are reused; 0 disables the query cache
+    "query_cache_ttl": float(os.getenv("QUERY_CACHE_TTL", 24 * 60 * 60))
 }
 
 # Logging Configuration
@@ -43,6 +86,22 @@ def get_workflow_config(workspace_path: Optional[str] = None) -> WorkflowConfig:
         "workspace_path": workspace_path or DEFAULT_WORKSPACE_PATH,
         "search_config": SEARCH_CONFIG,
         "logging_level": LOGGING_LEVEL,
-        "max_retries": MAX_RETRIES
+        "max_retries": MAX_RETRIES,
+        "max_parallel_tasks": MAX_PARALLEL_TASKS,
+        "modify_mode": MODIFY_MODE,
+        "context_token_budget": CONTEXT_TOKEN_BUDGET,
+        "stream_writes": STREAM_WRITES,
+        "validation_workers": VALIDATION_WORKERS,
+        "llm_max_concurrency": LLM_MAX_CONCURRENCY,
+        "llm_requests_per_minute": LLM_REQUESTS_PER_MINUTE,
+        "llm_cache_enabled": LLM_CACHE_ENABLED,
+        "llm_cache_path": LLM_CACHE_PATH,
+        "llm_cache_max_mb": LLM_CACHE_MAX_MB,
+        "checkpoints_enabled": CHECKPOINTS_ENABLED,
+        "checkpoint_path": CHECKPOINT_PATH,
+        "event_log_cap": EVENT_LOG_CAP,
+        "event_inline_chars": EVENT_INLINE_CHARS,
+        "event_blob_dir": EVENT_BLOB_DIR,
+        "event_blob_max_mb": EVENT_BLOB_MAX_MB
     }
     return config
\ No newline at end of file
@@ -0,0 +1,267 @@
+# developer/context.py
+
+import re
+import keyword
+import builtins
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from search.inverted_index import tokenize
+from search.internal_search import InternalSearchEngine, extract_code_structure
+
+CHARS_PER_TOKEN = 4
+# Share of the budget the target file may use when it has to be cut; the rest is for related code
+TARGET_SHARE = 0.75
+# Classes longer than this are split into their header and individual methods
+MAX_UNIT_LINES = 80
+WINDOW_LINES = 40
+MAX_RELATED_LINES = 40
+MAX_DEFINITIONS_PER_NAME = 2
+
+IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+IGNORED_NAMES = set(keyword.kwlist) | set(dir(builtins)) | {"self", "cls"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate, about four characters per token, that needs no tokenizer"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _with_decorators(lines: List[str], line: int) -> int:
+    while line > 1 and lines[line - 2].lstrip().startswith('@'):
+        line -= 1
+    return line
+
+
+def _units(lines: List[str], structure: Dict[str, Any]) -> List[Tuple[int, int, str]]:
+    """
+    Split a file into (start, end, label) line spans covering every line.
+
+    Top-level functions and classes are one span each, except that long classes
+    are split into their header and methods; everything else is windowed.
+    """
+    definitions = []
+    functions = structure.get("functions", [])
+    for cls in structure.get("classes", []):
+        qualname = cls.get("qualname", cls["name"])
+        if '.' in qualname:
+            continue
+        start = _with_decorators(lines, cls["line"])
+        methods = [f for f in functions if f.get("qualname", "").rsplit('.', 1)[0] == qualname]
+        if methods and cls["end_line"] - start + 1 > MAX_UNIT_LINES:
+            method_starts = [_with_decorators(lines, method["line"]) for method in methods]
+            definitions.append((start, min(method_starts) - 1, qualname))
+            for method, method_start in zip(methods, method_starts):
+                definitions.append((method_start, method["end_line"], method["qualname"]))
+        else:
+            definitions.append((start, cls["end_line"], qualname))
+    for func in functions:
+        if '.' not in func.get("qualname", func["name"]):
+            definitions.append((_with_decorators(lines, func["line"]), func["end_line"], func["qualname"]))
+    definitions.sort()
+
+    units = []
+    cursor = 1
+
+    def windows(start: int, end: int) -> None:
+        # Blank lines between definitions belong to the definition above them
+        if units and not any(line.strip() for line in lines[start - 1:end]):
+            units[-1] = (units[-1][0], end, units[-1][2])
+            return
+        for line in range(start, end + 1, WINDOW_LINES):
+            units.append((line, min(line + WINDOW_LINES - 1, end), "module"))
+
+    for start, end, label in definitions:
+        if start < cursor:
+            continue
+        if start > cursor:
+            windows(cursor, start - 1)
+        units.append((start, end, label))
+        cursor = end + 1
+    if cursor <= len(lines):
+        windows(cursor, len(lines))
+    return units
+
+
+def _score(text: str, label: str, terms: Set[str]) -> int:
+    """Task terms found in the span, with matches in its name counting extra"""
+    if not terms:
+        return 0
+    span_terms = {token for token, _ in tokenize(text)}
+    label_terms = {token for token, _ in tokenize(label)}
+    return len(terms & span_terms) + 3 * len(terms & label_terms)
+
+
+def pack_target_file(content: str, target_file: str, description: str, budget_tokens: int) -> Tuple[str, bool]:
+    """
+    The target file cut down to the parts most relevant to the task within the budget.
+
+    Returns the excerpt and whether anything was omitted. Kept spans appear in
+    file order and verbatim; each omitted region becomes a one-line marker.
+    """
+    if estimate_tokens(content) <= budget_tokens:
+        return content, False
+
+    lines = content.split('\n')
+    structure = extract_code_structure(content, Path(target_file).suffix, target_file)
+    units = _units(lines, structure)
+    terms = {token for token, _ in tokenize(description)}
+
+    texts = ['\n'.join(lines[start - 1:end]) for start, end, _ in units]
+    scores = [_score(text, label, terms) for text, (_, _, label) in zip(texts, units)]
+    # The module header (imports and constants) is always worth keeping
+    if units and units[0][2] == "module":
+        scores[0] = max(scores[0], 1) + 1000
+
+    used = 0
+    selected = set()
+    for index in sorted((i for i in range(len(units)) if scores[i] > 0), key=lambda i: (-scores[i], units[i][0])):
+        cost = estimate_tokens(texts[index]) + 1
+        if used + cost <= budget_tokens:
+            selected.add(index)
+            used += cost
+
+    # Spend what is left on the surroundings of the chosen spans, nearest first
+    anchors = sorted(selected) or [0]
+
+    def distance(index: int) -> int:
+        at = bisect_left(anchors, index)
+        return min(abs(index - anchors[j]) for j in (at - 1, at) if 0 <= j < len(anchors))
+
+    rest = [i for i in range(len(units)) if i not in selected]
+    for index in sorted(rest, key=lambda i: (distance(i), i)):
+        cost = estimate_tokens(texts[index]) + 1
+        if used + cost > budget_tokens:
+            break
+        selected.add(index)
+        used += cost
+
+    parts = []
+    omitted_from = None
+    for index, (start, end, _) in enumerate(units):
+        if index in selected:
+            if omitted_from is not None:
+                parts.append(f"... (lines {omitted_from}-{start - 1} omitted) ...")
+                omitted_from = None
+            parts.append(texts[index])
+        elif omitted_from is None:
+            omitted_from = start
+    if omitted_from is not None:
+        parts.append(f"... (lines {omitted_from}-{len(lines)} omitted) ...")
+    return '\n'.join(parts), True
+
+
+def related_definitions(engine: Optional[InternalSearchEngine], target_file: str, content: str, excerpt: str,
+                        budget_tokens: int) -> str:
+    """
+    Definitions of names used in the excerpt, within the budget.
+
+    Names are taken most-referenced first; long definitions are cut to their
+    first MAX_RELATED_LINES lines. Definitions come from other workspace files
+    through the search index, which the first request builds when the workspace
+    is small enough (SEARCH_CONFIG['lazy_index_max_files']); otherwise from the
+    parts of the target file left out of the excerpt.
+    """
+    if budget_tokens <= 0:
+        return ""
+
+    counts: Dict[str, int] = {}
+    for name in IDENTIFIER.findall(excerpt):
+        if len(name) > 2 and name not in IGNORED_NAMES:
+            counts[name] = counts.get(name, 0) + 1
+    names = sorted(counts, key=lambda n: (-counts[n], n))
+
+    candidates = None
+    if engine is not None and engine.ensure_bounded_index():
+        candidates = _indexed_definitions(engine, names, Path(target_file).as_posix())
+    if candidates is None:
+        candidates = _local_definitions(target_file, content, excerpt, names)
+
+    snippets = []
+    used = 0
+    for snippet in candidates:
+        cost = estimate_tokens(snippet) + 1
+        if used + cost > budget_tokens:
+            continue
+        snippets.append(snippet)
+        used += cost
+    return '\n\n'.join(snippets)
+
+
+def _indexed_definitions(engine: InternalSearchEngine, names: List[str], relative_target: str) -> Optional[List[str]]:
+    """Snippets of definitions in other indexed files, or None if the index is not built"""
+    snippets = []
+    seen = set()
+    file_lines: Dict[str, List[str]] = {}
+    for name in names:
+        definitions = engine.lookup_definitions(name, MAX_DEFINITIONS_PER_NAME)
+        if definitions is None:
+            return None
+        for symbol, record in definitions:
+            key = (symbol.file_path, symbol.line)
+            if symbol.file_path == relative_target or key in seen:
+                continue
+            seen.add(key)
+            if symbol.file_path not in file_lines:
+                file_lines[symbol.file_path] = record.read_content(engine.workspace_path).split('\n')
+            snippet = _definition_snippet(symbol.file_path, file_lines[symbol.file_path], record.structure,
+                                          symbol.qualname, symbol.line)
+            if snippet is not None:
+                snippets.append(snippet)
+    return snippets
+
+
+def _local_definitions(target_file: str, content: str, excerpt: str, names: List[str]) -> List[str]:
+    """Snippets of the target file's own definitions whose first line the excerpt leaves out"""
+    if excerpt == content:
+        return []
+    structure = extract_code_structure(content, Path(target_file).suffix, target_file)
+    definitions = structure["functions"] + structure["classes"]
+    lines = content.split('\n')
+    snippets = []
+    for name in names:
+        for item in [d for d in definitions if d["name"] == name][:MAX_DEFINITIONS_PER_NAME]:
+            if item["line"] > len(lines) or lines[item["line"] - 1] in excerpt:
+                continue
+            snippet = _definition_snippet(Path(target_file).as_posix(), lines, structure, item["qualname"], item["line"])
+            if snippet is not None:
+                snippets.append(snippet)
+    return snippets
+
+
+def _definition_snippet(file_path: str, lines: List[str], structure: Dict[str, Any], qualname: str,
+                        line: int) -> Optional[str]:
+    end_line = line
+    for item in structure.get("functions", []) + structure.get("classes", []):
+        if item.get("qualname", item["name"]) == qualname and item["line"] == line:
+            end_line = item.get("end_line", line)
+            break
+    if line > len(lines):
+        return None
+    last = min(end_line, line + MAX_RELATED_LINES - 1)
+    body = '\n'.join(lines[line - 1:last])
+    if last < end_line:
+        body += "\n    ..."
+    return f"# {file_path}:{line}\n{body}"
+
+
+def build_modify_context(engine: Optional[InternalSearchEngine], target_file: str, content: str,
+                         description: str, budget_tokens: int) -> Tuple[str, str, bool]:
+    """
+    (file excerpt, related definitions, whether the excerpt omits lines) for a modify prompt.
+
+    A file that fits the budget is shown whole and related definitions use what
+    is left; otherwise the file gets TARGET_SHARE of the budget.
+    """
+    if estimate_tokens(content) <= budget_tokens:
+        excerpt, partial = content, False
+    else:
+        excerpt, partial = pack_target_file(content, target_file, description, int(budget_tokens * TARGET_SHARE))
+
+    related = ""
+    try:
+        related = related_definitions(engine, target_file, content, excerpt, budget_tokens - estimate_tokens(excerpt))
+    except Exception as e:
+        print(f"[DEBUG] Could not collect related definitions for {target_file}: {e}")
+    return excerpt, related, partial
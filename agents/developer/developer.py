@@ -1,244 +1,559 @@
 # developer/developer.py
 
-from typing import Dict, Any, List
-from langchain_core.messages import AIMessage, SystemMessage, HumanMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import Dict, Any, List, Set, Callable, Optional, Tuple, TYPE_CHECKING
+from langchain_core.messages import SystemMessage, HumanMessage
 from langgraph.graph import StateGraph, START, END
-from state import DeveloperState, AtomicTask, TaskType
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from state import DeveloperState, AtomicTask, TaskType, ValidationIssue
+from events import EventKind, EventRecorder
+from search.internal_search import InternalSearchEngine, get_search_engine
+from developer.scheduler import unique_task_ids, build_dependencies, topological_order, blocked_by_failures, next_batch
+from developer.patching import apply_patch, PatchError, PATCH_FORMAT_INSTRUCTIONS
+from developer.context import build_modify_context, estimate_tokens
+from developer.streaming import ProgressCallback, chunk_text, strip_fence, stream_to_file, astream_to_file
+from developer.validation import validate_files, avalidate_files, format_issue
+from llm.rate_limit import RateLimiter
+from langchain_core.runnables import RunnableLambda
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import aiofiles
 import shutil
 from pathlib import Path
 
+if TYPE_CHECKING:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+CREATE_SYSTEM_PROMPT = "You are an expert programmer. Your task is to write the full content for a new file. Return ONLY the raw code or text for the file. Do NOT include any explanations, comments, or markdown formatting like ```python or ```cpp."
+REWRITE_SYSTEM_PROMPT = "You are an expert programmer. Your task is to modify a file. Return the COMPLETE, modified file content. Do NOT add explanations or markdown wrappers."
+PATCH_SYSTEM_PROMPT = f"You are an expert programmer. Your task is to modify a file by describing only the edits.\n{PATCH_FORMAT_INSTRUCTIONS}"
+
 
 class DeveloperAgent:
-    def __init__(self, llm: ChatGoogleGenerativeAI):
+    def __init__(self, llm: "ChatGoogleGenerativeAI", rate_limiter: Optional[RateLimiter] = None,
+                 modify_mode: str = "patch", context_budget: int = 6000, stream_writes: bool = False,
+                 progress: Optional[ProgressCallback] = None, validation_workers: int = 0,
+                 events: Optional[EventRecorder] = None):
         self.llm = llm
+        self.rate_limiter = rate_limiter or RateLimiter(max_concurrent=4)
+        self.modify_mode = modify_mode  # "patch" or "full"
+        self.context_budget = context_budget  # Estimated prompt tokens for file context in modify requests
+        self.stream_writes = stream_writes  # Write whole-file responses to disk as they stream in
+        self.progress = progress
+        self.validation_workers = validation_workers  # Processes checking written files; 0 skips local validation
+        self.events = events or EventRecorder()
     
     def initialize_development(self, state: DeveloperState) -> Dict[str, Any]:
-        """Initialize development phase"""
+        """Initialize development phase and schedule the first batch of tasks"""
         atomic_tasks = state.get("atomic_tasks", [])
         if not atomic_tasks:
-            return {**state, "current_phase": "complete"}
+            return {"current_phase": "complete", "current_batch": [], "errors_encountered": []}
         
-        return {
-            **state,
-            "current_task_index": 0,
-            "current_task": atomic_tasks[0],
-            "current_phase": "implementation", 
-            "task_completion_status": {},
-            "retry_count": 0
+        atomic_tasks = unique_task_ids(atomic_tasks)
+        order, dependencies = topological_order(atomic_tasks, build_dependencies(atomic_tasks, state.get("task_dependencies")))
+        update = {
+            "atomic_tasks": atomic_tasks,
+            "task_order": order,
+            "task_dependencies": {task_id: sorted(prerequisites) for task_id, prerequisites in dependencies.items()}
         }
+        return {**update, **self.move_to_next_task({**state, **update})}
+    
+    def execute_task_implementation(self, state: DeveloperState) -> Dict[str, Any]:
+        """Implement every task of the current batch, concurrently when there are several"""
+        batch = state.get("current_batch", [])
+        if not batch:
+            return {}
+        
+        workspace_path = Path(state.get("workspace_path", "."))
+        # Retries of tasks that failed validation are told what was wrong
+        feedback = state.get("validation_errors", {})
+        run = lambda task: self._run_task(task, workspace_path, feedback.get(task["id"], []))
+        if len(batch) == 1:
+            outcomes = [run(batch[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=len(batch), thread_name_prefix="developer") as executor:
+                outcomes = list(executor.map(run, batch))
+        return self._merge_outcomes(batch, outcomes)
     
-    def execute_task_implementation(self, state: DeveloperState) -> DeveloperState:
-        """Execute the implementation for current task"""
-        current_task = state.get("current_task")
-        if not current_task:
-            return state
+    async def aexecute_task_implementation(self, state: DeveloperState) -> Dict[str, Any]:
+        """Async execute_task_implementation: the batch runs as concurrent coroutines"""
+        batch = state.get("current_batch", [])
+        if not batch:
+            return {}
         
         workspace_path = Path(state.get("workspace_path", "."))
-        files_modified = list(state.get("files_modified", []))
-        files_created = list(state.get("files_created", []))
-        files_deleted = list(state.get("files_deleted", []))
-        errors = list(state.get("errors_encountered", []))
-        success = False
+        feedback = state.get("validation_errors", {})
+        outcomes = await asyncio.gather(*(self._arun_task(task, workspace_path, feedback.get(task["id"], [])) for task in batch))
+        return self._merge_outcomes(batch, outcomes)
+    
+    def _merge_outcomes(self, batch: List[AtomicTask], outcomes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """The state update for a finished batch; the reducers append and merge it into the developer state"""
+        # Merge in batch order so the file lists do not depend on completion order
+        files_modified, files_created, files_deleted = [], [], []
+        task_completion_status, task_errors = {}, {}
+        for task, outcome in zip(batch, outcomes):
+            files_modified.extend(outcome["files_modified"])
+            files_created.extend(outcome["files_created"])
+            files_deleted.extend(outcome["files_deleted"])
+            task_completion_status[task["id"]] = outcome["success"]
+            task_errors[task["id"]] = outcome["errors"]
         
+        return {
+            "files_modified": files_modified,
+            "files_created": files_created,
+            "files_deleted": files_deleted,
+            "task_completion_status": task_completion_status,
+            "task_errors": task_errors,
+            "current_phase": "validation"
+        }
+    
+    def _run_task(self, task: AtomicTask, workspace_path: Path, feedback: Optional[List[ValidationIssue]] = None) -> Dict[str, Any]:
+        """Run one task against its own result lists so tasks can run side by side"""
+        outcome = {"success": False, "files_modified": [], "files_created": [], "files_deleted": [], "errors": []}
         try:
-            task_type = current_task.get("type")
+            task_type = task.get("type")
             
             if task_type == TaskType.CREATE_FILE:
-                success = self._create_file(current_task, workspace_path, files_created, errors)
+                outcome["success"] = self._create_file(task, workspace_path, outcome["files_created"], outcome["errors"], feedback)
             elif task_type == TaskType.MODIFY_FILE:
-                success = self._modify_file(current_task, workspace_path, files_modified, errors)
+                outcome["success"] = self._modify_file(task, workspace_path, outcome["files_modified"], outcome["errors"], feedback)
             else:
-                success = self._modify_file(current_task, workspace_path, files_modified, errors)
-
-            task_completion_status = state.get("task_completion_status", {})
-            task_completion_status[current_task["id"]] = success
-            
-            return {
-                **state,
-                "files_modified": files_modified,
-                "files_created": files_created,
-                "files_deleted": files_deleted,
-                "task_completion_status": task_completion_status,
-                "errors_encountered": errors,
-                "current_phase": "validation"
-            }
-            
+                outcome["success"] = self._modify_file(task, workspace_path, outcome["files_modified"], outcome["errors"], feedback)
         except Exception as e:
-            errors.append(str(e))
-            return {
-                **state,
-                "errors_encountered": errors,
-                "current_phase": "validation"
-            }
+            outcome["errors"].append(str(e))
+        return outcome
     
-    def _create_file(self, task: AtomicTask, workspace_path: Path, files_created: List, errors: List) -> bool:
-        """Create a new file with content generated by the LLM."""
+    async def _arun_task(self, task: AtomicTask, workspace_path: Path, feedback: Optional[List[ValidationIssue]] = None) -> Dict[str, Any]:
+        outcome = {"success": False, "files_modified": [], "files_created": [], "files_deleted": [], "errors": []}
         try:
-            target_files = task.get('target_files', [])
-            if not target_files:
-                errors.append(f"Cannot create file: No target_files specified for task {task.get('id')}")
-                return False
+            if task.get("type") == TaskType.CREATE_FILE:
+                outcome["success"] = await self._acreate_file(task, workspace_path, outcome["files_created"], outcome["errors"], feedback)
+            else:
+                outcome["success"] = await self._amodify_file(task, workspace_path, outcome["files_modified"], outcome["errors"], feedback)
+        except Exception as e:
+            outcome["errors"].append(str(e))
+        return outcome
+    
+    def _invoke_llm(self, messages: List) -> str:
+        """Call the LLM under the shared rate limiter and return the response text"""
+        with self.rate_limiter:
+            response = self.llm.invoke(messages)
+        return response.content if isinstance(response.content, str) else str(response.content)
+    
+    async def _ainvoke_llm(self, messages: List) -> str:
+        async with self.rate_limiter:
+            response = await self.llm.ainvoke(messages)
+        return response.content if isinstance(response.content, str) else str(response.content)
+    
+    def _stream_llm_to_file(self, messages: List, file_path: Path) -> None:
+        """Stream the LLM response into `file_path`, dropping a wrapping code fence, under the shared rate limiter"""
+        with self.rate_limiter:
+            chunks = (chunk_text(chunk.content) for chunk in self.llm.stream(messages))
+            stream_to_file(chunks, file_path, self.progress)
+    
+    async def _astream_llm_to_file(self, messages: List, file_path: Path) -> None:
+        async with self.rate_limiter:
+            chunks = (chunk_text(chunk.content) async for chunk in self.llm.astream(messages))
+            await astream_to_file(chunks, file_path, self.progress)
 
-            system_prompt = "You are an expert programmer. Your task is to write the full content for a new file. Return ONLY the raw code or text for the file. Do NOT include any explanations, comments, or markdown formatting like ```python or ```cpp."
-            human_prompt = f"The file should be created based on this description: \"{task.get('description')}\""
-            
-            for target_file in target_files:
-                file_path = workspace_path / target_file
-                file_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                messages = [
-                    SystemMessage(content=system_prompt),
-                    HumanMessage(content=human_prompt)
-                ]
-                response = self.llm.invoke(messages)
-                response_content = response.content if isinstance(response.content, str) else str(response.content)
-                
-                # Clean up potential markdown formatting just in case
-                if response_content.strip().startswith("```") and response_content.strip().endswith("```"):
-                    response_content = "\n".join(response_content.strip().split('\n')[1:-1])
+    def _for_each_file(self, target_files: List[str], generate: Callable[[str], str]) -> List[Tuple[Optional[str], Optional[Exception]]]:
+        """
+        Run `generate` for every target file concurrently, bounded by the rate limiter.
+        
+        Each call writes its own file as soon as its response arrives; outcomes are
+        returned in target order as (written path, None) or (None, exception).
+        """
+        def run(target_file: str) -> Tuple[Optional[str], Optional[Exception]]:
+            try:
+                return generate(target_file), None
+            except Exception as e:
+                return None, e
+        
+        if len(target_files) == 1:
+            return [run(target_files[0])]
+        workers = min(len(target_files), self.rate_limiter.max_concurrent)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="generate") as executor:
+            return list(executor.map(run, target_files))
+    
+    async def _afor_each_file(self, target_files: List[str], agenerate: Callable[[str], Any]) -> List[Tuple[Optional[str], Optional[Exception]]]:
+        """Async _for_each_file: one coroutine per file, bounded by the rate limiter"""
+        results = await asyncio.gather(*(agenerate(target_file) for target_file in target_files), return_exceptions=True)
+        return [(None, result) if isinstance(result, Exception) else (result, None) for result in results]
+    
+    def _collect(self, results: List[Tuple[Optional[str], Optional[Exception]]], written: List, errors: List, action: str) -> bool:
+        """Record written paths and errors from per-file results; True when every file succeeded"""
+        success = True
+        for path, error in results:
+            if error is not None:
+                errors.append(f"Error {action}: {error}")
+                success = False
+            else:
+                written.append(path)
+        return success
+    
+    def _create_file(self, task: AtomicTask, workspace_path: Path, files_created: List, errors: List,
+                     feedback: Optional[List[ValidationIssue]] = None) -> bool:
+        """Create new files with content generated by the LLM, one concurrent request per file."""
+        target_files = task.get('target_files', [])
+        if not target_files:
+            errors.append(f"Cannot create file: No target_files specified for task {task.get('id')}")
+            return False
 
+        def generate(target_file: str) -> str:
+            file_path = workspace_path / target_file
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            
+            messages = self._create_messages(task, target_file, feedback)
+            if self.stream_writes:
+                self._stream_llm_to_file(messages, file_path)
+            else:
+                response_content = strip_fence(self._invoke_llm(messages))
                 with open(file_path, 'w', encoding='utf-8') as f:
                     f.write(response_content)
-                
-                files_created.append(str(file_path))
             
-            return True
-        except Exception as e:
-            errors.append(f"Error creating file: {e}")
+            self._refresh_search_index(workspace_path, [str(file_path)])
+            return str(file_path)
+        
+        return self._collect(self._for_each_file(target_files, generate), files_created, errors, "creating file")
+    
+    async def _acreate_file(self, task: AtomicTask, workspace_path: Path, files_created: List, errors: List,
+                            feedback: Optional[List[ValidationIssue]] = None) -> bool:
+        target_files = task.get('target_files', [])
+        if not target_files:
+            errors.append(f"Cannot create file: No target_files specified for task {task.get('id')}")
             return False
+        
+        async def agenerate(target_file: str) -> str:
+            file_path = workspace_path / target_file
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            
+            messages = self._create_messages(task, target_file, feedback)
+            if self.stream_writes:
+                await self._astream_llm_to_file(messages, file_path)
+            else:
+                response_content = strip_fence(await self._ainvoke_llm(messages))
+                async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
+                    await f.write(response_content)
+            
+            await asyncio.to_thread(self._refresh_search_index, workspace_path, [str(file_path)])
+            return str(file_path)
+        
+        return self._collect(await self._afor_each_file(target_files, agenerate), files_created, errors, "creating file")
     
-    def _modify_file(self, task: AtomicTask, workspace_path: Path, files_modified: List, errors: List) -> bool:
-        """Modify an existing file based on the task description."""
-        try:
-            target_files = task.get('target_files', [])
-            if not target_files:
-                 errors.append(f"Cannot modify file: No target_files specified for task {task.get('id')}")
-                 return False
-
-            for target_file in target_files:
-                file_path = workspace_path / target_file
-                if not file_path.exists():
-                    errors.append(f"Cannot modify file: {file_path} does not exist.")
-                    continue
-                
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    current_content = f.read()
-                
-                system_prompt = "You are an expert programmer. Your task is to modify a file. Return the COMPLETE, modified file content. Do NOT add explanations or markdown wrappers."
-                human_prompt = f"Modify the file '{target_file}' to accomplish the following task: \"{task.get('description')}\"\n\nHere is the current content of the file:\n```\n{current_content}\n```"
-                
-                messages = [
-                    SystemMessage(content=system_prompt),
-                    HumanMessage(content=human_prompt)
-                ]
-                response = self.llm.invoke(messages)
-                response_content = response.content if isinstance(response.content, str) else str(response.content)
+    def _create_messages(self, task: AtomicTask, target_file: str, feedback: Optional[List[ValidationIssue]]) -> List:
+        human_prompt = f"The file should be created based on this description: \"{task.get('description')}\""
+        return [
+            SystemMessage(content=CREATE_SYSTEM_PROMPT),
+            HumanMessage(content=human_prompt + self._feedback_note(feedback, target_file))
+        ]
+    
+    def _modify_file(self, task: AtomicTask, workspace_path: Path, files_modified: List, errors: List,
+                     feedback: Optional[List[ValidationIssue]] = None) -> bool:
+        """Modify existing files based on the task description, one concurrent request per file."""
+        existing_files = self._existing_targets(task, workspace_path, errors)
+        if existing_files is None:
+            return False
+        
+        def generate(target_file: str) -> str:
+            file_path = workspace_path / target_file
+            with open(file_path, 'r', encoding='utf-8') as f:
+                current_content = f.read()
+            
+            engine = self._search_engine(workspace_path)
+            new_content = None
+            if self.modify_mode == "patch" and current_content.strip():
+                messages = self._patch_messages(engine, task, target_file, current_content, feedback)
+                new_content = self._apply_patch_response(target_file, current_content, self._invoke_llm(messages))
+            
+            if new_content is None:
+                messages = self._rewrite_messages(engine, task, target_file, current_content, feedback)
+                if self.stream_writes:
+                    # Replaces the file atomically, so a failed stream keeps the current version
+                    self._stream_llm_to_file(messages, file_path)
+                else:
+                    new_content = strip_fence(self._invoke_llm(messages))
 
+            if new_content is not None:
                 with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(response_content)
-                
-                files_modified.append(str(file_path))
+                    f.write(new_content)
             
-            return True
-        except Exception as e:
-            errors.append(f"Error modifying file {task.get('target_files')}: {e}")
+            self._refresh_search_index(workspace_path, [str(file_path)])
+            return str(file_path)
+        
+        results = self._for_each_file(existing_files, generate)
+        return self._collect(results, files_modified, errors, f"modifying file {task.get('target_files', [])}")
+    
+    async def _amodify_file(self, task: AtomicTask, workspace_path: Path, files_modified: List, errors: List,
+                            feedback: Optional[List[ValidationIssue]] = None) -> bool:
+        existing_files = self._existing_targets(task, workspace_path, errors)
+        if existing_files is None:
             return False
+        
+        async def agenerate(target_file: str) -> str:
+            file_path = workspace_path / target_file
+            async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
+                current_content = await f.read()
+            
+            engine = self._search_engine(workspace_path)
+            new_content = None
+            if self.modify_mode == "patch" and current_content.strip():
+                # Context packing reads files and waits on the search engine lock, so it stays off the event loop
+                messages = await asyncio.to_thread(self._patch_messages, engine, task, target_file, current_content, feedback)
+                new_content = self._apply_patch_response(target_file, current_content, await self._ainvoke_llm(messages))
+            
+            if new_content is None:
+                messages = await asyncio.to_thread(self._rewrite_messages, engine, task, target_file, current_content, feedback)
+                if self.stream_writes:
+                    await self._astream_llm_to_file(messages, file_path)
+                else:
+                    new_content = strip_fence(await self._ainvoke_llm(messages))
+            
+            if new_content is not None:
+                async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
+                    await f.write(new_content)
+            
+            await asyncio.to_thread(self._refresh_search_index, workspace_path, [str(file_path)])
+            return str(file_path)
+        
+        results = await self._afor_each_file(existing_files, agenerate)
+        return self._collect(results, files_modified, errors, f"modifying file {task.get('target_files', [])}")
+    
+    def _existing_targets(self, task: AtomicTask, workspace_path: Path, errors: List) -> Optional[List[str]]:
+        """Target files that exist, with an error for each missing one; None when the task names no files"""
+        target_files = task.get('target_files', [])
+        if not target_files:
+             errors.append(f"Cannot modify file: No target_files specified for task {task.get('id')}")
+             return None
+        
+        existing_files = []
+        for target_file in target_files:
+            if (workspace_path / target_file).exists():
+                existing_files.append(target_file)
+            else:
+                errors.append(f"Cannot modify file: {workspace_path / target_file} does not exist.")
+        return existing_files
+    
+    def _patch_messages(self, engine: Optional[InternalSearchEngine], task: AtomicTask, target_file: str,
+                        current_content: str, feedback: Optional[List[ValidationIssue]]) -> List:
+        """Messages asking for SEARCH/REPLACE edits, with the file packed into the context budget"""
+        description = task.get('description')
+        excerpt, related, partial = build_modify_context(engine, target_file, current_content, description, self.context_budget)
+        human_prompt = self._modify_prompt(target_file, description, excerpt, related, partial)
+        human_prompt += self._feedback_note(feedback, target_file)
+        return [SystemMessage(content=PATCH_SYSTEM_PROMPT), HumanMessage(content=human_prompt)]
+    
+    def _rewrite_messages(self, engine: Optional[InternalSearchEngine], task: AtomicTask, target_file: str,
+                          current_content: str, feedback: Optional[List[ValidationIssue]]) -> List:
+        """Messages asking for the whole modified file"""
+        description = task.get('description')
+        # A full rewrite needs the whole file; related definitions get whatever budget is left
+        budget = max(self.context_budget, estimate_tokens(current_content))
+        excerpt, related, _ = build_modify_context(engine, target_file, current_content, description, budget)
+        return [
+            SystemMessage(content=REWRITE_SYSTEM_PROMPT),
+            HumanMessage(content=self._modify_prompt(target_file, description, excerpt, related, False)
+                         + self._feedback_note(feedback, target_file))
+        ]
+
+    def _modify_prompt(self, target_file: str, description: str, excerpt: str, related: str, partial: bool) -> str:
+        """Human prompt for a modify request from the packed file excerpt and related definitions"""
+        if partial:
+            prompt = (f"Modify the file '{target_file}' to accomplish the following task: \"{description}\"\n\n"
+                      f"Here are the parts of the current file relevant to the task. Regions marked as omitted are not shown; "
+                      f"leave them unchanged and copy SEARCH lines only from the parts shown:\n```\n{excerpt}\n```")
+        else:
+            prompt = f"Modify the file '{target_file}' to accomplish the following task: \"{description}\"\n\nHere is the current content of the file:\n```\n{excerpt}\n```"
+        if related:
+            prompt += f"\n\nRelated definitions from other files in the workspace, for reference only:\n```\n{related}\n```"
+        return prompt
+
+    def _feedback_note(self, feedback: Optional[List[ValidationIssue]], target_file: str) -> str:
+        """Prompt suffix listing the validation errors a previous attempt left in this file"""
+        issues = [issue for issue in feedback or [] if issue["file_path"] == target_file]
+        if not issues:
+            return ""
+        listed = "\n".join(f"- {format_issue(issue)}" for issue in issues)
+        return f"\n\nThe previous attempt at this file failed validation with these errors; make sure your result fixes them:\n{listed}"
+
+    def _apply_patch_response(self, target_file: str, current_content: str, response_content: str) -> Optional[str]:
+        """Apply the SEARCH/REPLACE edits of a response; None means fall back to a full rewrite"""
+        try:
+            return apply_patch(current_content, response_content)
+        except PatchError as e:
+            print(f"[DEBUG] Could not apply patch to {target_file} ({e}); regenerating the full file.")
+            return None
+
+    def _search_engine(self, workspace_path: Path) -> Optional[InternalSearchEngine]:
+        """The shared workspace engine used to look up related definitions, or None if unavailable"""
+        try:
+            return get_search_engine(str(workspace_path))
+        except Exception as e:
+            print(f"[DEBUG] Search engine unavailable for {workspace_path}: {e}")
+            return None
 
-    def validate_task_completion(self, state: DeveloperState) -> DeveloperState:
-        """Validate that the current task was completed successfully"""
-        current_task = state.get("current_task")
-        if not current_task:
-            return state
+    def _refresh_search_index(self, workspace_path: Path, paths: List[str]) -> None:
+        """Keep the workspace search index in step with the files this agent just wrote."""
+        try:
+            get_search_engine(str(workspace_path)).update_paths(paths)
+        except Exception as e:
+            print(f"[DEBUG] Could not refresh search index for {paths}: {e}")
+
+    def validate_task_completion(self, state: DeveloperState) -> Dict[str, Any]:
+        """Check the files each task wrote and record its outcome; failed tasks are rescheduled until out of retries"""
+        batch = state.get("current_batch", [])
+        if not batch:
+            return {}
         
-        task_id = current_task["id"]
-        was_successful = state.get("task_completion_status", {}).get(task_id, False)
+        written = self._files_to_validate(state)
+        paths = [path for task_paths in written.values() for path in task_paths]
+        issues = validate_files(Path(state.get("workspace_path", ".")), paths, self.validation_workers) if paths else []
+        return self._record_validation(state, written, issues)
+    
+    async def avalidate_task_completion(self, state: DeveloperState) -> Dict[str, Any]:
+        """Async validate_task_completion: awaits the validation pool"""
+        if not state.get("current_batch", []):
+            return {}
         
-        validation_message = AIMessage(content=f"Task {task_id} validation: {'SUCCESS' if was_successful else 'FAILED'}")
+        written = self._files_to_validate(state)
+        paths = [path for task_paths in written.values() for path in task_paths]
+        issues = await avalidate_files(Path(state.get("workspace_path", ".")), paths, self.validation_workers) if paths else []
+        return self._record_validation(state, written, issues)
+    
+    def _files_to_validate(self, state: DeveloperState) -> Dict[str, List[str]]:
+        """task id -> target files of each task in the batch that reported success"""
+        if self.validation_workers <= 0:
+            return {}
+        status = state.get("task_completion_status", {})
+        return {task["id"]: task.get("target_files", []) for task in state.get("current_batch", []) if status.get(task["id"])}
+    
+    def _record_validation(self, state: DeveloperState, written: Dict[str, List[str]], found: List[ValidationIssue]) -> Dict[str, Any]:
+        """Fail tasks whose files have issues, then settle or reschedule every task in the batch"""
+        batch = state.get("current_batch", [])
+        status = state.get("task_completion_status", {})
+        task_completion_status: Dict[str, bool] = {}
+        task_errors: Dict[str, List[str]] = {}
+        update: Dict[str, Any] = {}
+        if written:
+            issues_by_file: Dict[str, List[ValidationIssue]] = {}
+            for issue in found:
+                issues_by_file.setdefault(issue["file_path"], []).append(issue)
+            # Only tasks being retried have entries, so this stays small however long the plan is
+            validation_errors = dict(state.get("validation_errors", {}))
+            for task_id, paths in written.items():
+                issues = [issue for path in paths for issue in issues_by_file.get(path, [])]
+                if issues:
+                    print(f"[DEBUG] Task {task_id} failed validation with {len(issues)} error(s).")
+                    task_completion_status[task_id] = False
+                    task_errors[task_id] = state.get("task_errors", {}).get(task_id, []) + [format_issue(issue) for issue in issues]
+                    validation_errors[task_id] = issues
+                else:
+                    validation_errors.pop(task_id, None)
+            update["validation_errors"] = validation_errors
         
-        current_validation_results = list(state.get("validation_results", []))
-        current_validation_results.append(validation_message)
+        retry_counts = state.get("retry_counts", {})
+        max_retries = state.get("max_retries", 3)
+        validation_results, settled_tasks, retried = [], [], {}
+        for task in batch:
+            task_id = task["id"]
+            was_successful = task_completion_status.get(task_id, status.get(task_id, False))
+            if was_successful:
+                event = self.events.record(EventKind.TASK_SUCCEEDED, "validate", task_id, ", ".join(task.get("target_files", [])))
+            else:
+                errors = task_errors.get(task_id, state.get("task_errors", {}).get(task_id, []))
+                event = self.events.record(EventKind.TASK_FAILED, "validate", task_id, "\n".join(errors))
+            validation_results.append(event)
+            if was_successful or retry_counts.get(task_id, 0) >= max_retries:
+                settled_tasks.append(task_id)
+            else:
+                retried[task_id] = retry_counts.get(task_id, 0) + 1
         
         return {
-            **state,
-            "validation_results": current_validation_results,
-            "current_phase": "next_task" if was_successful else "retry"
+            **update,
+            "task_completion_status": task_completion_status,
+            "task_errors": task_errors,
+            "validation_results": validation_results,
+            "retry_counts": retried,
+            "settled_tasks": settled_tasks,
+            "current_phase": "next_task"
         }
     
     def move_to_next_task(self, state: DeveloperState) -> Dict[str, Any]:
-        """Move to the next atomic task"""
-        current_index = state.get("current_task_index", 0)
+        """Schedule the next batch: ready tasks, including retries, without shared target files"""
         atomic_tasks = state.get("atomic_tasks", [])
+        order = state.get("task_order", [])
+        dependencies = {task_id: set(prerequisites) for task_id, prerequisites in state.get("task_dependencies", {}).items()}
+        settled = set(state.get("settled_tasks", []))
+        status = state.get("task_completion_status", {})
+        update = self._skip_blocked(order, dependencies, settled, {task_id for task_id in settled if not status.get(task_id)})
+        settled.update(update.get("settled_tasks", []))
         
-        next_index = current_index + 1
+        batch = next_batch(order, {task["id"]: task for task in atomic_tasks}, dependencies, settled,
+                           max(state.get("max_parallel_tasks", 1), 1))
         
-        if next_index >= len(atomic_tasks):
-            return { **state, "current_phase": "complete", "current_task": None }
+        if not batch:
+            task_errors = {**state.get("task_errors", {}), **update.get("task_errors", {})}
+            return {
+                **update,
+                "current_phase": "complete",
+                "current_batch": [],
+                "errors_encountered": [error for task_id in order for error in task_errors.get(task_id, [])]
+            }
         
-        return {
-            **state,
-            "current_task_index": next_index,
-            "current_task": atomic_tasks[next_index],
-            "current_phase": "implementation", # Go straight to implementation for next task
-            "retry_count": 0
-        }
+        if len(batch) > 1:
+            print(f"[DEBUG] Running {len(batch)} independent tasks in parallel: {[task['id'] for task in batch]}")
+        return {**update, "current_batch": batch, "current_phase": "implementation"}
     
-    def retry_current_task(self, state: DeveloperState) -> Dict[str, Any]:
-        """Retry the current task"""
-        retry_count = state.get("retry_count", 0)
-        max_retries = state.get("max_retries", 3)
-        
-        if retry_count >= max_retries:
-            return self.move_to_next_task(state)
-        
+    def _skip_blocked(self, order: List[str], dependencies: Dict[str, Set[str]], settled: Set[str], failed: Set[str]) -> Dict[str, Any]:
+        """Settle tasks whose prerequisites failed as failed themselves, rather than run them against missing work"""
+        blocked = blocked_by_failures(order, dependencies, settled, failed)
+        if not blocked:
+            return {}
+        task_errors = {}
+        for task_id, prerequisites in blocked.items():
+            print(f"[DEBUG] Skipping task {task_id}: prerequisite task(s) {', '.join(prerequisites)} failed.")
+            task_errors[task_id] = [f"Skipped: prerequisite task(s) {', '.join(prerequisites)} failed"]
         return {
-            **state,
-            "retry_count": retry_count + 1,
-            "current_phase": "implementation", # Retry by going straight to implementation again
-            "errors_encountered": []
+            "settled_tasks": list(blocked),
+            "task_completion_status": {task_id: False for task_id in blocked},
+            "task_errors": task_errors,
+            "validation_results": [
+                self.events.record(EventKind.TASK_FAILED, "next_task", task_id, errors[0]) for task_id, errors in task_errors.items()
+            ]
         }
     
-    def create_developer_graph(self):
-        """Create a lean developer workflow graph to avoid rate limits."""
+    def create_developer_graph(self, checkpointer: Optional[BaseCheckpointSaver] = None):
+        """Create a lean developer workflow graph that runs independent tasks in batches."""
         workflow = StateGraph(DeveloperState)
         
         workflow.add_node("initialize", self.initialize_development)
-        workflow.add_node("implement", self.execute_task_implementation)
-        workflow.add_node("validate", self.validate_task_completion)
+        # I/O-bound nodes have async twins, used when the graph runs under ainvoke
+        workflow.add_node("implement", RunnableLambda(self.execute_task_implementation, afunc=self.aexecute_task_implementation))
+        workflow.add_node("validate", RunnableLambda(self.validate_task_completion, afunc=self.avalidate_task_completion))
         workflow.add_node("next_task", self.move_to_next_task)
-        workflow.add_node("retry_task", self.retry_current_task)
         
         workflow.add_edge(START, "initialize")
         workflow.add_conditional_edges(
             "initialize",
-            lambda x: "implement" if x.get("current_task") else END,
+            lambda x: "implement" if x.get("current_batch") else END,
             {"implement": "implement", END: END}
         )
         
         workflow.add_edge("implement", "validate")
-        
-        workflow.add_conditional_edges(
-            "validate",
-            lambda x: "next_task" if x.get("current_phase") == "next_task" else "retry_task",
-            {"next_task": "next_task", "retry_task": "retry_task"}
-        )
+        workflow.add_edge("validate", "next_task")
         
         workflow.add_conditional_edges(
             "next_task",
             lambda x: "implement" if x.get("current_phase") == "implementation" else END,
              {"implement": "implement", END: END}
         )
-
-        workflow.add_conditional_edges(
-            "retry_task",
-            lambda x: "implement" if x.get("current_phase") == "implementation" else "next_task",
-            {"implement": "implement", "next_task": "next_task"}
-        )
         
-        return workflow.compile()
+        # With a checkpointer every batch is saved once validated, so a resumed run skips settled tasks
+        return workflow.compile(checkpointer=checkpointer)
 
 
-def create_developer_service(llm: ChatGoogleGenerativeAI):
+def create_developer_service(llm: "ChatGoogleGenerativeAI", rate_limiter: Optional[RateLimiter] = None,
+                             modify_mode: str = "patch", context_budget: int = 6000, stream_writes: bool = False,
+                             progress: Optional[ProgressCallback] = None, validation_workers: int = 0,
+                             checkpointer: Optional[BaseCheckpointSaver] = None, events: Optional[EventRecorder] = None):
     """Factory function to create developer service"""
-    developer = DeveloperAgent(llm)
-    return developer.create_developer_graph()
+    developer = DeveloperAgent(llm, rate_limiter, modify_mode, context_budget, stream_writes, progress, validation_workers, events)
+    return developer.create_developer_graph(checkpointer)
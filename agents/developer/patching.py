@@ -0,0 +1,157 @@
+# developer/patching.py
+
+import re
+from typing import List, Optional, Tuple
+
+SEARCH_MARKER = re.compile(r'^<{5,9} ?SEARCH\s*$')
+DIVIDER_MARKER = re.compile(r'^={5,9}\s*$')
+REPLACE_MARKER = re.compile(r'^>{5,9} ?REPLACE\s*$')
+HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@')
+
+PATCH_FORMAT_INSTRUCTIONS = """Return your changes as one or more SEARCH/REPLACE blocks in exactly this format:
+<<<<<<< SEARCH
+<lines copied exactly from the current file>
+=======
+<the lines that replace them>
+>>>>>>> REPLACE
+Copy enough lines into each SEARCH section to identify a single location, and keep blocks small. An empty SEARCH section appends to the end of the file. Do NOT return the whole file, explanations or markdown wrappers."""
+
+
+class PatchError(ValueError):
+    """Raised when a model response cannot be applied as a patch"""
+
+
+def parse_search_replace(text: str) -> List[Tuple[List[str], List[str]]]:
+    """(search lines, replace lines) for every SEARCH/REPLACE block in the text"""
+    blocks = []
+    search: Optional[List[str]] = None
+    replace: Optional[List[str]] = None
+    for line in text.split('\n'):
+        if search is None:
+            if SEARCH_MARKER.match(line):
+                search = []
+        elif replace is None:
+            if DIVIDER_MARKER.match(line):
+                replace = []
+            else:
+                search.append(line)
+        elif REPLACE_MARKER.match(line):
+            blocks.append((search, replace))
+            search, replace = None, None
+        else:
+            replace.append(line)
+    if search is not None:
+        raise PatchError("unterminated SEARCH/REPLACE block")
+    return blocks
+
+
+def parse_unified_diff(text: str) -> List[Tuple[List[str], List[str], int]]:
+    """(old lines, new lines, 0-based start hint) for every hunk of a unified diff"""
+    hunks = []
+    current = None
+    for line in text.split('\n'):
+        header = HUNK_HEADER.match(line)
+        if header:
+            current = ([], [], max(int(header.group(1)) - 1, 0))
+            hunks.append(current)
+        elif current is None or line.startswith(('--- ', '+++ ', '\\')):
+            continue
+        elif line.startswith('-'):
+            current[0].append(line[1:])
+        elif line.startswith('+'):
+            current[1].append(line[1:])
+        elif line.startswith(' ') or line == '':
+            current[0].append(line[1:])
+            current[1].append(line[1:])
+        else:
+            current = None
+    # A trailing blank line after the last hunk is not context
+    for old, new, _ in hunks:
+        while old and new and old[-1] == '' and new[-1] == '':
+            old.pop()
+            new.pop()
+    return hunks
+
+
+def _leading(line: str) -> str:
+    return line[:len(line) - len(line.lstrip())]
+
+
+def _indent_offset(window: List[str], old: List[str]) -> Optional[str]:
+    """Indentation every non-blank line of `window` has on top of its line in `old`, or None if it is not uniform"""
+    offset = None
+    for actual, expected in zip(window, old):
+        if not expected.strip():
+            continue
+        actual_indent, expected_indent = _leading(actual), _leading(expected)
+        if not actual_indent.endswith(expected_indent):
+            return None
+        extra = actual_indent[:len(actual_indent) - len(expected_indent)]
+        if offset is not None and extra != offset:
+            return None
+        offset = extra
+    return offset or ''
+
+
+def locate(lines: List[str], old: List[str], hint: Optional[int] = None) -> Tuple[int, int, str]:
+    """
+    Find the one place `old` occurs in `lines` and return (start, end, extra indentation).
+
+    Tries an exact match, then one ignoring trailing whitespace, then one where
+    the file's lines are uniformly indented deeper than `old`. Lines that are
+    missing, or that occur more than once without a diff line number `hint`
+    naming one of the occurrences, raise PatchError rather than risk editing the
+    wrong place; the caller then regenerates the whole file.
+    """
+    n = len(old)
+    positions = range(len(lines) - n + 1)
+    preview = old[0].strip() if old else ''
+
+    for normalize in (lambda s: s, str.rstrip, str.strip):
+        target = [normalize(line) for line in old]
+        starts = [i for i in positions if [normalize(line) for line in lines[i:i + n]] == target
+                  and _indent_offset(lines[i:i + n], old) is not None]
+        if not starts:
+            continue
+        if len(starts) > 1 and hint not in starts:
+            raise PatchError(f"the lines to replace starting with '{preview}' occur {len(starts)} times")
+        start = starts[0] if len(starts) == 1 else hint
+        return start, start + n, _indent_offset(lines[start:start + n], old)
+
+    raise PatchError(f"could not find the lines to replace starting with '{preview}'")
+
+
+def _replace(lines: List[str], old: List[str], new: List[str], hint: Optional[int]) -> List[str]:
+    if not old:
+        # Pure insertion at the hint
+        at = min(hint or 0, len(lines))
+        return lines[:at] + new + lines[at:]
+    start, end, indent = locate(lines, old, hint)
+    new = [indent + line if line.strip() else line for line in new]
+    return lines[:start] + new + lines[end:]
+
+
+def apply_patch(content: str, response: str) -> str:
+    """
+    Apply SEARCH/REPLACE blocks or a unified diff from a model response to `content`.
+
+    Raises PatchError if the response has no edits or an edit cannot be placed
+    at exactly one location.
+    """
+    lines = content.split('\n')
+    blocks = parse_search_replace(response)
+    if blocks:
+        for old, new in blocks:
+            # An empty SEARCH appends, before the final newline if the file ends with one
+            end = len(lines) - 1 if lines and lines[-1] == '' else len(lines)
+            lines = _replace(lines, old, new, end if not old else None)
+        return '\n'.join(lines)
+
+    hunks = parse_unified_diff(response)
+    if not hunks:
+        raise PatchError("response contains neither SEARCH/REPLACE blocks nor a unified diff")
+    offset = 0
+    for old, new, hint in hunks:
+        lines = _replace(lines, old, new, hint + offset)
+        offset += len(new) - len(old)
+    return '\n'.join(lines)
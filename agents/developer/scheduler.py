@@ -0,0 +1,123 @@
+# developer/scheduler.py
+
+import os
+from typing import Dict, List, Optional, Set, Tuple
+from state import AtomicTask
+
+
+def task_files(task: AtomicTask) -> Set[str]:
+    """Normalised target paths, used to detect tasks that would write the same file"""
+    return {os.path.normpath(path) for path in task.get("target_files", [])}
+
+
+def unique_task_ids(atomic_tasks: List[AtomicTask]) -> List[AtomicTask]:
+    """
+    The tasks with repeated ids renamed, so every task is scheduled.
+
+    The first task keeps an id and later ones become "<id>-2", "<id>-3" and so
+    on. Prerequisites naming the id still point at the first task.
+    """
+    taken = {task["id"] for task in atomic_tasks}
+    seen: Set[str] = set()
+    unique = []
+    for task in atomic_tasks:
+        task_id = task["id"]
+        if task_id in seen:
+            suffix = 2
+            while f"{task_id}-{suffix}" in taken:
+                suffix += 1
+            new_id = f"{task_id}-{suffix}"
+            print(f"[DEBUG] Duplicate task id {task_id}; running the repeated task as {new_id}")
+            taken.add(new_id)
+            task = {**task, "id": new_id}
+        seen.add(task_id)
+        unique.append(task)
+    return unique
+
+
+def build_dependencies(atomic_tasks: List[AtomicTask],
+                       task_dependencies: Optional[Dict[str, List[str]]] = None) -> Dict[str, Set[str]]:
+    """Prerequisites per task id from the tasks themselves and the planner's dependency map; ids must be unique"""
+    known = {task["id"] for task in atomic_tasks}
+    dependencies = {}
+    for task in atomic_tasks:
+        task_id = task["id"]
+        prerequisites = set(task.get("prerequisites", [])) | set((task_dependencies or {}).get(task_id, []))
+        dependencies[task_id] = {p for p in prerequisites if p in known and p != task_id}
+    return dependencies
+
+
+def topological_order(atomic_tasks: List[AtomicTask],
+                      dependencies: Dict[str, Set[str]]) -> Tuple[List[str], Dict[str, Set[str]]]:
+    """
+    Task ids ordered so prerequisites come first, otherwise keeping plan order,
+    and the dependencies to schedule them with.
+
+    Dependency cycles are broken by dropping the prerequisites of the earliest
+    task still blocked, so every task is eventually scheduled. The returned
+    dependencies are a copy without those prerequisites; `dependencies` is left as is.
+    """
+    plan_order = [task["id"] for task in atomic_tasks]
+    acyclic = {task_id: set(prerequisites) for task_id, prerequisites in dependencies.items()}
+    remaining = {task_id: set(dependencies[task_id]) for task_id in plan_order}
+    order = []
+    while remaining:
+        ready = [task_id for task_id in plan_order if task_id in remaining and not remaining[task_id]]
+        if not ready:
+            blocked = next(task_id for task_id in plan_order if task_id in remaining)
+            print(f"[DEBUG] Dependency cycle involving task {blocked}; ignoring its prerequisites {sorted(remaining[blocked])}")
+            acyclic[blocked] = set()
+            ready = [blocked]
+        for task_id in ready:
+            order.append(task_id)
+            del remaining[task_id]
+        for prerequisites in remaining.values():
+            prerequisites.difference_update(ready)
+    return order, acyclic
+
+
+def blocked_by_failures(order: List[str], dependencies: Dict[str, Set[str]], settled: Set[str],
+                        failed: Set[str]) -> Dict[str, List[str]]:
+    """
+    Unsettled task id -> its failed prerequisites, for each task that can no longer run.
+
+    Skipping a task fails it too, so its own dependents are skipped in the same pass;
+    `order` lists prerequisites first.
+    """
+    unusable = set(failed)
+    blocked = {}
+    for task_id in order:
+        if task_id in settled:
+            continue
+        missing = dependencies[task_id] & unusable
+        if missing:
+            blocked[task_id] = sorted(missing)
+            unusable.add(task_id)
+    return blocked
+
+
+def next_batch(order: List[str], tasks_by_id: Dict[str, AtomicTask], dependencies: Dict[str, Set[str]],
+               settled: Set[str], max_parallel: int) -> List[AtomicTask]:
+    """
+    Tasks that can run together now, at most `max_parallel` of them.
+
+    A task is ready once all its prerequisites are settled; dependents of failed
+    tasks are settled beforehand through blocked_by_failures. Tasks sharing a
+    target file never run together, and a task waits for every earlier
+    unsettled task that writes one of its files, so writes to a file happen in
+    plan order.
+    """
+    batch = []
+    claimed: Set[str] = set()
+    blocked: Set[str] = set()
+    for task_id in order:
+        if task_id in settled:
+            continue
+        files = task_files(tasks_by_id[task_id])
+        if (len(batch) < max_parallel and dependencies[task_id] <= settled
+                and not files & claimed and not files & blocked):
+            batch.append(tasks_by_id[task_id])
+            claimed |= files
+        else:
+            blocked |= files
+    return batch
@@ -0,0 +1,178 @@
+# developer/streaming.py
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, AsyncIterable, Callable, Iterable, Optional, Tuple
+
+import aiofiles
+import aiofiles.os
+
+FENCE = "```"
+# Emit a progress event at least this often while a file is being written
+PROGRESS_INTERVAL_BYTES = 16 * 1024
+
+# progress(file path, bytes written so far, finished). The CLI prints these events
+# (main.print_write_progress); no UI consumes them yet
+ProgressCallback = Callable[[str, int, bool], None]
+
+
+def chunk_text(content: Any) -> str:
+    """Text of a message chunk whose content is a string or a list of content parts"""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(part if isinstance(part, str) else part.get("text", "") for part in content
+                       if isinstance(part, str) or isinstance(part, dict))
+    return str(content)
+
+
+class FenceStripper:
+    """
+    Removes a markdown code fence wrapped around streamed file content.
+
+    Feed chunks as they arrive and write what each call returns. When the
+    response opens with a fence, its header line is dropped and the last line
+    is held back until finish() shows whether it is the closing fence; the
+    held text is never more than the final line plus trailing whitespace.
+    Responses without an opening fence pass through unchanged.
+    """
+
+    def __init__(self):
+        self._state = "start"  # start -> header -> body, or start -> plain
+        self._pending = ""
+
+    def feed(self, text: str) -> str:
+        if self._state == "plain":
+            return text
+        self._pending += text
+
+        if self._state == "start":
+            stripped = self._pending.lstrip()
+            if len(stripped) < len(FENCE) and FENCE.startswith(stripped):
+                return ""
+            if not stripped.startswith(FENCE):
+                self._state = "plain"
+                out, self._pending = self._pending, ""
+                return out
+            self._state = "header"
+            self._pending = stripped
+
+        if self._state == "header":
+            newline = self._pending.find('\n')
+            if newline < 0:
+                return ""
+            self._state = "body"
+            self._pending = self._pending[newline + 1:]
+
+        cut = self._pending.rstrip().rfind('\n')
+        if cut < 0:
+            return ""
+        out, self._pending = self._pending[:cut], self._pending[cut:]
+        return out
+
+    def finish(self) -> str:
+        """Whatever is still held back once the stream has ended"""
+        out, self._pending = self._pending, ""
+        if self._state in ("header", "body") and (not out.strip() or out.rstrip().endswith(FENCE)):
+            # The closing fence, or only whitespace after a fence with no body
+            return ""
+        return out
+
+
+def strip_fence(text: str) -> str:
+    """FenceStripper over a complete response, so whole and streamed writes clean up alike"""
+    stripper = FenceStripper()
+    return stripper.feed(text) + stripper.finish()
+
+
+class _WriteProgress:
+    """Counts bytes written to one file and decides when to emit a progress event"""
+
+    def __init__(self, file_path: Path, progress: Optional[ProgressCallback]):
+        self.file_path = str(file_path)
+        self.progress = progress
+        self.written = 0
+        self._reported = 0
+
+    def add(self, text: str) -> bool:
+        """Count `text`; True when an intermediate event is due"""
+        self.written += len(text.encode('utf-8'))
+        return self.progress is not None and self.written - self._reported >= PROGRESS_INTERVAL_BYTES
+
+    def report(self, done: bool = False) -> None:
+        self._reported = self.written
+        if self.progress is not None:
+            self.progress(self.file_path, self.written, done)
+
+
+def _temp_file(file_path: Path) -> Tuple[int, str]:
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    return tempfile.mkstemp(dir=str(file_path.parent), prefix=f".{file_path.name}.", suffix=".tmp")
+
+
+def stream_to_file(chunks: Iterable[str], file_path: Path, progress: Optional[ProgressCallback] = None,
+                   strip_fences: bool = True) -> int:
+    """
+    Write streamed text to `file_path` atomically and return the bytes written.
+
+    Text goes to a temporary file in the same directory, which replaces the
+    target only once the stream completes, so readers never see a partial file
+    and a failed stream leaves any previous version in place.
+    """
+    stripper = FenceStripper() if strip_fences else None
+    tracker = _WriteProgress(file_path, progress)
+    fd, temp_path = _temp_file(file_path)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            def write(text: str) -> None:
+                if text:
+                    f.write(text)
+                    if tracker.add(text):
+                        f.flush()
+                        tracker.report()
+
+            for text in chunks:
+                write(stripper.feed(text) if stripper else text)
+            if stripper:
+                write(stripper.finish())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    tracker.report(done=True)
+    return tracker.written
+
+
+async def astream_to_file(chunks: AsyncIterable[str], file_path: Path, progress: Optional[ProgressCallback] = None,
+                          strip_fences: bool = True) -> int:
+    """Async stream_to_file: awaits the chunks and writes through aiofiles"""
+    stripper = FenceStripper() if strip_fences else None
+    tracker = _WriteProgress(file_path, progress)
+    fd, temp_path = _temp_file(file_path)
+    os.close(fd)
+    try:
+        async with aiofiles.open(temp_path, 'w', encoding='utf-8') as f:
+            async def write(text: str) -> None:
+                if text:
+                    await f.write(text)
+                    if tracker.add(text):
+                        await f.flush()
+                        tracker.report()
+
+            async for text in chunks:
+                await write(stripper.feed(text) if stripper else text)
+            if stripper:
+                await write(stripper.finish())
+        await aiofiles.os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    tracker.report(done=True)
+    return tracker.written
@@ -0,0 +1,240 @@
+# developer/validation.py
+
+import re
+import json
+import asyncio
+import warnings
+import multiprocessing
+from pathlib import Path
+from html.parser import HTMLParser
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, Tuple
+
+from state import ValidationIssue
+from search.clients import get_client, drop_client
+
+try:
+    import yaml
+except ImportError:  # YAML files are only checked when PyYAML is installed
+    yaml = None
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+# Elements that never have a closing tag
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"
+}
+# Elements whose closing tag HTML lets authors leave out
+OPTIONAL_END_ELEMENTS = {
+    "html", "head", "body", "p", "li", "dt", "dd", "option", "optgroup", "tr", "td", "th",
+    "thead", "tbody", "tfoot", "colgroup", "caption", "rb", "rt", "rtc", "rp"
+}
+TOML_POSITION = re.compile(r'at line (\d+)')
+# A pool whose worker died is replaced this many times per call before files are checked in-process
+POOL_REBUILDS = 1
+
+
+class HTMLBalanceChecker(HTMLParser):
+    """Reports closing tags without an open element and elements that are never closed"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack: List[Tuple[str, int]] = []
+        self.problems: List[Tuple[int, str]] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in VOID_ELEMENTS:
+            self.stack.append((tag, self.getpos()[0]))
+
+    def handle_startendtag(self, tag, attrs):
+        pass
+
+    def handle_endtag(self, tag):
+        line = self.getpos()[0]
+        if tag in VOID_ELEMENTS:
+            return
+        if not any(open_tag == tag for open_tag, _ in self.stack):
+            self.problems.append((line, f"closing tag </{tag}> has no matching <{tag}>"))
+            return
+        while self.stack:
+            open_tag, opened_at = self.stack.pop()
+            if open_tag == tag:
+                break
+            self._unclosed(open_tag, opened_at)
+
+    def close(self):
+        super().close()
+        while self.stack:
+            self._unclosed(*self.stack.pop())
+
+    def _unclosed(self, tag: str, line: int) -> None:
+        if tag not in OPTIONAL_END_ELEMENTS:
+            self.problems.append((line, f"<{tag}> is never closed"))
+
+
+def _check_python(text: str, display_path: str) -> List[Tuple[int, str]]:
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            compile(text, display_path, "exec", dont_inherit=True)
+    except SyntaxError as e:
+        return [(e.lineno or 0, f"{type(e).__name__}: {e.msg}")]
+    except ValueError as e:
+        return [(0, str(e))]
+    return []
+
+
+def _check_json(text: str, display_path: str) -> List[Tuple[int, str]]:
+    try:
+        json.loads(text)
+    except json.JSONDecodeError as e:
+        return [(e.lineno, e.msg)]
+    return []
+
+
+def _check_yaml(text: str, display_path: str) -> List[Tuple[int, str]]:
+    if yaml is None:
+        return []
+    try:
+        # Composing checks the syntax without constructing objects, so custom tags are fine
+        for _ in yaml.compose_all(text, Loader=yaml.SafeLoader):
+            pass
+    except yaml.MarkedYAMLError as e:
+        mark = e.problem_mark or e.context_mark
+        return [(mark.line + 1 if mark else 0, e.problem or str(e))]
+    except yaml.YAMLError as e:
+        return [(0, str(e))]
+    return []
+
+
+def _check_toml(text: str, display_path: str) -> List[Tuple[int, str]]:
+    if tomllib is None:
+        return []
+    try:
+        tomllib.loads(text)
+    except tomllib.TOMLDecodeError as e:
+        position = TOML_POSITION.search(str(e))
+        return [(int(position.group(1)) if position else 0, str(e))]
+    return []
+
+
+def _check_html(text: str, display_path: str) -> List[Tuple[int, str]]:
+    checker = HTMLBalanceChecker()
+    checker.feed(text)
+    checker.close()
+    return checker.problems
+
+
+CHECKERS: Dict[str, Tuple[str, Callable[[str, str], List[Tuple[int, str]]]]] = {
+    ".py": ("python", _check_python),
+    ".json": ("json", _check_json),
+    ".yaml": ("yaml", _check_yaml),
+    ".yml": ("yaml", _check_yaml),
+    ".toml": ("toml", _check_toml),
+    ".html": ("html", _check_html),
+    ".htm": ("html", _check_html),
+}
+
+
+def check_file(file_path: str, display_path: str) -> List[ValidationIssue]:
+    """Parse one file with the checker for its extension; runs in a worker process"""
+    checker_name, checker = CHECKERS[Path(file_path).suffix.lower()]
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    except UnicodeDecodeError as e:
+        return [ValidationIssue(file_path=display_path, line=0, message=f"not valid UTF-8: {e}", checker=checker_name)]
+    return [ValidationIssue(file_path=display_path, line=line, message=message, checker=checker_name)
+            for line, message in checker(text, display_path)]
+
+
+def format_issue(issue: ValidationIssue) -> str:
+    location = f"{issue['file_path']}:{issue['line']}" if issue["line"] else issue["file_path"]
+    return f"{location}: {issue['message']}"
+
+
+def _validation_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    The shared pool of `workers` processes, started on first use.
+
+    Spawned workers are safe to start from the developer's worker threads, unlike
+    forked ones. A spawned worker re-imports the parent's `__main__` module, so a
+    script that validates files must keep its entry point under
+    `if __name__ == "__main__":` (as main.py and batch.py do); without the guard
+    every worker reruns the script and the pool breaks.
+    """
+    return get_client(
+        f"validation_pool:{workers}",
+        lambda: ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    )
+
+
+def _evict_pool(workers: int, pool: ProcessPoolExecutor, error: BrokenProcessPool) -> None:
+    """Drop a broken pool from the registry so the next call starts a fresh one"""
+    print(f"[DEBUG] Validation pool broke ({error}); starting a new one.")
+    drop_client(f"validation_pool:{workers}", pool)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _jobs(workspace_path: Path, relative_paths: List[str]) -> List[Tuple[str, str]]:
+    """(absolute path, workspace-relative path) of every file there is a checker for"""
+    return [(str(workspace_path / path), path) for path in dict.fromkeys(relative_paths)
+            if Path(path).suffix.lower() in CHECKERS and (workspace_path / path).is_file()]
+
+
+def validate_files(workspace_path: Path, relative_paths: List[str], workers: int) -> List[ValidationIssue]:
+    """
+    Check every written file that has a checker, in a shared process pool.
+
+    Files with other extensions, or that no longer exist, are skipped. Issues
+    come back in the order of `relative_paths`.
+    """
+    jobs = _jobs(workspace_path, relative_paths)
+    if not jobs:
+        return []
+
+    workers = max(workers, 1)
+    results: Optional[List[List[ValidationIssue]]] = None
+    for _ in range(POOL_REBUILDS + 1):
+        try:
+            pool = _validation_pool(workers)
+            results = list(pool.map(check_file, *zip(*jobs)))
+            break
+        except BrokenProcessPool as e:
+            _evict_pool(workers, pool, e)
+        except OSError as e:
+            print(f"[DEBUG] Validation pool unavailable ({e}); checking files in-process.")
+            break
+    if results is None:
+        results = [check_file(file_path, display_path) for file_path, display_path in jobs]
+    return [issue for issues in results for issue in issues]
+
+
+async def avalidate_files(workspace_path: Path, relative_paths: List[str], workers: int) -> List[ValidationIssue]:
+    """validate_files for coroutines: awaits the pool instead of blocking the event loop"""
+    jobs = _jobs(workspace_path, relative_paths)
+    if not jobs:
+        return []
+
+    workers = max(workers, 1)
+    results: Optional[List[List[ValidationIssue]]] = None
+    for _ in range(POOL_REBUILDS + 1):
+        try:
+            pool = _validation_pool(workers)
+            results = await asyncio.gather(*(asyncio.wrap_future(pool.submit(check_file, *job)) for job in jobs))
+            break
+        except BrokenProcessPool as e:
+            _evict_pool(workers, pool, e)
+        except OSError as e:
+            print(f"[DEBUG] Validation pool unavailable ({e}); checking files in a thread.")
+            break
+    if results is None:
+        results = await asyncio.to_thread(lambda: [check_file(*job) for job in jobs])
+    return [issue for issues in results for issue in issues]
@@ -0,0 +1,226 @@
+# events.py
+
+import os
+import sys
+import time
+import hashlib
+import threading
+from enum import Enum
+from pathlib import Path
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Events kept per log when the session does not configure a cap
+DEFAULT_EVENT_LOG_CAP = 200
+# Characters of a spilled payload kept inline as a preview
+PREVIEW_CHARS = 160
+# A blob store over its cap evicts down to this fraction of it, so the next few writes do not rescan
+BLOB_EVICT_TO = 0.9
+
+
+class EventKind(str, Enum):
+    SESSION_STARTED = "session_started"
+    PLAN_CREATED = "plan_created"
+    TASK_SUCCEEDED = "task_succeeded"
+    TASK_FAILED = "task_failed"
+    RESEARCH_QUERY = "research_query"
+    SEARCH_RESULT = "search_result"
+    PAGE_CONTENT = "page_content"
+    CONCLUSION = "conclusion"
+    FEEDBACK = "feedback"
+
+
+class Event:
+    """
+    One entry of an event log.
+
+    `source` is the node that recorded it and `subject` what it is about, such
+    as a task id; both are interned since the same few values repeat across a
+    session. A long `text` lives in the blob store under `blob`, with only a
+    preview kept inline.
+    """
+    __slots__ = ('kind', 'source', 'subject', 'text', 'blob', 'timestamp')
+
+    def __init__(self, kind: Union[EventKind, str], source: str, subject: str = "", text: str = "",
+                 blob: Optional[str] = None, timestamp: Optional[float] = None):
+        self.kind = EventKind(kind)
+        self.source = sys.intern(source)
+        self.subject = sys.intern(subject)
+        self.text = text
+        self.blob = blob
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def _asdict(self) -> Dict[str, Any]:
+        # LangGraph's checkpoint serializer stores objects with _asdict as their constructor arguments
+        return {
+            "kind": self.kind.value, "source": self.source, "subject": self.subject,
+            "text": self.text, "blob": self.blob, "timestamp": self.timestamp
+        }
+
+    def payload(self, blobs: Optional["BlobStore"] = None) -> str:
+        """The full text, read back from `blobs` if it was spilled there"""
+        if self.blob is None or blobs is None:
+            return self.text
+        stored = blobs.get(self.blob)
+        return self.text if stored is None else stored
+
+    def __repr__(self) -> str:
+        subject = f" {self.subject}" if self.subject else ""
+        blob = f" [blob {self.blob[:12]}]" if self.blob else ""
+        return f"<Event {self.kind.value} from {self.source}{subject}: {self.text[:40]!r}{blob}>"
+
+
+class EventLog:
+    """
+    The newest `cap` events of a session, oldest first.
+
+    A ring buffer, so state size stays bounded however long the session runs;
+    `dropped` counts the events it has pushed out. Logs are never changed in
+    place: appended() returns a new log, which keeps earlier checkpoints intact.
+    """
+    __slots__ = ('cap', 'events', 'dropped')
+
+    def __init__(self, cap: int = DEFAULT_EVENT_LOG_CAP, events: Iterable[Event] = (), dropped: int = 0):
+        self.cap = max(cap, 1)
+        self.events = deque(events, maxlen=self.cap)
+        self.dropped = dropped
+
+    def appended(self, new_events: Iterable[Event]) -> "EventLog":
+        log = EventLog(self.cap, self.events, self.dropped)
+        for event in new_events:
+            if len(log.events) == log.cap:
+                log.dropped += 1
+            log.events.append(event)
+        return log
+
+    def __iter__(self) -> Iterator[Event]:
+        return iter(self.events)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __getstate__(self):
+        return self.cap, list(self.events), self.dropped
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def _asdict(self) -> Dict[str, Any]:
+        return {"cap": self.cap, "events": list(self.events), "dropped": self.dropped}
+
+    def __repr__(self) -> str:
+        return f"<EventLog {len(self.events)}/{self.cap} events, {self.dropped} dropped>"
+
+
+def append_events(left: Optional[EventLog], right: Union[EventLog, Iterable[Event]]) -> EventLog:
+    """Reducer for event log fields: nodes return their new events, or an EventLog to start a fresh one"""
+    if isinstance(right, EventLog):
+        return right
+    return (left if left is not None else EventLog()).appended(right)
+
+
+class BlobStore:
+    """
+    Content-addressed text store: each payload is written once, under its SHA-256.
+
+    Files are sharded into subdirectories by the first two hex digits. Writing a
+    payload that is already stored costs only a hash and a stat. With `max_bytes`,
+    the least recently written or read blobs are deleted once the store outgrows
+    it; an event whose blob is gone falls back to its inline preview.
+    """
+
+    def __init__(self, directory: Path, max_bytes: Optional[int] = None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total: Optional[int] = None  # Bytes stored, counted on the first write
+
+    def _path(self, digest: str) -> Path:
+        return self.directory / digest[:2] / digest
+
+    def _touch(self, path: Path) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def put(self, text: str) -> str:
+        data = text.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if path.exists():
+            self._touch(path)
+            return digest
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.parent / f".{digest}.{threading.get_ident()}.tmp"
+            tmp_path.write_bytes(data)
+            tmp_path.replace(path)
+            if self.max_bytes is not None:
+                # The first count is a scan, which already includes the new blob
+                self._total = self._usage()[1] if self._total is None else self._total + len(data)
+                if self._total > self.max_bytes:
+                    self._evict(keep=path)
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        path = self._path(digest)
+        try:
+            text = path.read_text(encoding='utf-8')
+        except OSError:
+            return None
+        self._touch(path)
+        return text
+
+    def _usage(self) -> Tuple[List[Tuple[int, int, Path]], int]:
+        """(mtime, size, path) of every stored blob, and their total size"""
+        blobs = []
+        for path in self.directory.glob("??/*"):
+            if path.name.startswith("."):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            blobs.append((stat.st_mtime_ns, stat.st_size, path))
+        return blobs, sum(size for _, size, _ in blobs)
+
+    def _evict(self, keep: Path) -> None:
+        # Rescanned rather than trusted, since other processes may share the directory
+        blobs, total = self._usage()
+        target = self.max_bytes * BLOB_EVICT_TO
+        for _, size, path in sorted(blobs, key=lambda blob: blob[0]):
+            if total <= target:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+        self._total = total
+
+
+class EventRecorder:
+    """Builds events, moving text longer than `inline_chars` to the blob store"""
+
+    def __init__(self, blobs: Optional[BlobStore] = None, inline_chars: int = 1024):
+        self.blobs = blobs
+        self.inline_chars = inline_chars
+
+    def record(self, kind: EventKind, source: str, subject: str = "", text: str = "") -> Event:
+        if self.blobs is None or len(text) <= self.inline_chars:
+            return Event(kind, source, subject, text)
+        try:
+            digest = self.blobs.put(text)
+        except OSError as e:
+            print(f"[DEBUG] Could not store event payload ({e}); keeping it inline.")
+            return Event(kind, source, subject, text)
+        return Event(kind, source, subject, text[:PREVIEW_CHARS], digest)
@@ -0,0 +1,158 @@
+# llm/cache.py
+
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Iterator, AsyncIterator, Optional
+from langchain_core.messages import (
+    BaseMessage, AIMessageChunk, convert_to_messages, message_to_dict, messages_from_dict
+)
+
+
+class LLMResponseCache:
+    """
+    SQLite store of chat responses with least-recently-used eviction by total size.
+
+    Safe to share between threads and between processes using the same file.
+    """
+
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    def get(self, key: str) -> Optional[BaseMessage]:
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        return messages_from_dict([json.loads(row[0])])[0]
+
+    def put(self, key: str, message: BaseMessage) -> None:
+        data = json.dumps(message_to_dict(message))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time())
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+class CachedChatModel:
+    """
+    Wraps a chat model so identical requests are answered from an LLMResponseCache.
+
+    Requests are keyed on model, temperature and the serialized messages. Anything
+    other than invoke/ainvoke/stream/astream is passed through to the wrapped model.
+    """
+
+    def __init__(self, llm: Any, cache: LLMResponseCache, model: str, temperature: float):
+        self.llm = llm
+        self.cache = cache
+        self.model = model
+        self.temperature = temperature
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+    def _key(self, messages: Any, kwargs: dict) -> str:
+        payload = {
+            "model": self.model,
+            "temperature": self.temperature,
+            "messages": [message_to_dict(message) for message in convert_to_messages(messages)],
+            "kwargs": kwargs
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[BaseMessage]:
+        try:
+            cached = self.cache.get(key)
+        except Exception as e:
+            print(f"[DEBUG] LLM cache lookup failed: {e}")
+            cached = None
+        with self._stats_lock:
+            if cached is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return cached
+
+    def _store(self, key: str, message: BaseMessage) -> None:
+        try:
+            self.cache.put(key, message)
+        except Exception as e:
+            print(f"[DEBUG] LLM cache write failed: {e}")
+
+    def invoke(self, messages: Any, config: Optional[dict] = None, **kwargs: Any) -> BaseMessage:
+        key = self._key(messages, kwargs)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        response = self.llm.invoke(messages, config, **kwargs)
+        self._store(key, response)
+        return response
+
+    async def ainvoke(self, messages: Any, config: Optional[dict] = None, **kwargs: Any) -> BaseMessage:
+        key = self._key(messages, kwargs)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        response = await self.llm.ainvoke(messages, config, **kwargs)
+        self._store(key, response)
+        return response
+
+    def stream(self, messages: Any, config: Optional[dict] = None, **kwargs: Any) -> Iterator[BaseMessage]:
+        """Replays a cached response as one chunk; otherwise streams and stores the joined chunks"""
+        key = self._key(messages, kwargs)
+        cached = self._lookup(key)
+        if cached is not None:
+            yield AIMessageChunk(content=cached.content, response_metadata=cached.response_metadata)
+            return
+        joined = None
+        for chunk in self.llm.stream(messages, config, **kwargs):
+            joined = chunk if joined is None else joined + chunk
+            yield chunk
+        if joined is not None:
+            self._store(key, joined)
+
+    async def astream(self, messages: Any, config: Optional[dict] = None, **kwargs: Any) -> AsyncIterator[BaseMessage]:
+        key = self._key(messages, kwargs)
+        cached = self._lookup(key)
+        if cached is not None:
+            yield AIMessageChunk(content=cached.content, response_metadata=cached.response_metadata)
+            return
+        joined = None
+        async for chunk in self.llm.astream(messages, config, **kwargs):
+            joined = chunk if joined is None else joined + chunk
+            yield chunk
+        if joined is not None:
+            self._store(key, joined)
+
+    def stats(self) -> str:
+        return f"{self.hits} hit(s), {self.misses} miss(es)"
@@ -0,0 +1,92 @@
+# llm/rate_limit.py
+
+import time
+import asyncio
+import threading
+from collections import deque
+
+
+class RateLimiter:
+    """
+    Caps in-flight LLM requests and optionally spaces their start times.
+
+    One instance is shared by every thread issuing requests, so parallel tasks
+    and parallel files together never exceed `max_concurrent` calls or
+    `requests_per_minute`. Use as a context manager around each call, or as an
+    async context manager from coroutines; both draw on the same slots, and
+    coroutines wait without blocking their event loop.
+    """
+
+    def __init__(self, max_concurrent: int, requests_per_minute: float = 0):
+        self.max_concurrent = max(max_concurrent, 1)
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+        self._async_waiters = deque()  # (loop, future) of coroutines waiting for a slot
+
+    def _start_delay(self) -> float:
+        """Seconds until this request may start, reserving its place in the spacing schedule"""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        return start - now
+
+    def _release(self) -> None:
+        self._slots.release()
+        self._wake_next()
+
+    def _wake_next(self) -> None:
+        """Tell the longest-waiting coroutine, if any, that a slot may be free"""
+        with self._lock:
+            waiter = self._async_waiters.popleft() if self._async_waiters else None
+        if waiter is not None:
+            loop, future = waiter
+            try:
+                loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+            except RuntimeError:
+                pass  # The waiter's loop has closed
+
+    def __enter__(self) -> "RateLimiter":
+        self._slots.acquire()
+        time.sleep(self._start_delay())
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._release()
+
+    async def __aenter__(self) -> "RateLimiter":
+        loop = asyncio.get_running_loop()
+        while not self._slots.acquire(blocking=False):
+            waiter = (loop, loop.create_future())
+            with self._lock:
+                self._async_waiters.append(waiter)
+            # A slot freed before we registered would otherwise never wake us
+            if self._slots.acquire(blocking=False):
+                with self._lock:
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+                break
+            try:
+                await waiter[1]
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+                        waiter = None
+                if waiter is not None:
+                    # We were woken for a slot we will not take; pass the wake-up on
+                    self._wake_next()
+                raise
+        try:
+            await asyncio.sleep(self._start_delay())
+        except asyncio.CancelledError:
+            self._release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._release()
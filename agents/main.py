@@ -4,11 +4,14 @@ import os
 import uuid
 import sys
 import argparse
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
-from langchain_google_genai import ChatGoogleGenerativeAI
+from contextlib import contextmanager, asynccontextmanager
 from langgraph.graph import StateGraph, START, END
-from langchain_core.messages import HumanMessage, AIMessage
+from langgraph.checkpoint.base import BaseCheckpointSaver, CheckpointTuple
+from langgraph.types import StateSnapshot
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langchain_core.runnables import RunnableLambda
 
 # Use the config.py module as the source of truth for configuration
 import config as app_config
@@ -16,23 +19,66 @@ from state import (
     OverallState, PlannerState, DeveloperState,
     WorkflowConfig, AtomicTask, TaskType
 )
+from events import Event, EventLog, EventKind, EventRecorder, BlobStore
 
 from planner.planner import create_planner_service
 from developer.developer import create_developer_service
+from developer.streaming import ProgressCallback
+from llm.cache import LLMResponseCache, CachedChatModel
+from llm.rate_limit import RateLimiter
+from search.clients import get_client
+
+
+def print_write_progress(file_path: str, bytes_written: int, done: bool) -> None:
+    """Default progress callback: report streamed file writes on the console"""
+    status = "written" if done else "streaming"
+    print(f"[PROGRESS] {file_path}: {bytes_written} bytes {status}")
 
 
 class MainOrchestrator:
-    def __init__(self, config: WorkflowConfig):
+    def __init__(self, config: WorkflowConfig, progress: Optional[ProgressCallback] = None, llm: Optional[Any] = None,
+                 rate_limiter: Optional[RateLimiter] = None, checkpointer: Optional[BaseCheckpointSaver] = None):
+        """
+        `llm` replaces the chat model built from the config and `rate_limiter` the
+        per-session limiter, e.g. to share one client and one request budget across sessions.
+        With a `checkpointer`, the main graph and the developer graph save their state
+        after every step, keyed by the session id, so an interrupted session can resume.
+        """
         self.config = config
-        self.llm = ChatGoogleGenerativeAI(
-            model=config["model_name"],
-            temperature=config["temperature"],
+        self.checkpointer = checkpointer
+        if llm is None:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            llm = ChatGoogleGenerativeAI(
+                model=config["model_name"],
+                temperature=config["temperature"],
+            )
+        self.llm = llm
+        if config.get("llm_cache_enabled", app_config.LLM_CACHE_ENABLED):
+            cache_path = config.get("llm_cache_path", app_config.LLM_CACHE_PATH)
+            max_bytes = config.get("llm_cache_max_mb", app_config.LLM_CACHE_MAX_MB) * 1024 * 1024
+            cache = get_client(f"llm_cache:{cache_path}", lambda: LLMResponseCache(cache_path, max_bytes))
+            self.llm = CachedChatModel(self.llm, cache, config["model_name"], config["temperature"])
+        self.event_log_cap = config.get("event_log_cap", app_config.EVENT_LOG_CAP)
+        blob_dir = config.get("event_blob_dir", app_config.EVENT_BLOB_DIR)
+        blob_max_bytes = config.get("event_blob_max_mb", app_config.EVENT_BLOB_MAX_MB) * 1024 * 1024
+        self.events = EventRecorder(
+            get_client(f"blob_store:{blob_dir}", lambda: BlobStore(Path(blob_dir), blob_max_bytes)),
+            config.get("event_inline_chars", app_config.EVENT_INLINE_CHARS)
         )
         self.planner_graph = create_planner_service(self.llm)
-        self.developer_graph = create_developer_service(self.llm)
+        self.rate_limiter = rate_limiter or RateLimiter(
+            config.get("llm_max_concurrency", app_config.LLM_MAX_CONCURRENCY),
+            config.get("llm_requests_per_minute", app_config.LLM_REQUESTS_PER_MINUTE)
+        )
+        self.developer_graph = create_developer_service(
+            self.llm, self.rate_limiter, config.get("modify_mode", app_config.MODIFY_MODE),
+            config.get("context_token_budget", app_config.CONTEXT_TOKEN_BUDGET),
+            config.get("stream_writes", app_config.STREAM_WRITES), progress or print_write_progress,
+            config.get("validation_workers", app_config.VALIDATION_WORKERS), checkpointer, self.events
+        )
 
     def initialize_session(self, state: OverallState) -> Dict[str, Any]:
-        session_id = str(uuid.uuid4())
+        session_id = state.get("session_id") or str(uuid.uuid4())
         planner_state = PlannerState(
             user_task=state["user_task"],
             workspace_path=state["workspace_path"],
@@ -42,18 +88,26 @@ class MainOrchestrator:
         developer_state = DeveloperState(
             atomic_tasks=[],
             workspace_path=state["workspace_path"],
-            max_retries=self.config.get("max_retries", 3)
+            max_retries=self.config.get("max_retries", 3),
+            max_parallel_tasks=self.config.get("max_parallel_tasks", app_config.MAX_PARALLEL_TASKS),
+            validation_results=EventLog(self.event_log_cap)
         )
-        init_message = HumanMessage(content=f"Session initialized for task: {state['user_task']}")
+        started = self.events.record(EventKind.SESSION_STARTED, "initialize", session_id, state["user_task"])
         return {
-            **state, "session_id": session_id, "planner_state": planner_state,
+            "session_id": session_id, "planner_state": planner_state,
             "developer_state": developer_state, "current_service": "planner",
-            "execution_log": [init_message], "completed_tasks": [],
+            "execution_log": EventLog(self.event_log_cap, [started]), "completed_tasks": [],
         }
 
     def run_planner(self, state: OverallState) -> Dict[str, Any]:
         print("\n--- Running Planner ---")
-        result = self.planner_graph.invoke(state["planner_state"])
+        return self._planner_done(state, self.planner_graph.invoke(state["planner_state"]))
+
+    async def arun_planner(self, state: OverallState) -> Dict[str, Any]:
+        print("\n--- Running Planner ---")
+        return self._planner_done(state, await self.planner_graph.ainvoke(state["planner_state"]))
+
+    def _planner_done(self, state: OverallState, result: PlannerState) -> Dict[str, Any]:
         atomic_tasks = result.get("atomic_tasks", [])
         
         if atomic_tasks:
@@ -62,29 +116,62 @@ class MainOrchestrator:
         else:
             print(f"[DEBUG] Planner failed to produce a valid plan. The orchestrator will create a recovery task.")
 
-        log_message = AIMessage(content=f"Planner phase complete. Found {len(atomic_tasks)} tasks.")
-        return { **state, "planner_state": result, "execution_log": list(state["execution_log"]) + [log_message] }
+        planned = self.events.record(EventKind.PLAN_CREATED, "run_planner", text=f"Found {len(atomic_tasks)} tasks.")
+        return {"planner_state": result, "execution_log": [planned]}
 
     def prepare_developer(self, state: OverallState) -> Dict[str, Any]:
         print("\n--- Preparing Developer ---")
         atomic_tasks = state["planner_state"].get("atomic_tasks", [])
         print(f"[DEBUG] Preparing developer with {len(atomic_tasks)} task(s).")
-        updated_developer_state = {**state["developer_state"], "atomic_tasks": atomic_tasks}
-        return {**state, "developer_state": updated_developer_state}
+        task_dependencies = state["planner_state"].get("task_dependencies", {})
+        updated_developer_state = {**state["developer_state"], "atomic_tasks": atomic_tasks, "task_dependencies": task_dependencies}
+        return {"developer_state": updated_developer_state}
 
     def run_developer(self, state: OverallState) -> Dict[str, Any]:
         print("\n--- Running Developer ---")
         developer_state = state["developer_state"]
         if not developer_state.get("atomic_tasks"):
             print("[DEBUG] Developer has no tasks to run. Finalizing.")
-            return {**state, "current_service": "complete"}
-            
-        result = self.developer_graph.invoke(developer_state)
+            return {"current_service": "complete"}
+        thread = self._developer_thread(state)
+        saved = self.developer_graph.get_state(thread) if thread else None
+        if self._developer_finished(saved):
+            return self._developer_done(state, saved.values)
+        return self._developer_done(state, self.developer_graph.invoke(self._developer_input(state, saved), thread, durability=_durability(thread)))
+
+    async def arun_developer(self, state: OverallState) -> Dict[str, Any]:
+        print("\n--- Running Developer ---")
+        developer_state = state["developer_state"]
+        if not developer_state.get("atomic_tasks"):
+            print("[DEBUG] Developer has no tasks to run. Finalizing.")
+            return {"current_service": "complete"}
+        thread = self._developer_thread(state)
+        saved = await self.developer_graph.aget_state(thread) if thread else None
+        if self._developer_finished(saved):
+            return self._developer_done(state, saved.values)
+        return self._developer_done(state, await self.developer_graph.ainvoke(self._developer_input(state, saved), thread, durability=_durability(thread)))
+
+    def _developer_thread(self, state: OverallState) -> Optional[Dict[str, Any]]:
+        """The developer graph checkpoints under its own thread, next to the session's"""
+        if self.checkpointer is None:
+            return None
+        return session_thread(f"{state['session_id']}:developer")
+
+    def _developer_finished(self, saved: Optional[StateSnapshot]) -> bool:
+        """A developer run that completed before the session was interrupted"""
+        return saved is not None and bool(saved.values) and not saved.next
+
+    def _developer_input(self, state: OverallState, saved: Optional[StateSnapshot]) -> Optional[DeveloperState]:
+        """None continues an interrupted developer run from its last checkpoint, so settled tasks are not redone"""
+        if saved is not None and saved.next:
+            completed = sum(1 for done in saved.values.get("task_completion_status", {}).values() if done)
+            print(f"[INFO] Resuming developer with {completed} task(s) already complete.")
+            return None
+        return state["developer_state"]
+
+    def _developer_done(self, state: OverallState, result: DeveloperState) -> Dict[str, Any]:
         completed_tasks = [t for t in result.get("atomic_tasks", []) if result.get("task_completion_status", {}).get(t["id"])]
-        return {
-            **state, "developer_state": result,
-            "completed_tasks": completed_tasks, "current_service": "complete"
-        }
+        return {"developer_state": result, "completed_tasks": completed_tasks, "current_service": "complete"}
 
     def finalize_session(self, state: OverallState) -> Dict[str, Any]:
         print("\n--- Finalizing Session ---")
@@ -95,6 +182,7 @@ class MainOrchestrator:
         files_modified = dev_state.get("files_modified", [])
         errors = dev_state.get("errors_encountered", [])
         success = completed_count > 0 and not errors
+        llm_cache = self.llm.stats() if isinstance(self.llm, CachedChatModel) else "disabled"
         summary = f"""
 Development Session Complete:
 - Task: {state['user_task']}
@@ -104,8 +192,9 @@ Development Session Complete:
 - Files Created ({len(files_created)}): {', '.join(files_created) or 'None'}
 - Files Modified ({len(files_modified)}): {', '.join(files_modified) or 'None'}
 - Errors Encountered ({len(errors)}): {', '.join(errors) or 'None'}
+- LLM Cache: {llm_cache}
         """.strip()
-        return {**state, "final_summary": summary, "success": success}
+        return {"final_summary": summary, "success": success}
 
     def route_after_planner(self, state: OverallState) -> str:
         """
@@ -145,9 +234,10 @@ Development Session Complete:
     def create_main_graph(self):
         workflow = StateGraph(OverallState)
         workflow.add_node("initialize", self.initialize_session)
-        workflow.add_node("run_planner", self.run_planner)
+        # Nodes that wait on the LLM have async twins, used when the graph runs under ainvoke
+        workflow.add_node("run_planner", RunnableLambda(self.run_planner, afunc=self.arun_planner))
         workflow.add_node("prepare_developer", self.prepare_developer)
-        workflow.add_node("run_developer", self.run_developer)
+        workflow.add_node("run_developer", RunnableLambda(self.run_developer, afunc=self.arun_developer))
         workflow.add_node("finalize", self.finalize_session)
         
         workflow.add_edge(START, "initialize")
@@ -165,41 +255,224 @@ Development Session Complete:
         workflow.add_edge("prepare_developer", "run_developer")
         workflow.add_edge("run_developer", "finalize")
         workflow.add_edge("finalize", END)
-        return workflow.compile()
+        return workflow.compile(checkpointer=self.checkpointer)
+
+# Persist each step before the next one starts, so a crash loses at most the step in flight
+CHECKPOINT_DURABILITY = "sync"
+# Checkpoints restore these types besides LangGraph's built-in safe ones
+CHECKPOINT_SERDE = JsonPlusSerializer(allowed_msgpack_modules=[
+    (cls.__module__, cls.__name__) for cls in (TaskType, EventKind, Event, EventLog)
+])
 
-def run_development_workflow(user_task: str, workspace_path: str, config: WorkflowConfig) -> Dict[str, Any]:
+def _durability(checkpointing: Any) -> Optional[str]:
+    # LangGraph rejects sync durability on a graph without a checkpointer
+    return CHECKPOINT_DURABILITY if checkpointing else None
+
+def session_thread(session_id: str) -> Dict[str, Any]:
+    """Graph config that reads and writes the checkpoints of one session"""
+    return {"configurable": {"thread_id": session_id}}
+
+def _checkpoint_path(config: WorkflowConfig) -> Optional[str]:
+    if not config.get("checkpoints_enabled", app_config.CHECKPOINTS_ENABLED):
+        return None
+    path = config.get("checkpoint_path", app_config.CHECKPOINT_PATH)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+@contextmanager
+def open_checkpointer(config: WorkflowConfig):
+    """SQLite checkpointer for the sync graphs, or None when checkpoints are disabled"""
+    path = _checkpoint_path(config)
+    if path is None:
+        yield None
+        return
+    # The SQLite drivers are only imported when checkpoints are on
+    import sqlite3
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    conn = sqlite3.connect(path, check_same_thread=False)
+    try:
+        # WAL lets a session write its checkpoint while others read theirs
+        conn.execute("PRAGMA journal_mode=WAL")
+        yield SqliteSaver(conn, serde=CHECKPOINT_SERDE)
+    finally:
+        conn.close()
+
+@asynccontextmanager
+async def aopen_checkpointer(config: WorkflowConfig):
+    """open_checkpointer for graphs run under ainvoke"""
+    path = _checkpoint_path(config)
+    if path is None:
+        yield None
+        return
+    import aiosqlite
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    async with aiosqlite.connect(path) as conn:
+        await conn.execute("PRAGMA journal_mode=WAL")
+        yield AsyncSqliteSaver(conn, serde=CHECKPOINT_SERDE)
+
+def _session_threads(session_id: str) -> Tuple[str, str]:
+    return session_id, f"{session_id}:developer"
+
+def drop_session(checkpointer: Optional[BaseCheckpointSaver], session_id: str) -> None:
+    """Delete a finished session's checkpoints; only an interrupted session needs them"""
+    if checkpointer is None:
+        return
+    for thread_id in _session_threads(session_id):
+        checkpointer.delete_thread(thread_id)
+
+async def adrop_session(checkpointer: Optional[BaseCheckpointSaver], session_id: str) -> None:
+    if checkpointer is None:
+        return
+    for thread_id in _session_threads(session_id):
+        await checkpointer.adelete_thread(thread_id)
+
+def _new_session(user_task: str, workspace_path: str, config: WorkflowConfig,
+                 checkpointer: Optional[BaseCheckpointSaver],
+                 session_id: Optional[str] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Initial state and graph config of a fresh session"""
     workspace = Path(workspace_path)
     workspace.mkdir(parents=True, exist_ok=True)
-    orchestrator = MainOrchestrator(config)
-    main_graph = orchestrator.create_main_graph()
+    session_id = session_id or str(uuid.uuid4())
+    if checkpointer is not None:
+        print(f"[INFO] Session {session_id}; if interrupted, continue it with: python main.py --resume {session_id}")
     initial_state = {
-        "user_task": user_task, "workspace_path": str(workspace.absolute()), "config": config
+        "user_task": user_task, "workspace_path": str(workspace.absolute()), "config": config, "session_id": session_id
     }
-    return main_graph.invoke(initial_state)
+    return initial_state, session_thread(session_id)
+
+def _saved_config(saved: Optional[CheckpointTuple], session_id: str) -> WorkflowConfig:
+    """The configuration a checkpointed session was started with"""
+    if saved is None:
+        raise ValueError(f"No checkpoint found for session {session_id}; finished sessions are not kept")
+    return saved.checkpoint["channel_values"]["config"]
+
+def run_development_workflow(user_task: str, workspace_path: str, config: WorkflowConfig,
+                             progress: Optional[ProgressCallback] = None, llm: Optional[Any] = None) -> Dict[str, Any]:
+    with open_checkpointer(config) as checkpointer:
+        orchestrator = MainOrchestrator(config, progress, llm, checkpointer=checkpointer)
+        main_graph = orchestrator.create_main_graph()
+        initial_state, thread = _new_session(user_task, workspace_path, config, checkpointer)
+        result = main_graph.invoke(initial_state, thread, durability=_durability(checkpointer))
+        drop_session(checkpointer, initial_state["session_id"])
+        return result
+
+async def arun_development_workflow(user_task: str, workspace_path: str, config: WorkflowConfig,
+                                    progress: Optional[ProgressCallback] = None, llm: Optional[Any] = None,
+                                    rate_limiter: Optional[RateLimiter] = None,
+                                    checkpointer: Optional[BaseCheckpointSaver] = None,
+                                    session_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Async run_development_workflow: LLM calls, file I/O and validation are awaited,
+    so one event loop can drive many sessions concurrently. `checkpointer` is an
+    open saver to use, such as one shared by a batch; without it one is opened from `config`.
+    `session_id` names the new session, so a caller knows it even if the run raises.
+    """
+    if checkpointer is None:
+        async with aopen_checkpointer(config) as checkpointer:
+            return await _arun_session(user_task, workspace_path, config, progress, llm, rate_limiter, checkpointer, session_id)
+    return await _arun_session(user_task, workspace_path, config, progress, llm, rate_limiter, checkpointer, session_id)
+
+async def _arun_session(user_task: str, workspace_path: str, config: WorkflowConfig,
+                        progress: Optional[ProgressCallback], llm: Optional[Any], rate_limiter: Optional[RateLimiter],
+                        checkpointer: Optional[BaseCheckpointSaver], session_id: Optional[str]) -> Dict[str, Any]:
+    orchestrator = MainOrchestrator(config, progress, llm, rate_limiter, checkpointer)
+    main_graph = orchestrator.create_main_graph()
+    initial_state, thread = _new_session(user_task, workspace_path, config, checkpointer, session_id)
+    result = await main_graph.ainvoke(initial_state, thread, durability=_durability(checkpointer))
+    await adrop_session(checkpointer, initial_state["session_id"])
+    return result
+
+def resume_development_workflow(session_id: str, config: Optional[WorkflowConfig] = None,
+                                progress: Optional[ProgressCallback] = None, llm: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Continue a session from its last checkpoint. Completed steps are not run
+    again, and neither are developer tasks that had already settled. The
+    session keeps the configuration it was started with; `config` only says
+    where its checkpoints are stored.
+    """
+    with open_checkpointer(config or app_config.get_workflow_config()) as checkpointer:
+        if checkpointer is None:
+            raise ValueError("Checkpoints are disabled, so there is no session to resume")
+        thread = session_thread(session_id)
+        saved_config = _saved_config(checkpointer.get_tuple(thread), session_id)
+        main_graph = MainOrchestrator(saved_config, progress, llm, checkpointer=checkpointer).create_main_graph()
+        snapshot = main_graph.get_state(thread)
+        if snapshot.next:
+            print(f"[INFO] Resuming session {session_id} at {', '.join(snapshot.next)}.")
+            result = main_graph.invoke(None, thread, durability=CHECKPOINT_DURABILITY)
+        else:
+            print(f"[INFO] Session {session_id} had already finished.")
+            result = snapshot.values
+        drop_session(checkpointer, session_id)
+        return result
+
+async def aresume_development_workflow(session_id: str, config: Optional[WorkflowConfig] = None,
+                                       progress: Optional[ProgressCallback] = None, llm: Optional[Any] = None,
+                                       rate_limiter: Optional[RateLimiter] = None,
+                                       checkpointer: Optional[BaseCheckpointSaver] = None) -> Dict[str, Any]:
+    """Async resume_development_workflow; `checkpointer` is an open saver to use, as in arun_development_workflow"""
+    if checkpointer is None:
+        async with aopen_checkpointer(config or app_config.get_workflow_config()) as checkpointer:
+            return await _aresume_session(session_id, progress, llm, rate_limiter, checkpointer)
+    return await _aresume_session(session_id, progress, llm, rate_limiter, checkpointer)
+
+async def _aresume_session(session_id: str, progress: Optional[ProgressCallback], llm: Optional[Any],
+                           rate_limiter: Optional[RateLimiter], checkpointer: Optional[BaseCheckpointSaver]) -> Dict[str, Any]:
+    if checkpointer is None:
+        raise ValueError("Checkpoints are disabled, so there is no session to resume")
+    thread = session_thread(session_id)
+    saved_config = _saved_config(await checkpointer.aget_tuple(thread), session_id)
+    main_graph = MainOrchestrator(saved_config, progress, llm, rate_limiter, checkpointer).create_main_graph()
+    snapshot = await main_graph.aget_state(thread)
+    if snapshot.next:
+        print(f"[INFO] Resuming session {session_id} at {', '.join(snapshot.next)}.")
+        result = await main_graph.ainvoke(None, thread, durability=CHECKPOINT_DURABILITY)
+    else:
+        print(f"[INFO] Session {session_id} had already finished.")
+        result = snapshot.values
+    await adrop_session(checkpointer, session_id)
+    return result
 
 if __name__ == "__main__":
     if not app_config.GOOGLE_API_KEY:
         sys.exit("Error: GOOGLE_API_KEY not set. Please create a .env file and add GOOGLE_API_KEY='your-key-here'")
 
     parser = argparse.ArgumentParser(description="AI Development Workflow")
-    parser.add_argument("task", help="The development task to accomplish")
+    parser.add_argument("task", nargs='?', help="The development task to accomplish")
     parser.add_argument("workspace", nargs='?', default=app_config.DEFAULT_WORKSPACE_PATH, help=f"Path to workspace directory (default: {app_config.DEFAULT_WORKSPACE_PATH})")
     parser.add_argument("--model", default=app_config.GEMINI_MODEL, help=f"LLM model (default: {app_config.GEMINI_MODEL})")
     parser.add_argument("--temperature", type=float, default=app_config.TEMPERATURE, help=f"LLM temperature (default: {app_config.TEMPERATURE})")
+    parser.add_argument("--no-llm-cache", action="store_true", help="Bypass the LLM response cache for this run")
+    parser.add_argument("--no-stream", action="store_true", help="Wait for complete responses instead of streaming files to disk")
+    parser.add_argument("--resume", metavar="SESSION_ID", help="Continue an interrupted session from its last checkpoint")
     args = parser.parse_args()
+    if not args.task and not args.resume:
+        parser.error("a task is required unless --resume is given")
 
     final_config = app_config.get_workflow_config(args.workspace)
     final_config["model_name"] = args.model
     final_config["temperature"] = args.temperature
+    if args.no_llm_cache:
+        final_config["llm_cache_enabled"] = False
+    if args.no_stream:
+        final_config["stream_writes"] = False
 
-    print("Starting development workflow...")
-    print(f"Task: {args.task}")
-    print(f"Workspace: {final_config['workspace_path']}")
-    print(f"Model: {final_config['model_name']}")
+    if args.resume:
+        print(f"Resuming development workflow {args.resume}...")
+    else:
+        print("Starting development workflow...")
+        print(f"Task: {args.task}")
+        print(f"Workspace: {final_config['workspace_path']}")
+        print(f"Model: {final_config['model_name']}")
     print("-" * 50)
 
     try:
-        result = run_development_workflow(args.task, args.workspace, final_config)
+        if args.resume:
+            result = resume_development_workflow(args.resume, final_config)
+        else:
+            result = run_development_workflow(args.task, args.workspace, final_config)
         print("\n" + "=" * 50)
         print("WORKFLOW COMPLETE")
         print("=" * 50)
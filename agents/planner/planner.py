@@ -3,20 +3,31 @@
 import json
 import uuid
 import re
-from typing import Dict, Any
+from typing import Dict, Any, List, TYPE_CHECKING
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
 from state import PlannerState, AtomicTask, TaskType
 
+if TYPE_CHECKING:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
 class PlannerAgent:
-    def __init__(self, llm: ChatGoogleGenerativeAI):
+    def __init__(self, llm: "ChatGoogleGenerativeAI"):
         self.llm = llm
 
     def generate_plan(self, state: PlannerState) -> Dict[str, Any]:
         """
         Generates a detailed, step-by-step plan of atomic tasks to accomplish the user's request.
         """
+        response = self.llm.invoke(self._plan_messages(state))
+        return self._parse_plan(state, response.content)
+
+    async def agenerate_plan(self, state: PlannerState) -> Dict[str, Any]:
+        response = await self.llm.ainvoke(self._plan_messages(state))
+        return self._parse_plan(state, response.content)
+
+    def _plan_messages(self, state: PlannerState) -> List:
         system_prompt = """You are an expert AI software architect. Your sole responsibility is to break down a user's request into a precise, step-by-step list of tasks.
 
         You must analyze the user's request and create a JSON array of "AtomicTask" objects.
@@ -43,10 +54,12 @@ class PlannerAgent:
         """
 
         user_task = state.get('user_task', '')
-        messages = [SystemMessage(content=system_prompt), HumanMessage(content=f"User Request: {user_task}")]
-        
-        response = self.llm.invoke(messages)
-        response_content = response.content if isinstance(response.content, str) else str(response.content)
+        return [SystemMessage(content=system_prompt), HumanMessage(content=f"User Request: {user_task}")]
+
+    def _parse_plan(self, state: PlannerState, content: Any) -> Dict[str, Any]:
+        """Atomic tasks from the model's JSON answer, or a single fallback task if it cannot be parsed"""
+        user_task = state.get('user_task', '')
+        response_content = content if isinstance(content, str) else str(content)
 
         json_match = re.search(r'```json\s*([\s\S]*?)\s*```', response_content)
         if json_match:
@@ -84,15 +97,16 @@ class PlannerAgent:
                 )
             ]
 
-        return {**state, "atomic_tasks": atomic_tasks}
+        task_dependencies = {task["id"]: list(task["prerequisites"]) for task in atomic_tasks}
+        return {"atomic_tasks": atomic_tasks, "task_dependencies": task_dependencies}
 
     def create_planner_graph(self):
         workflow = StateGraph(PlannerState)
-        workflow.add_node("generate_plan", self.generate_plan)
+        workflow.add_node("generate_plan", RunnableLambda(self.generate_plan, afunc=self.agenerate_plan))
         workflow.add_edge(START, "generate_plan")
         workflow.add_edge("generate_plan", END)
         return workflow.compile()
 
-def create_planner_service(llm: ChatGoogleGenerativeAI):
+def create_planner_service(llm: "ChatGoogleGenerativeAI"):
     planner = PlannerAgent(llm)
     return planner.create_planner_graph()
\ No newline at end of file
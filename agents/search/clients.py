@@ -0,0 +1,38 @@
+# search/clients.py
+
+import threading
+from typing import Any, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(key: str, factory: Callable[[], T]) -> T:
+    """
+    Return the shared client registered under `key`, creating it with `factory` on first use.
+
+    Keeps SDK clients, HTTP sessions and search engines out of module import time
+    and reuses them across tool calls for the life of the process.
+    """
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = factory()
+    return client
+
+
+def drop_client(key: str, client: Any) -> None:
+    """Forget `client` if it is still the one registered under `key`, so the next get_client builds a new one"""
+    with _clients_lock:
+        if _clients.get(key) is client:
+            del _clients[key]
+
+
+def reset_clients() -> None:
+    """Forget every registered client, e.g. after changing API keys"""
+    with _clients_lock:
+        _clients.clear()
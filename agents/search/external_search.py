@@ -2,11 +2,131 @@
 
 import os
 import json
-from typing import List
+import time
+import asyncio
+import codecs
+import threading
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 from langchain_core.tools import tool
-from langchain_tavily import TavilySearch
-from bs4 import BeautifulSoup
-import requests
+from search.clients import get_client
+from search.http_cache import HttpCache
+from search.html_text import extract_text
+from search.query_cache import QueryCache
+import config as app_config
+
+# Per-request cap; the whole call is also bounded by SEARCH_CONFIG['search_timeout']
+REQUEST_TIMEOUT = 10
+MAX_CONTENT_CHARS = 5000
+READ_CHUNK_SIZE = 16 * 1024
+HTML_CONTENT_TYPES = {'text/html', 'application/xhtml+xml'}
+TEXT_CONTENT_TYPES = {'text/plain', 'text/markdown'}
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+class MockSearchBackend:
+    """
+    Offline stand-in for TavilySearch returning deterministic results.
+
+    Selected with SEARCH_BACKEND=mock; `calls` counts upstream requests so
+    caching and deduplication can be checked without network access.
+    """
+
+    def __init__(self, max_results: int = 5, latency: float = 0.0):
+        self.max_results = max_results
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, query: str) -> Dict[str, Any]:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return self._results(query)
+
+    async def ainvoke(self, query: str) -> Dict[str, Any]:
+        with self._lock:
+            self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self._results(query)
+
+    def _results(self, query: str) -> Dict[str, Any]:
+        slug = '-'.join(query.lower().split())[:60]
+        return {
+            "query": query,
+            "results": [
+                {
+                    "title": f"Result {i + 1} for {query}",
+                    "url": f"https://example.com/{slug}/{i + 1}",
+                    "content": f"Mock content about {query}.",
+                    "score": round(1.0 - i / (self.max_results + 1), 3)
+                }
+                for i in range(self.max_results)
+            ]
+        }
+
+
+def _create_search_backend(max_results: int):
+    if app_config.SEARCH_CONFIG.get("search_backend") == "mock":
+        return MockSearchBackend(max_results, float(os.getenv("MOCK_SEARCH_LATENCY", 0)))
+    from langchain_tavily import TavilySearch
+    return TavilySearch(max_results=max_results)
+
+
+def get_search_backend(max_results: int):
+    """Search client for a result count, created once and reused across calls"""
+    backend = app_config.SEARCH_CONFIG.get("search_backend", "tavily")
+    return get_client(f"{backend}:{max_results}", lambda: _create_search_backend(max_results))
+
+
+def _create_query_cache() -> QueryCache:
+    config = app_config.SEARCH_CONFIG
+    return QueryCache(config["query_cache_dir"], config["query_cache_ttl"])
+
+
+def get_query_cache() -> QueryCache:
+    return get_client("query_cache", _create_query_cache)
+
+
+def _create_session():
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    # Enough pooled keep-alive connections per host for every scrape worker
+    workers = app_config.SEARCH_CONFIG.get("scrape_workers", 8)
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'User-Agent': USER_AGENT})
+    return session
+
+
+def _create_executor() -> ThreadPoolExecutor:
+    workers = app_config.SEARCH_CONFIG.get("scrape_workers", 8)
+    return ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="scrape")
+
+
+def _create_http_cache() -> HttpCache:
+    config = app_config.SEARCH_CONFIG
+    return HttpCache(config["http_cache_dir"], config["http_cache_max_mb"] * 1024 * 1024, config["http_cache_ttl"])
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    if not app_config.SEARCH_CONFIG.get("http_cache_enabled", True):
+        return None
+    return get_client("http_cache", _create_http_cache)
+
+
+_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+
+
+def get_http_session():
+    """Keep-alive HTTP session shared by every scrape in the process"""
+    return get_client("http_session", _create_session)
+
 
 @tool
 def external_search(query: str, max_results: int = 5) -> str:
@@ -20,12 +140,35 @@ def external_search(query: str, max_results: int = 5) -> str:
     Returns:
         A JSON string with the search results.
     """
-    if not os.getenv("TAVILY_API_KEY"):
+    if app_config.SEARCH_CONFIG.get("search_backend") != "mock" and not os.getenv("TAVILY_API_KEY"):
+        return json.dumps({"error": "Tavily API key not set in environment variables."})
+
+    try:
+        search_tool = get_search_backend(max_results)
+        if app_config.SEARCH_CONFIG.get("query_cache_ttl", 0) > 0:
+            results = get_query_cache().get_or_fetch(query, max_results, lambda: search_tool.invoke(query))
+        else:
+            results = search_tool.invoke(query)
+        return json.dumps(results, indent=2)
+
+    except Exception as e:
+        return json.dumps({
+            "error": f"Tavily search failed with error: {str(e)}",
+            "query": query,
+            "results": []
+        })
+
+
+async def _aexternal_search(query: str, max_results: int = 5) -> str:
+    if app_config.SEARCH_CONFIG.get("search_backend") != "mock" and not os.getenv("TAVILY_API_KEY"):
         return json.dumps({"error": "Tavily API key not set in environment variables."})
 
     try:
-        search_tool = TavilySearch(max_results=max_results)
-        results = search_tool.invoke(query)
+        search_tool = get_search_backend(max_results)
+        if app_config.SEARCH_CONFIG.get("query_cache_ttl", 0) > 0:
+            results = await get_query_cache().aget_or_fetch(query, max_results, lambda: search_tool.ainvoke(query))
+        else:
+            results = await search_tool.ainvoke(query)
         return json.dumps(results, indent=2)
 
     except Exception as e:
@@ -35,6 +178,114 @@ def external_search(query: str, max_results: int = 5) -> str:
             "results": []
         })
 
+
+# Used by ainvoke, so async callers never block their event loop
+external_search.coroutine = _aexternal_search
+
+
+def _content_type(response) -> Tuple[str, str]:
+    """Media type and charset from the Content-Type header, defaulting to HTML in UTF-8"""
+    header = response.headers.get('Content-Type', '')
+    media_type, _, params = header.partition(';')
+    charset = 'utf-8'
+    for param in params.split(';'):
+        name, _, value = param.partition('=')
+        if name.strip().lower() == 'charset' and value.strip():
+            charset = value.strip().strip('"\'')
+    return media_type.strip().lower() or 'text/html', charset
+
+
+def _iter_body(response) -> Iterator[bytes]:
+    """
+    Body bytes as soon as they arrive.
+
+    iter_content waits for a full chunk, so a server trickling its body would
+    hold the read past the deadline; read1 returns whatever is already buffered.
+    """
+    raw = response.raw
+    if not hasattr(raw, 'read1'):
+        yield from response.iter_content(chunk_size=READ_CHUNK_SIZE)
+        return
+    while True:
+        chunk = raw.read1(READ_CHUNK_SIZE, decode_content=True)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _iter_text(response, charset: str, deadline: float) -> Iterator[str]:
+    """Decode the body as it streams in, stopping at scrape_max_bytes or the deadline"""
+    try:
+        decoder = codecs.getincrementaldecoder(charset)(errors='replace')
+    except LookupError:
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    max_bytes = app_config.SEARCH_CONFIG.get("scrape_max_bytes", 2 * 1024 * 1024)
+    received = 0
+    for chunk in _iter_body(response):
+        chunk = chunk[:max_bytes - received]
+        received += len(chunk)
+        yield decoder.decode(chunk)
+        if received >= max_bytes or time.monotonic() >= deadline:
+            break
+    yield decoder.decode(b'', final=True)
+
+
+def _read_content(response, deadline: float) -> str:
+    """Extract page text from a streamed response without holding the whole body"""
+    media_type, charset = _content_type(response)
+    if media_type not in HTML_CONTENT_TYPES and media_type not in TEXT_CONTENT_TYPES:
+        raise ValueError(f"unsupported content type {media_type}")
+    return extract_text(_iter_text(response, charset, deadline), MAX_CONTENT_CHARS,
+                        html=media_type in HTML_CONTENT_TYPES)
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    """Semaphore capping concurrent requests to the URL's host"""
+    host = urlsplit(url).netloc.lower()
+    with _host_slots_lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            limit = app_config.SEARCH_CONFIG.get("scrape_connections_per_host", 4)
+            slot = _host_slots[host] = threading.BoundedSemaphore(max(limit, 1))
+        return slot
+
+
+def _scrape_url(url: str, deadline: float) -> Optional[Dict[str, Any]]:
+    """Fetch and extract one URL; None for non-200 responses, which are left out as before"""
+    cache = get_http_cache()
+    cached = cache.get(url) if cache else None
+    if cached and cache.is_fresh(cached):
+        return {'url': url, 'content': cached["content"]}
+
+    try:
+        slot = _host_slot(url)
+        if not slot.acquire(timeout=max(deadline - time.monotonic(), 0)):
+            return {'url': url, 'error': "Error scraping: deadline reached while waiting for host"}
+        try:
+            timeout = min(REQUEST_TIMEOUT, deadline - time.monotonic())
+            if timeout <= 0:
+                return {'url': url, 'error': "Error scraping: deadline reached"}
+            headers = HttpCache.validators(cached)
+            with get_http_session().get(url, timeout=timeout, headers=headers, stream=True) as response:
+                content = _read_content(response, deadline) if response.status_code == 200 else None
+        finally:
+            slot.release()
+    except Exception as e:
+        if cached:
+            # Offline or flaky host: a stale copy beats no content
+            return {'url': url, 'content': cached["content"], 'stale': True}
+        return {'url': url, 'error': f"Error scraping: {str(e)}"}
+
+    if response.status_code == 304 and cached:
+        cache.refresh(cached)
+        return {'url': url, 'content': cached["content"]}
+    if response.status_code == 200:
+        if cache and 'no-store' not in response.headers.get('Cache-Control', ''):
+            cache.put(url, content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return {'url': url, 'content': content}
+    return None
+
+
 @tool
 def scrape_content(urls: List[str]) -> str:
     """
@@ -46,28 +297,38 @@ def scrape_content(urls: List[str]) -> str:
     Returns:
         JSON string with scraped content from each URL.
     """
-    session = requests.Session()
-    session.headers.update({
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    })
-    
+    timeout = app_config.SEARCH_CONFIG.get("search_timeout", 30)
+    deadline = time.monotonic() + timeout
+    executor = get_client("scrape_executor", _create_executor)
+    futures = [executor.submit(_scrape_url, url, deadline) for url in urls]
+    wait(futures, timeout=max(deadline - time.monotonic(), 0))
+    return _scrape_results(urls, futures, timeout)
+
+
+async def _ascrape_content(urls: List[str]) -> str:
+    """Async scrape_content: awaits the shared scrape pool instead of blocking on it"""
+    timeout = app_config.SEARCH_CONFIG.get("search_timeout", 30)
+    deadline = time.monotonic() + timeout
+    executor = get_client("scrape_executor", _create_executor)
+    futures = [executor.submit(_scrape_url, url, deadline) for url in urls]
+    if futures:
+        await asyncio.wait([asyncio.wrap_future(future) for future in futures], timeout=max(deadline - time.monotonic(), 0))
+    return _scrape_results(urls, futures, timeout)
+
+
+scrape_content.coroutine = _ascrape_content
+
+
+def _scrape_results(urls: List[str], futures: List, timeout: float) -> str:
+    # Results keep the order of the input URLs regardless of completion order
     scraped_results = []
-    for url in urls:
-        try:
-            response = session.get(url, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                for script_or_style in soup(["script", "style"]):
-                    script_or_style.decompose()
-                text = soup.get_text()
-                lines = (line.strip() for line in text.splitlines())
-                chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                clean_text = ' '.join(chunk for chunk in chunks if chunk)
-                scraped_results.append({
-                    'url': url,
-                    'content': clean_text[:5000]
-                })
-        except Exception as e:
-            scraped_results.append({'url': url, 'error': f"Error scraping: {str(e)}"})
-    
-    return json.dumps(scraped_results, indent=2)
\ No newline at end of file
+    for url, future in zip(urls, futures):
+        if not future.done():
+            future.cancel()
+            scraped_results.append({'url': url, 'error': f"Error scraping: timed out after {timeout}s"})
+            continue
+        result = future.result()
+        if result is not None:
+            scraped_results.append(result)
+
+    return json.dumps(scraped_results, indent=2)
@@ -0,0 +1,160 @@
+# search/html_text.py
+
+from html.parser import HTMLParser
+from typing import Iterable, List
+
+SKIPPED_TAGS = {"script", "style"}
+PRESERVE_WHITESPACE_TAGS = {"pre", "textarea"}
+ASCII_WHITESPACE = " \n\t\x0c\r"
+LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85  "
+
+
+class TextBudget:
+    """
+    Incremental version of the scraper's text clean-up with a character budget.
+
+    Produces the same output as stripping every line, splitting on double
+    spaces and joining the non-empty phrases with one space, but line by line
+    as text arrives, and stops accepting text once `max_chars` is reached.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.done = False
+        self._phrases: List[str] = []
+        self._length = 0
+        # Pieces of the current, unterminated line
+        self._pending: List[str] = []
+        self._pending_length = 0
+
+    def add(self, text: str) -> None:
+        if self.done or not text:
+            return
+        lines = text.splitlines(True)
+        tail = lines.pop() if lines[-1][-1] not in LINE_BREAKS else ""
+        if lines and self._pending:
+            lines[0] = ''.join(self._pending) + lines[0]
+            self._pending = []
+            self._pending_length = 0
+        if tail:
+            self._pending.append(tail)
+            self._pending_length += len(tail)
+            # Text with no line breaks at all is cut into lines rather than buffered without bound
+            if self._pending_length > 4 * self.max_chars:
+                lines.append(''.join(self._pending))
+                self._pending = []
+                self._pending_length = 0
+        for line in lines:
+            self._add_line(line)
+            if self.done:
+                return
+
+    def _add_line(self, line: str) -> None:
+        for phrase in line.strip().split("  "):
+            phrase = phrase.strip()
+            if phrase:
+                self._phrases.append(phrase)
+                self._length += len(phrase) + 1
+                if self._length > self.max_chars:
+                    self.done = True
+                    return
+
+    def finish(self) -> str:
+        if self._pending and not self.done:
+            self._add_line(''.join(self._pending))
+        self._pending = []
+        return ' '.join(self._phrases)[:self.max_chars]
+
+
+class TextExtractor(HTMLParser):
+    """Feeds the text of an HTML document, minus script and style bodies, into a TextBudget"""
+
+    def __init__(self, max_chars: int):
+        super().__init__(convert_charrefs=True)
+        self.budget = TextBudget(max_chars)
+        self._skip_depth = 0
+        self._preserve_depth = 0
+        # Whitespace seen since the last tag; held back until we know whether the whole run is blank
+        self._spaces: List[str] = []
+        self._run_has_text = False
+
+    @property
+    def done(self) -> bool:
+        return self.budget.done
+
+    def _end_run(self) -> None:
+        # Like BeautifulSoup, whitespace-only text between tags collapses to one separator
+        if self._spaces:
+            self.budget.add('\n' if any('\n' in space for space in self._spaces) else ' ')
+            self._spaces = []
+        self._run_has_text = False
+
+    def handle_starttag(self, tag, attrs):
+        self._end_run()
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in PRESERVE_WHITESPACE_TAGS:
+            self._preserve_depth += 1
+
+    def handle_endtag(self, tag):
+        self._end_run()
+        if tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in PRESERVE_WHITESPACE_TAGS and self._preserve_depth:
+            self._preserve_depth -= 1
+
+    def handle_startendtag(self, tag, attrs):
+        self._end_run()
+
+    def handle_comment(self, data):
+        self._end_run()
+
+    def handle_decl(self, decl):
+        self._end_run()
+
+    def handle_pi(self, data):
+        self._end_run()
+
+    def unknown_decl(self, data):
+        self._end_run()
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._preserve_depth or self._run_has_text:
+            self.budget.add(data)
+        elif data.strip(ASCII_WHITESPACE):
+            self._run_has_text = True
+            self.budget.add(''.join(self._spaces) + data)
+            self._spaces = []
+        else:
+            self._spaces.append(data)
+
+    def close(self):
+        super().close()
+        self._end_run()
+
+
+def extract_text(chunks: Iterable[str], max_chars: int = 5000, html: bool = True) -> str:
+    """
+    Clean text from a document delivered in chunks, consuming only as many as needed.
+
+    With `html` the chunks are tokenized incrementally and script/style content is
+    dropped; otherwise they are treated as plain text.
+    """
+    if not html:
+        budget = TextBudget(max_chars)
+        for chunk in chunks:
+            budget.add(chunk)
+            if budget.done:
+                break
+        return budget.finish()
+
+    parser = TextExtractor(max_chars)
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.done:
+            break
+    else:
+        parser.close()
+    return parser.budget.finish()
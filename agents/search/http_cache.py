@@ -0,0 +1,119 @@
+# search/http_cache.py
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+class HttpCache:
+    """
+    On-disk cache of cleaned page text keyed by URL, with LRU eviction by total size.
+
+    Entries younger than `ttl` seconds are served without touching the network;
+    older ones are revalidated with If-None-Match / If-Modified-Since so an
+    unchanged page costs a 304 instead of a download and a parse. Recency is
+    tracked through file mtimes, so LRU order survives restarts.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, ttl: float = 0):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._load()
+
+    def _load(self) -> None:
+        if not self.directory.is_dir():
+            return
+        entries = []
+        for path in self.directory.glob('*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._sizes[key] = size
+            self._total += size
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """The cached entry for `url`, marking it most recently used"""
+        key = self._key(url)
+        with self._lock:
+            if key not in self._sizes:
+                return None
+            try:
+                entry = json.loads(self._path(key).read_text(encoding='utf-8'))
+                os.utime(self._path(key))
+            except (OSError, ValueError):
+                self._discard(key)
+                return None
+            self._sizes.move_to_end(key)
+        # Two URLs hashing alike is not expected, but never serve another page's text
+        return entry if entry.get("url") == url else None
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry.get("fetched_at", 0) < self.ttl
+
+    @staticmethod
+    def validators(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Conditional request headers for revalidating a cached entry"""
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url: str, content: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        entry = {
+            "url": url,
+            "content": content,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time()
+        }
+        data = json.dumps(entry).encode('utf-8')
+        key = self._key(url)
+        with self._lock:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.directory / f".{key}.{threading.get_ident()}.tmp"
+                tmp_path.write_bytes(data)
+                tmp_path.replace(self._path(key))
+            except OSError as e:
+                print(f"Error writing HTTP cache entry for {url}: {e}")
+                return
+            self._total += len(data) - self._sizes.pop(key, 0)
+            self._sizes[key] = len(data)
+            self._evict()
+
+    def refresh(self, entry: Dict[str, Any]) -> None:
+        """Restart an entry's TTL after the server confirmed it is unchanged"""
+        self.put(entry["url"], entry["content"], entry.get("etag"), entry.get("last_modified"))
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes and self._sizes:
+            key = next(iter(self._sizes))
+            self._discard(key)
+
+    def _discard(self, key: str) -> None:
+        self._total -= self._sizes.pop(key, 0)
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
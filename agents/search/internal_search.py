@@ -3,223 +3,749 @@
 import os
 import re
 import ast
+import mmap
+import heapq
+import pickle
+import hashlib
+import asyncio
+import threading
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Tuple, TYPE_CHECKING
 from langchain_core.tools import tool
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from search.inverted_index import InvertedIndex, encode_document
+from search.symbol_table import SymbolTable, Symbol
+from search.clients import get_client
+from state import SearchConfig
+import config as app_config
 import json
 
+if TYPE_CHECKING:
+    # numpy and the embedding SDK are only imported once semantic search is used
+    from search.semantic_index import SemanticIndex, Embedder
+
+
+# Persistent indexes live in a per-user cache directory, one per workspace, never inside the
+# workspace itself: a pickle shipped in a cloned repository would run code when loaded
+INDEX_FILE = 'file_index.pkl'
+INDEX_VERSION = 7
+
+IGNORED_PATTERNS = ['.git', '__pycache__', 'node_modules', '.venv']
+
+# Below this many files, process pool start-up costs more than it saves
+PARALLEL_INGEST_THRESHOLD = 32
+# Files read per ingestion batch; bounds how much raw content is held at once
+INGEST_BATCH_SIZE = 256
+
+# (structure, encoded postings, document length) computed for each file by analyse_content
+Analysis = Tuple[Dict[str, Any], Dict[str, bytes], int]
+# (record, content, encoded postings, document length) of a file ready to merge into the index
+Entry = Tuple["FileRecord", str, Dict[str, bytes], int]
+
+# (score, relative_path, structure matches or None) produced by the scoring passes
+Candidate = Tuple[float, str, Optional[List[str]]]
+
+# Cosine similarity is in [-1, 1]; scale it towards the other scorers' ranges
+SEMANTIC_SCORE_WEIGHT = 10
+
+
+def index_directory(workspace_path: Path, index_root: str) -> Path:
+    """Cache directory holding the index of one workspace, keyed by a hash of its resolved path"""
+    key = hashlib.sha1(str(workspace_path.resolve()).encode('utf-8')).hexdigest()[:16]
+    return Path(index_root) / key
+
+
+def is_binary_content(data: bytes) -> bool:
+    """Check if a file buffer looks binary"""
+    return b'\0' in data[:1024]
+
+
+def decode_text(data: bytes) -> str:
+    """Decode like a text-mode read: undecodable bytes dropped, newlines normalised"""
+    content = data.decode('utf-8', errors='ignore')
+    return content.replace('\r\n', '\n').replace('\r', '\n')
+
+
+class FileRecord:
+    """
+    Index entry for one file.
+    
+    `path` is relative to the workspace, so a persisted index stays valid when the
+    workspace moves; reads take the workspace root. In compact mode the file
+    content is not kept in memory; it is read back through mmap only when a
+    preview or the full text is actually needed.
+    """
+    __slots__ = ('path', 'size', 'lines', 'extension', 'structure', 'mtime_ns', 'file_size', '_content')
+    
+    def __init__(self, path: str, size: int, lines: int, extension: str, structure: Dict[str, Any],
+                 mtime_ns: int, file_size: int, content: Optional[str] = None):
+        self.path = path
+        self.size = size
+        self.lines = lines
+        self.extension = extension
+        self.structure = structure
+        self.mtime_ns = mtime_ns
+        self.file_size = file_size
+        self._content = content
+    
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+    
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            setattr(self, slot, value)
+    
+    def _read_bytes(self, root: Path, limit: Optional[int] = None) -> bytes:
+        try:
+            with open(root / self.path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return b''
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return mapped[:limit] if limit is not None else mapped[:]
+        except (OSError, ValueError) as e:
+            print(f"Error reading {root / self.path}: {e}")
+            return b''
+    
+    def read_content(self, root: Path) -> str:
+        """Full file content, from memory if held, otherwise from disk under the workspace `root`"""
+        if self._content is not None:
+            return self._content
+        return decode_text(self._read_bytes(root))
+    
+    def preview(self, root: Path, chars: int = 500) -> str:
+        """The first `chars` characters, reading at most a few bytes per character from disk"""
+        if self._content is not None:
+            return self._content[:chars]
+        return decode_text(self._read_bytes(root, chars * 4))[:chars]
+    
+    def info(self) -> Dict[str, Any]:
+        return {"size": self.size, "lines": self.lines, "extension": self.extension}
+
+
+# Nodes whose children can include statements
+STATEMENT_NODES = (ast.stmt, ast.excepthandler, ast.match_case)
+
+
+def _collect_structure(node: ast.AST, scope: str, in_class: bool, structure: Dict[str, Any]) -> None:
+    """Walk the tree in source order, tracking the enclosing scope for qualified names"""
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            qualname = f"{scope}.{child.name}" if scope else child.name
+            kind = "method" if in_class else "function"
+            if isinstance(child, ast.AsyncFunctionDef):
+                kind = f"async_{kind}"
+            structure["functions"].append({
+                "name": child.name,
+                "qualname": qualname,
+                "kind": kind,
+                "line": child.lineno,
+                "end_line": child.end_lineno,
+                "args": [arg.arg for arg in child.args.args],
+                "docstring": ast.get_docstring(child)
+            })
+            _collect_structure(child, qualname, False, structure)
+        elif isinstance(child, ast.ClassDef):
+            qualname = f"{scope}.{child.name}" if scope else child.name
+            structure["classes"].append({
+                "name": child.name,
+                "qualname": qualname,
+                "line": child.lineno,
+                "end_line": child.end_lineno,
+                "methods": [n.name for n in child.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))],
+                "docstring": ast.get_docstring(child)
+            })
+            _collect_structure(child, qualname, True, structure)
+        else:
+            if isinstance(child, ast.Import):
+                for alias in child.names:
+                    structure["imports"].append(alias.name)
+            elif isinstance(child, ast.ImportFrom):
+                module = child.module or ""
+                for alias in child.names:
+                    structure["imports"].append(f"{module}.{alias.name}")
+            elif isinstance(child, ast.Assign):
+                target = child.targets[0]
+                if isinstance(target, ast.Name):
+                    structure["variables"].append(target.id)
+            # Definitions, imports and assignments are statements, never inside expressions
+            if isinstance(child, STATEMENT_NODES):
+                _collect_structure(child, scope, in_class, structure)
+
+
+def extract_code_structure(content: str, suffix: str, display_path: str = "") -> Dict[str, Any]:
+    """
+    Extract code structure (functions, classes, imports) for Python files.
+    
+    Functions include async functions and methods, each with its qualified name
+    and kind. Module-level so it can be shipped to a process pool during indexing.
+    """
+    structure = {"functions": [], "classes": [], "imports": [], "variables": []}
+    
+    if suffix != '.py':
+        return structure
+    
+    try:
+        _collect_structure(ast.parse(content), "", False, structure)
+    except Exception as e:
+        print(f"Error parsing AST for {display_path}: {e}")
+    
+    return structure
+
+
+def analyse_content(content: str, suffix: str, display_path: str = "") -> Analysis:
+    """
+    All the CPU work of indexing one file: its code structure and its encoded postings.
+    Module-level so indexing can run it in worker processes, leaving the main thread
+    only the merge into the index.
+    """
+    return (extract_code_structure(content, suffix, display_path), *encode_document(content))
+
+
+SYMBOL_LABELS = {
+    "function": "Function",
+    "async_function": "Async function",
+    "method": "Method",
+    "async_method": "Async method",
+    "class": "Class"
+}
+
+
+def symbol_label(symbol: Symbol) -> str:
+    return f"{SYMBOL_LABELS.get(symbol.kind, 'Symbol')}: {symbol.qualname} (line {symbol.line})"
+
 
 class InternalSearchEngine:
-    def __init__(self, workspace_path: str):
+    def __init__(self, workspace_path: str, search_config: Optional[SearchConfig] = None,
+                 embedder: Optional["Embedder"] = None):
         self.workspace_path = Path(workspace_path)
-        self.embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+        self.search_config = search_config or app_config.SEARCH_CONFIG
+        self.index_dir = index_directory(self.workspace_path, self.search_config.get("index_dir", app_config.SEARCH_CONFIG["index_dir"]))
+        self.index_path = self.index_dir / INDEX_FILE
+        self.index_workers = max(1, self.search_config.get("index_workers", 1))
+        self.compact_index = self.search_config.get("compact_index", True)
+        self.lazy_index_max_files = self.search_config.get("lazy_index_max_files", 5000)
+        self.max_results = self.search_config.get("max_results_per_query", 10)
+        self.semantic_enabled = self.search_config.get("semantic_enabled", False)
+        self.embedding_backend = self.search_config.get("embedding_backend", "google")
+        self._embedder = embedder
+        self.file_index: Dict[str, Any] = {}
+        self.skipped: Dict[str, Tuple[int, int]] = {}
+        self.inverted_index = InvertedIndex()
+        self.symbol_table = SymbolTable()
+        self.semantic_index: Optional["SemanticIndex"] = None
+        self.is_indexed = False
+        self._lock = threading.RLock()
         self.supported_extensions = {'.py', '.js', '.ts', '.java', '.cpp', '.c', '.h', '.hpp', 
                                    '.go', '.rs', '.rb', '.php', '.cs', '.swift', '.kt', 
                                    '.md', '.txt', '.json', '.yaml', '.yml', '.toml', '.ini'}
     
-    def _is_binary_file(self, file_path: Path) -> bool:
-        """Check if file is binary"""
-        try:
-            with open(file_path, 'rb') as f:
-                chunk = f.read(1024)
-                return b'\0' in chunk
-        except:
-            return True
+    @property
+    def embeddings(self):
+        """Google embeddings client, created on first use and shared by every engine"""
+        return get_client("google_embeddings", _create_google_embeddings)
+    
+    @property
+    def embedder(self) -> "Embedder":
+        """The embedder passed in, else the one selected by SEARCH_CONFIG['embedding_backend']"""
+        if self._embedder is None:
+            if self.embedding_backend == "hashing":
+                from search.semantic_index import HashingEmbedder
+                self._embedder = HashingEmbedder()
+            else:
+                self._embedder = self.embeddings
+        return self._embedder
     
     def _read_file_content(self, file_path: Path) -> Optional[str]:
-        """Safely read file content"""
+        """Safely read file content with a single read; the binary check runs on the same buffer"""
         try:
-            if self._is_binary_file(file_path):
-                return None
-            
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
+            with open(file_path, 'rb') as f:
+                data = f.read()
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
             return None
+        
+        if is_binary_content(data):
+            return None
+        return decode_text(data)
     
     def _extract_code_structure(self, content: str, file_path: Path) -> Dict[str, Any]:
         """Extract code structure (functions, classes, imports) for Python files"""
-        structure = {"functions": [], "classes": [], "imports": [], "variables": []}
+        return extract_code_structure(content, file_path.suffix, str(file_path))
+    
+    def _is_ignored(self, name: str) -> bool:
+        return any(ignore in name for ignore in IGNORED_PATTERNS)
+    
+    def _iter_workspace_files(self) -> Iterator[Tuple[str, Path, os.stat_result]]:
+        """Walk the workspace, pruning ignored directories, and yield indexable files"""
+        for root, dirs, files in os.walk(self.workspace_path):
+            dirs[:] = [d for d in dirs if not self._is_ignored(d)]
+            for name in files:
+                file_path = Path(root) / name
+                if file_path.suffix not in self.supported_extensions:
+                    continue
+                try:
+                    stat = file_path.stat()
+                except OSError:
+                    continue
+                yield str(file_path.relative_to(self.workspace_path)), file_path, stat
+    
+    def _build_entry(self, file_path: Path, stat: os.stat_result, content: str, analysis: Analysis) -> Entry:
+        """Build a record for the file; content and postings are returned alongside for the other indexes"""
+        structure, postings, length = analysis
+        record = FileRecord(
+            path=str(file_path.relative_to(self.workspace_path)),
+            size=len(content),
+            lines=content.count('\n') + 1,
+            extension=file_path.suffix,
+            structure=structure,
+            mtime_ns=stat.st_mtime_ns,
+            file_size=stat.st_size,
+            content=None if self.compact_index else content
+        )
+        return record, content, postings, length
+    
+    def _index_file(self, file_path: Path, stat: os.stat_result) -> Optional[Entry]:
+        """Build the index entry for a single file, or None if it has no indexable content"""
+        content = self._read_file_content(file_path)
+        if not content:
+            return None
+        return self._build_entry(file_path, stat, content, analyse_content(content, file_path.suffix, str(file_path)))
+    
+    def _ingest_files(self, pending: List[Tuple[str, Path, os.stat_result]]
+                      ) -> Iterator[Tuple[str, os.stat_result, Optional[Entry]]]:
+        """
+        Read and analyse files, yielding (relative_path, stat, entry) as batches complete.
         
-        if file_path.suffix != '.py':
-            return structure
+        Reads fan out over a thread pool, and analyse_content (AST extraction and
+        tokenization) over a process pool once there are enough files to amortise
+        the worker start-up. Work is done in batches so only one batch of file
+        contents is in memory at a time.
+        """
+        if self.index_workers <= 1 or len(pending) < PARALLEL_INGEST_THRESHOLD:
+            for relative_path, file_path, stat in pending:
+                yield relative_path, stat, self._index_file(file_path, stat)
+            return
         
+        with ThreadPoolExecutor(max_workers=self.index_workers) as thread_pool, \
+                ProcessPoolExecutor(max_workers=self.index_workers) as process_pool:
+            for start in range(0, len(pending), INGEST_BATCH_SIZE):
+                batch = pending[start:start + INGEST_BATCH_SIZE]
+                contents = list(thread_pool.map(self._read_file_content, [file_path for _, file_path, _ in batch]))
+                
+                to_analyse = [i for i in range(len(batch)) if contents[i]]
+                analysed = process_pool.map(
+                    analyse_content,
+                    [contents[i] for i in to_analyse],
+                    [batch[i][1].suffix for i in to_analyse],
+                    [str(batch[i][1]) for i in to_analyse],
+                    chunksize=max(1, len(to_analyse) // (self.index_workers * 4))
+                )
+                analyses = dict(zip(to_analyse, analysed))
+                
+                for i, (relative_path, file_path, stat) in enumerate(batch):
+                    if i not in analyses:
+                        yield relative_path, stat, None
+                        continue
+                    yield relative_path, stat, self._build_entry(file_path, stat, contents[i], analyses[i])
+    
+    def _empty_index(self) -> Dict[str, Any]:
+        return {
+            "version": INDEX_VERSION,
+            "files": {},
+            "skipped": {},
+            "inverted_index": InvertedIndex(),
+            "symbol_table": SymbolTable(),
+            "semantic_index": None
+        }
+    
+    def _load_persisted_index(self) -> Dict[str, Any]:
+        """Load the on-disk index, returning an empty one if missing or stale"""
+        empty = self._empty_index()
         try:
-            tree = ast.parse(content)
-            
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    structure["functions"].append({
-                        "name": node.name,
-                        "line": node.lineno,
-                        "args": [arg.arg for arg in node.args.args],
-                        "docstring": ast.get_docstring(node)
-                    })
-                elif isinstance(node, ast.ClassDef):
-                    structure["classes"].append({
-                        "name": node.name,
-                        "line": node.lineno,
-                        "methods": [n.name for n in node.body if isinstance(n, ast.FunctionDef)],
-                        "docstring": ast.get_docstring(node)
-                    })
-                elif isinstance(node, (ast.Import, ast.ImportFrom)):
-                    if isinstance(node, ast.Import):
-                        for alias in node.names:
-                            structure["imports"].append(alias.name)
-                    else:
-                        module = node.module or ""
-                        for alias in node.names:
-                            structure["imports"].append(f"{module}.{alias.name}")
-                elif isinstance(node, ast.Assign):
-                    target = node.targets[0]
-                    if isinstance(target, ast.Name):
-                        structure["variables"].append(target.id)
+            with open(self.index_path, 'rb') as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return empty
         except Exception as e:
-            print(f"Error parsing AST for {file_path}: {e}")
+            print(f"Discarding unreadable index {self.index_path}: {e}")
+            return empty
         
-        return structure
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return empty
+        return data
+    
+    def _save_index(self, data: Dict[str, Any]) -> None:
+        """Atomically write the index so a crashed write never leaves a torn file"""
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            print(f"Error saving index to {self.index_path}: {e}")
     
-    def index_workspace(self) -> Dict[str, Any]:
-        """Index all files in workspace"""
-        file_index = {}
+    def index_workspace(self, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Index all files in workspace.
         
-        for file_path in self.workspace_path.rglob('*'):
-            if (file_path.is_file() and 
-                file_path.suffix in self.supported_extensions and
-                not any(ignore in str(file_path) for ignore in ['.git', '__pycache__', 'node_modules', '.venv'])):
-                
-                content = self._read_file_content(file_path)
-                if content:
-                    relative_path = str(file_path.relative_to(self.workspace_path))
-                    
-                    file_index[relative_path] = {
-                        "path": str(file_path),
-                        "size": len(content),
-                        "lines": len(content.split('\n')),
-                        "extension": file_path.suffix,
-                        "content": content,
-                        "structure": self._extract_code_structure(content, file_path)
-                    }
+        The index is persisted under the per-user index directory and keyed by path,
+        mtime and size, so only files that changed since the last build are re-read and re-parsed.
+        """
+        with self._lock:
+            return self._index_workspace(use_cache)
+    
+    def _index_workspace(self, use_cache: bool) -> Dict[str, Any]:
+        data = self._load_persisted_index() if use_cache else self._empty_index()
+        self.file_index = data["files"]
+        self.skipped = data["skipped"]
+        self.inverted_index = data["inverted_index"]
+        self.symbol_table = data["symbol_table"]
+        # When semantic search is off the chunk index is dropped rather than left to go stale
+        self.semantic_index = None
+        if self.semantic_enabled:
+            from search.semantic_index import SemanticIndex, EmbeddingCache, embedder_key
+            self.semantic_index = data["semantic_index"] or SemanticIndex()
+            cache = EmbeddingCache(self.index_dir / 'embeddings' / embedder_key(self.embedder))
+            self.semantic_index.attach(self.embedder, cache)
+        
+        changed = self._refresh()
         
-        return file_index
+        # Files indexed while semantic search was off still need chunking; unchanged
+        # chunks resolve from the embedding cache without being re-embedded
+        if self.semantic_index is not None:
+            missing = self.file_index.keys() - self.semantic_index.file_chunks.keys()
+            for relative_path in missing:
+                record = self.file_index[relative_path]
+                self.semantic_index.add_file(relative_path, record.read_content(self.workspace_path), record.structure, record.extension)
+            self.semantic_index.flush()
+            changed = changed or bool(missing)
+        
+        self.is_indexed = True
+        if changed:
+            self._save_index({
+                "version": INDEX_VERSION,
+                "files": self.file_index,
+                "skipped": self.skipped,
+                "inverted_index": self.inverted_index,
+                "symbol_table": self.symbol_table,
+                "semantic_index": self.semantic_index
+            })
+        
+        return self.file_index
     
-    def search_by_content(self, query: str, file_index: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Search files by content similarity"""
-        results = []
-        query_lower = query.lower()
+    def _refresh(self) -> bool:
+        """
+        Bring the loaded index in line with the workspace and report whether anything changed.
         
-        for file_path, file_info in file_index.items():
-            content = file_info['content'].lower()
-            
-            # Simple relevance scoring
-            score = 0
-            
-            # Exact match bonus
-            if query_lower in content:
-                score += 10
+        Only a stat walk: files are re-read when their mtime or size differs from the
+        indexed signature, and files that disappeared are dropped.
+        """
+        pending = []
+        seen = set()
+        for relative_path, file_path, stat in self._iter_workspace_files():
+            seen.add(relative_path)
+            signature = (stat.st_mtime_ns, stat.st_size)
             
-            # Word matching
-            query_words = query_lower.split()
-            for word in query_words:
-                if word in content:
-                    score += content.count(word)
+            cached = self.file_index.get(relative_path)
+            if cached and (cached.mtime_ns, cached.file_size) == signature:
+                continue
+            if self.skipped.get(relative_path) == signature:
+                continue
             
-            # Function/class name matching
-            structure = file_info['structure']
-            for func in structure.get('functions', []):
-                if query_lower in func['name'].lower():
-                    score += 20
+            pending.append((relative_path, file_path, stat))
+        
+        self._apply_ingested(pending)
+        gone = (self.file_index.keys() | self.skipped.keys()) - seen
+        self._drop(list(gone))
+        return bool(pending) or bool(gone)
+    
+    def _apply_ingested(self, pending: List[Tuple[str, Path, os.stat_result]]) -> None:
+        """Ingest files and patch every index structure with the result"""
+        for relative_path, stat, entry in self._ingest_files(pending):
+            if entry:
+                record, content, postings, length = entry
+                self.file_index[relative_path] = record
+                self.skipped.pop(relative_path, None)
+                self.inverted_index.add_postings(relative_path, postings, length)
+                self.symbol_table.add_file(relative_path, record.structure)
+                if self.semantic_index is not None:
+                    self.semantic_index.add_file(relative_path, content, record.structure, record.extension)
+            else:
+                self.file_index.pop(relative_path, None)
+                self.skipped[relative_path] = (stat.st_mtime_ns, stat.st_size)
+                self.inverted_index.remove_document(relative_path)
+                self.symbol_table.remove_file(relative_path)
+                if self.semantic_index is not None:
+                    self.semantic_index.remove_file(relative_path)
+        
+        if self.semantic_index is not None:
+            self.semantic_index.flush()
+    
+    def ensure_index(self) -> Dict[str, Any]:
+        """
+        Return the in-memory index, building it on first use.
+        
+        Later calls re-run the mtime/size stat walk, so files written outside
+        update_paths (by the user, another process or a tool) are picked up by the
+        next search. Only files whose signature changed are re-read; the on-disk
+        index catches up on the next build, which checks the same signatures.
+        """
+        with self._lock:
+            if not self.is_indexed:
+                self._index_workspace(use_cache=True)
+            else:
+                self._refresh()
+            return self.file_index
+    
+    def ensure_bounded_index(self) -> bool:
+        """
+        ensure_index for callers that can do without the index, and report whether it is available.
+        
+        A first build only runs when there is a persisted index to start from or
+        the workspace holds at most `lazy_index_max_files` indexable files.
+        """
+        with self._lock:
+            if not self.is_indexed and not self.index_path.exists():
+                limit = self.lazy_index_max_files
+                if sum(1 for _ in islice(self._iter_workspace_files(), limit + 1)) > limit:
+                    return False
+            self.ensure_index()
+            return True
+    
+    def _relative_path(self, path: str) -> Optional[str]:
+        """Map an absolute or workspace-relative path to an index key, or None if it is not indexable"""
+        file_path = Path(path)
+        if not file_path.is_absolute():
+            file_path = self.workspace_path / file_path
+        try:
+            relative = file_path.resolve().relative_to(self.workspace_path.resolve())
+        except ValueError:
+            return None
+        
+        if file_path.suffix not in self.supported_extensions:
+            return None
+        if any(self._is_ignored(part) for part in relative.parts[:-1]):
+            return None
+        return str(relative)
+    
+    def update_paths(self, paths: List[str]) -> None:
+        """
+        Re-index the given files in place, at a cost proportional to the number of paths.
+        
+        Paths that no longer exist are dropped. Does nothing until the index has been
+        built in this process; the next build picks the changes up by mtime anyway.
+        """
+        with self._lock:
+            if not self.is_indexed:
+                return
             
-            for cls in structure.get('classes', []):
-                if query_lower in cls['name'].lower():
-                    score += 20
+            pending = []
+            removed = []
+            for path in paths:
+                relative_path = self._relative_path(path)
+                if relative_path is None:
+                    continue
+                file_path = self.workspace_path / relative_path
+                try:
+                    pending.append((relative_path, file_path, file_path.stat()))
+                except OSError:
+                    removed.append(relative_path)
             
-            if score > 0:
-                results.append({
-                    "file_path": file_path,
-                    "relevance_score": score,
-                    "content_preview": file_info['content'][:500],
-                    "structure": structure,
-                    "file_info": {
-                        "size": file_info['size'],
-                        "lines": file_info['lines'],
-                        "extension": file_info['extension']
-                    }
-                })
+            self._apply_ingested(pending)
+            self._drop(removed)
+    
+    def remove_paths(self, paths: List[str]) -> None:
+        """Drop the given files from the index"""
+        with self._lock:
+            if not self.is_indexed:
+                return
+            self._drop([p for p in (self._relative_path(path) for path in paths) if p is not None])
+    
+    def _drop(self, relative_paths: List[str]) -> None:
+        for relative_path in relative_paths:
+            self.file_index.pop(relative_path, None)
+            self.skipped.pop(relative_path, None)
+            self.inverted_index.remove_document(relative_path)
+            self.symbol_table.remove_file(relative_path)
+            if self.semantic_index is not None:
+                self.semantic_index.remove_file(relative_path)
+    
+    def _score_content(self, query: str, file_index: Dict[str, Any], limit: int) -> List[Candidate]:
+        """Top `limit` files by BM25 content score plus a bonus for function/class names matching the query"""
+        boosts: Dict[str, float] = {}
+        for symbol in self.symbol_table.prefix(query):
+            boosts[symbol.file_path] = boosts.get(symbol.file_path, 0) + 20
         
-        return sorted(results, key=lambda x: x['relevance_score'], reverse=True)
+        return [(score, file_path, None) for score, file_path in self.inverted_index.top_k(query, limit, boosts)
+                if file_path in file_index]
     
-    def search_by_filename(self, query: str, file_index: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Search files by filename"""
-        results = []
+    def _score_filename(self, query: str, file_index: Dict[str, Any], limit: int) -> List[Candidate]:
+        """Top `limit` files whose name contains the query, shorter names first"""
         query_lower = query.lower()
-        
-        for file_path, file_info in file_index.items():
+        candidates = []
+        for file_path in file_index:
             filename = Path(file_path).name.lower()
-            
-            score = 0
             if query_lower in filename:
-                score = 100 - len(filename)  # Shorter matches get higher scores
-                
-                results.append({
-                    "file_path": file_path,
-                    "relevance_score": score,
-                    "content_preview": file_info['content'][:500],
-                    "structure": file_info['structure'],
-                    "file_info": {
-                        "size": file_info['size'],
-                        "lines": file_info['lines'],
-                        "extension": file_info['extension']
-                    }
-                })
+                candidates.append((100 - len(filename), file_path, None))  # Shorter matches get higher scores
+        return heapq.nlargest(limit, candidates, key=lambda c: c[0])
+    
+    def _score_structure(self, query: str, file_index: Dict[str, Any], limit: int) -> List[Candidate]:
+        """Top `limit` files by matching definitions (prefix or fuzzy, via the symbol table) and imports"""
+        scores: Dict[str, float] = {}
+        matches: Dict[str, List[str]] = {}
+        
+        def add(file_path: str, score: float, match: str) -> None:
+            scores[file_path] = scores.get(file_path, 0) + score
+            matches.setdefault(file_path, []).append(match)
+        
+        # Search functions, methods and classes
+        seen = set()
+        for symbol in self.symbol_table.prefix(query):
+            seen.add((symbol.file_path, symbol.qualname, symbol.line))
+            add(symbol.file_path, 30, symbol_label(symbol))
+        for similarity, symbol in self.symbol_table.fuzzy(query, limit=limit * 5):
+            if (symbol.file_path, symbol.qualname, symbol.line) not in seen:
+                add(symbol.file_path, round(30 * similarity, 4), symbol_label(symbol))
         
-        return sorted(results, key=lambda x: x['relevance_score'], reverse=True)
+        # Search imports
+        query_lower = query.lower()
+        for file_path in self.symbol_table.find_importers(query):
+            for imp in file_index[file_path].structure.get('imports', []) if file_path in file_index else []:
+                if query_lower in imp.lower():
+                    add(file_path, 15, f"Import: {imp}")
+        
+        candidates = [(score, file_path, matches[file_path]) for file_path, score in scores.items() if file_path in file_index]
+        return heapq.nlargest(limit, candidates, key=lambda c: c[0])
+    
+    def _score_semantic(self, query: str, file_index: Dict[str, Any], limit: int) -> List[Candidate]:
+        """Top `limit` files by their best chunk's cosine similarity to the query"""
+        if self.semantic_index is None:
+            return []
+        scores: Dict[str, float] = {}
+        matches: Dict[str, List[str]] = {}
+        for similarity, chunk in self.semantic_index.search(query, limit * 3):
+            if chunk.file_path not in file_index:
+                continue
+            scores[chunk.file_path] = max(scores.get(chunk.file_path, float('-inf')), similarity * SEMANTIC_SCORE_WEIGHT)
+            matches.setdefault(chunk.file_path, []).append(
+                f"Chunk: {chunk.label} (lines {chunk.start_line}-{chunk.end_line}, similarity {similarity:.3f})"
+            )
+        candidates = [(score, file_path, matches[file_path]) for file_path, score in scores.items()]
+        return heapq.nlargest(limit, candidates, key=lambda c: c[0])
+    
+    def _build_result(self, candidate: Candidate, file_index: Dict[str, Any]) -> Dict[str, Any]:
+        """Materialise the JSON payload for a ranked candidate; only done for the final winners"""
+        score, file_path, matches = candidate
+        file_info = file_index[file_path]
+        result = {"file_path": file_path, "relevance_score": round(score, 4)}
+        if matches is not None:
+            result["matches"] = matches
+        result.update({
+            "content_preview": file_info.preview(self.workspace_path, 500),
+            "structure": file_info.structure,
+            "file_info": file_info.info()
+        })
+        return result
     
-    def search_by_structure(self, query: str, file_index: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def search_by_content(self, query: str, file_index: Dict[str, Any], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Search files by content using BM25 over the inverted index"""
+        candidates = self._score_content(query, file_index, limit or self.max_results)
+        return [self._build_result(c, file_index) for c in candidates]
+    
+    def search_by_filename(self, query: str, file_index: Dict[str, Any], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Search files by filename"""
+        candidates = self._score_filename(query, file_index, limit or self.max_results)
+        return [self._build_result(c, file_index) for c in candidates]
+    
+    def search_by_structure(self, query: str, file_index: Dict[str, Any], limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Search for functions, classes, or imports"""
-        results = []
-        query_lower = query.lower()
+        candidates = self._score_structure(query, file_index, limit or self.max_results)
+        return [self._build_result(c, file_index) for c in candidates]
+    
+    def search(self, query: str, search_type: str, file_index: Dict[str, Any], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Unified ranking across search types.
         
-        for file_path, file_info in file_index.items():
-            structure = file_info['structure']
-            score = 0
-            matches = []
-            
-            # Search functions
-            for func in structure.get('functions', []):
-                if query_lower in func['name'].lower():
-                    score += 30
-                    matches.append(f"Function: {func['name']} (line {func['line']})")
-            
-            # Search classes
-            for cls in structure.get('classes', []):
-                if query_lower in cls['name'].lower():
-                    score += 30
-                    matches.append(f"Class: {cls['name']} (line {cls['line']})")
-            
-            # Search imports
-            for imp in structure.get('imports', []):
-                if query_lower in imp.lower():
-                    score += 15
-                    matches.append(f"Import: {imp}")
-            
-            if score > 0:
-                results.append({
-                    "file_path": file_path,
-                    "relevance_score": score,
-                    "matches": matches,
-                    "content_preview": file_info['content'][:500],
-                    "structure": structure,
-                    "file_info": {
-                        "size": file_info['size'],
-                        "lines": file_info['lines'],
-                        "extension": file_info['extension']
-                    }
-                })
+        Each scorer keeps only its own top `limit` candidates; a file's final score is
+        its best score across scorers, so the overall top `limit` is always drawn from
+        those. Previews and structure payloads are built for the winners only.
+        """
+        limit = limit or self.max_results
+        if search_type == "semantic" and not self.semantic_enabled:
+            raise ValueError("Semantic search is disabled; enable it with SEMANTIC_SEARCH=true")
         
-        return sorted(results, key=lambda x: x['relevance_score'], reverse=True)
+        scorers = {
+            "content": self._score_content,
+            "filename": self._score_filename,
+            "structure": self._score_structure
+        }
+        if self.semantic_enabled:
+            scorers["semantic"] = self._score_semantic
+        
+        best: Dict[str, Candidate] = {}
+        for name, scorer in scorers.items():
+            if search_type not in (name, "all"):
+                continue
+            for candidate in scorer(query, file_index, limit):
+                current = best.get(candidate[1])
+                if current is None or candidate[0] > current[0]:
+                    best[candidate[1]] = candidate
+        
+        winners = heapq.nlargest(limit, best.values(), key=lambda c: c[0])
+        return [self._build_result(c, file_index) for c in winners]
+    
+    def search_workspace(self, query: str, search_type: str, limit: Optional[int] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """(files indexed, results) of a search over the freshly checked index, run under the engine lock"""
+        with self._lock:
+            file_index = self.ensure_index()
+            return len(file_index), self.search(query, search_type, file_index, limit)
+    
+    def lookup_definitions(self, name: str, limit: Optional[int] = None) -> Optional[List[Tuple[Symbol, FileRecord]]]:
+        """
+        Definitions of `name`, each with the record of its file, or None until the index is built.
+        
+        Never builds or refreshes the index itself; callers that may build it use
+        ensure_bounded_index first.
+        """
+        with self._lock:
+            if not self.is_indexed:
+                return None
+            found = [(symbol, self.file_index[symbol.file_path])
+                     for symbol in self.symbol_table.find_definitions(name) if symbol.file_path in self.file_index]
+            return found[:limit] if limit else found
+    
+    def lookup_symbols(self, query: str, lookup_type: str = "definitions", limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Precise symbol locations from the symbol table.
+        
+        lookup_type is "definitions" (exact name, Class.method or dotted path),
+        "prefix", "fuzzy", or "importers" (files importing a module or symbol).
+        """
+        limit = limit or self.max_results
+        with self._lock:
+            self.ensure_index()
+            if lookup_type == "definitions":
+                return [symbol.to_dict() for symbol in self.symbol_table.find_definitions(query)[:limit]]
+            if lookup_type == "prefix":
+                return [symbol.to_dict() for symbol in self.symbol_table.prefix(query, limit)]
+            if lookup_type == "fuzzy":
+                return [{**symbol.to_dict(), "similarity": round(similarity, 4)}
+                        for similarity, symbol in self.symbol_table.fuzzy(query, limit)]
+            if lookup_type == "importers":
+                return [{"file_path": file_path} for file_path in self.symbol_table.find_importers(query)[:limit]]
+        raise ValueError(f"Unknown lookup_type: {lookup_type}")
+
+def _create_google_embeddings():
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+    return GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+
+
+def get_search_engine(workspace_path: str) -> InternalSearchEngine:
+    """Return the process-wide engine for a workspace so its index is reused across searches"""
+    key = str(Path(workspace_path).resolve())
+    return get_client(f"search_engine:{key}", lambda: InternalSearchEngine(key))
 
 
 @tool
@@ -230,43 +756,20 @@ def internal_search(query: str, workspace_path: str, search_type: str = "content
     Args:
         query: The search query
         workspace_path: Path to the workspace directory
-        search_type: Type of search - "content", "filename", "structure", or "all"
+        search_type: Type of search - "content", "filename", "structure", "semantic", or "all"
     
     Returns:
         JSON string with search results
     """
     try:
-        engine = InternalSearchEngine(workspace_path)
-        file_index = engine.index_workspace()
-        
-        all_results = []
-        
-        if search_type in ["content", "all"]:
-            content_results = engine.search_by_content(query, file_index)
-            all_results.extend(content_results)
-        
-        if search_type in ["filename", "all"]:
-            filename_results = engine.search_by_filename(query, file_index)
-            all_results.extend(filename_results)
-        
-        if search_type in ["structure", "all"]:
-            structure_results = engine.search_by_structure(query, file_index)
-            all_results.extend(structure_results)
-        
-        # Remove duplicates and sort by relevance
-        seen_files = set()
-        unique_results = []
-        for result in sorted(all_results, key=lambda x: x['relevance_score'], reverse=True):
-            if result['file_path'] not in seen_files:
-                seen_files.add(result['file_path'])
-                unique_results.append(result)
+        files_indexed, results = get_search_engine(workspace_path).search_workspace(query, search_type)
         
         return json.dumps({
             "query": query,
             "search_type": search_type,
-            "total_files_indexed": len(file_index),
-            "results_count": len(unique_results),
-            "results": unique_results[:10]  # Top 10 results
+            "total_files_indexed": files_indexed,
+            "results_count": len(results),
+            "results": results
         }, indent=2)
         
     except Exception as e:
@@ -274,4 +777,45 @@ def internal_search(query: str, workspace_path: str, search_type: str = "content
             "error": str(e),
             "query": query,
             "results": []
-        })
\ No newline at end of file
+        })
+
+
+@tool
+def symbol_lookup(query: str, workspace_path: str, lookup_type: str = "definitions") -> str:
+    """
+    Look up symbol locations in the workspace codebase.
+    
+    Args:
+        query: Symbol name, Class.method, dotted path, prefix, or module to look up
+        workspace_path: Path to the workspace directory
+        lookup_type: Type of lookup - "definitions", "prefix", "fuzzy", or "importers"
+    
+    Returns:
+        JSON string with matching symbols (name, qualified_name, file_path, line, kind) or importing files
+    """
+    try:
+        results = get_search_engine(workspace_path).lookup_symbols(query, lookup_type)
+        return json.dumps({
+            "query": query,
+            "lookup_type": lookup_type,
+            "results_count": len(results),
+            "results": results
+        }, indent=2)
+    except Exception as e:
+        return json.dumps({
+            "error": str(e),
+            "query": query,
+            "results": []
+        })
+
+# Index lookups are CPU-bound and serialized on the engine lock, so async callers run them in a worker thread
+async def _ainternal_search(query: str, workspace_path: str, search_type: str = "content") -> str:
+    return await asyncio.to_thread(internal_search.func, query, workspace_path, search_type)
+
+
+async def _asymbol_lookup(query: str, workspace_path: str, lookup_type: str = "definitions") -> str:
+    return await asyncio.to_thread(symbol_lookup.func, query, workspace_path, lookup_type)
+
+
+internal_search.coroutine = _ainternal_search
+symbol_lookup.coroutine = _asymbol_lookup
@@ -0,0 +1,274 @@
+# search/inverted_index.py
+
+import re
+import sys
+import math
+import heapq
+from operator import sub
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+
+TOKEN_PATTERN = re.compile(r'[A-Za-z0-9_]+')
+SUBTOKEN_PATTERN = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+')
+# Words whose index terms are memoised per process; source text repeats the same few identifiers
+WORD_TERMS_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=WORD_TERMS_CACHE_SIZE)
+def word_terms(word: str) -> Tuple[str, ...]:
+    """
+    The index terms of one word: the word lowercased, then its snake_case /
+    camelCase parts when it is a compound identifier.
+    """
+    lowered = word.lower()
+    parts = [part.lower() for part in SUBTOKEN_PATTERN.findall(word)]
+    if len(parts) < 2:
+        return (lowered,)
+    return (lowered, *sorted(set(parts) - {lowered}))
+
+
+def document_terms(text: str) -> Tuple[Dict[str, List[int]], int]:
+    """
+    Term -> sorted positions for a document, plus its length in words.
+
+    One regex pass finds the words; sub-tokens are derived once per distinct
+    word and share the word's position, so phrase matching stays consistent.
+    """
+    words = TOKEN_PATTERN.findall(text)
+    by_word: Dict[str, List[int]] = {}
+    for position, word in enumerate(words):
+        word_positions = by_word.get(word)
+        if word_positions is None:
+            by_word[word] = [position]
+        else:
+            word_positions.append(position)
+
+    terms: Dict[str, List[int]] = {}
+    merged = set()
+    for word, word_positions in by_word.items():
+        for term in word_terms(word):
+            existing = terms.get(term)
+            if existing is None:
+                terms[term] = word_positions
+            else:
+                terms[term] = existing + word_positions
+                merged.add(term)
+    for term in merged:
+        terms[term].sort()
+    return terms, len(words)
+
+
+def tokenize(text: str) -> List[Tuple[str, int]]:
+    """Split text into (token, position) pairs, compound identifiers also by their parts"""
+    return [(term, position) for position, word in enumerate(TOKEN_PATTERN.findall(text)) for term in word_terms(word)]
+
+
+def tokenize_query(query: str) -> List[str]:
+    """Lowercased query terms in order, without sub-token expansion"""
+    return [match.group().lower() for match in TOKEN_PATTERN.finditer(query)]
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def encode_positions(positions: List[int]) -> bytes:
+    """Varint-encode a term's count followed by its delta-encoded positions"""
+    values = [len(positions), positions[0], *map(sub, positions[1:], positions)]
+    if max(values) < 0x80:
+        # Common case: every value fits one byte, so the encoding is the values themselves
+        return bytes(values)
+    # Otherwise only the few large values need the byte loop; runs of small ones are copied whole
+    out = bytearray()
+    start = 0
+    for i in [i for i, value in enumerate(values) if value >= 0x80]:
+        out += bytes(values[start:i])
+        out += _varint(values[i])
+        start = i + 1
+    out += bytes(values[start:])
+    return bytes(out)
+
+
+def encode_document(text: str) -> Tuple[Dict[str, bytes], int]:
+    """Encoded postings and length of one document, ready for InvertedIndex.add_postings"""
+    terms, length = document_terms(text)
+    return {term: encode_positions(positions) for term, positions in terms.items()}, length
+
+
+def decode_positions(data: bytes) -> List[int]:
+    count, offset = _read_varint(data, 0)
+    positions = []
+    position = 0
+    for _ in range(count):
+        delta, offset = _read_varint(data, offset)
+        position += delta
+        positions.append(position)
+    return positions
+
+
+def term_frequency(data: bytes) -> int:
+    """Read just the leading count from an encoded posting"""
+    return _read_varint(data, 0)[0]
+
+
+class InvertedIndex:
+    """
+    Token -> {doc_id: positions} postings with BM25 scoring and phrase matching.
+
+    Positions are stored varint/delta-encoded, which keeps the postings several
+    times smaller than the text they index; they are only decoded for phrase checks.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, bytes]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.doc_terms: Dict[str, Tuple[str, ...]] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_lengths
+
+    def add_document(self, doc_id: str, text: str) -> None:
+        """Index a document, replacing any previous version with the same id"""
+        self.add_postings(doc_id, *encode_document(text))
+
+    def add_postings(self, doc_id: str, postings: Dict[str, bytes], length: int) -> None:
+        """Merge a document's encoded postings from encode_document, replacing any previous version"""
+        if doc_id in self.doc_lengths:
+            self.remove_document(doc_id)
+
+        terms = []
+        for token, encoded in postings.items():
+            # Interned so postings keys and doc_terms share one string per token
+            token = sys.intern(token)
+            terms.append(token)
+            doc_postings = self.postings.get(token)
+            if doc_postings is None:
+                self.postings[token] = {doc_id: encoded}
+            else:
+                doc_postings[doc_id] = encoded
+
+        self.doc_lengths[doc_id] = length
+        self.doc_terms[doc_id] = tuple(terms)
+        self.total_length += length
+
+    def remove_document(self, doc_id: str) -> None:
+        """Drop a document and its postings"""
+        if doc_id not in self.doc_lengths:
+            return
+
+        for token in self.doc_terms.pop(doc_id):
+            doc_postings = self.postings.get(token)
+            if doc_postings is None:
+                continue
+            doc_postings.pop(doc_id, None)
+            if not doc_postings:
+                del self.postings[token]
+
+        self.total_length -= self.doc_lengths.pop(doc_id)
+
+    def idf(self, term: str) -> float:
+        doc_count = len(self.doc_lengths)
+        doc_freq = len(self.postings.get(term, ()))
+        return math.log(1 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def _term_score(self, idf: float, term_freq: int, doc_length: int, avg_length: float) -> float:
+        norm = self.k1 * (1 - self.b + self.b * doc_length / avg_length)
+        return idf * term_freq * (self.k1 + 1) / (term_freq + norm)
+
+    def contains_phrase(self, terms: List[str], doc_id: str) -> bool:
+        """True if the terms occur at consecutive positions in the document"""
+        if not terms:
+            return False
+
+        term_positions = []
+        for term in terms:
+            positions = self.postings.get(term, {}).get(doc_id)
+            if positions is None:
+                return False
+            term_positions.append(decode_positions(positions))
+
+        following = [set(positions) for positions in term_positions[1:]]
+        for start in term_positions[0]:
+            if all(start + offset in positions for offset, positions in enumerate(following, 1)):
+                return True
+        return False
+
+    def upper_bound(self, term: str) -> float:
+        """The most a single term can contribute to any document's BM25 score"""
+        return self.idf(term) * (self.k1 + 1)
+
+    def top_k(self, query: str, k: int, boosts: Optional[Dict[str, float]] = None) -> List[Tuple[float, str]]:
+        """
+        Return the k best (score, doc_id) pairs for the query, best first.
+
+        Scores are BM25 plus a bonus when multi-term queries appear as an exact
+        phrase, plus any caller-supplied per-document boosts. Terms are visited in
+        order of decreasing upper bound; once the remaining terms can no longer lift
+        an unseen document past the current k-th score, new documents stop being
+        admitted and only existing candidates keep accumulating.
+        """
+        terms = tokenize_query(query)
+        scores: Dict[str, float] = dict(boosts or {})
+        if k <= 0 or not self.doc_lengths:
+            return []
+
+        avg_length = max(self.total_length / len(self.doc_lengths), 1.0)
+        ordered_terms = sorted({term for term in terms if term in self.postings}, key=self.upper_bound, reverse=True)
+
+        phrase_bonus = 0.0
+        if len(terms) > 1 and all(term in self.postings for term in terms):
+            phrase_bonus = sum(self.idf(term) for term in terms)
+
+        # remaining[i]: the best score a document first seen at term i could still reach
+        remaining = [phrase_bonus] * (len(ordered_terms) + 1)
+        for i in range(len(ordered_terms) - 1, -1, -1):
+            remaining[i] = remaining[i + 1] + self.upper_bound(ordered_terms[i])
+
+        admit_new = True
+        for i, term in enumerate(ordered_terms):
+            if admit_new and len(scores) >= k and remaining[i] <= self._kth_score(scores, k):
+                admit_new = False
+
+            idf = self.idf(term)
+            for doc_id, positions in self.postings[term].items():
+                current = scores.get(doc_id)
+                if current is None and not admit_new:
+                    continue
+                score = self._term_score(idf, term_frequency(positions), self.doc_lengths[doc_id], avg_length)
+                scores[doc_id] = (current or 0.0) + score
+
+        if phrase_bonus:
+            threshold = self._kth_score(scores, k) if len(scores) >= k else float('-inf')
+            for doc_id, score in scores.items():
+                if score + phrase_bonus > threshold and self.contains_phrase(terms, doc_id):
+                    scores[doc_id] = score + phrase_bonus
+
+        return heapq.nlargest(k, ((score, doc_id) for doc_id, score in scores.items() if score > 0))
+
+    @staticmethod
+    def _kth_score(scores: Dict[str, float], k: int) -> float:
+        return heapq.nlargest(k, scores.values())[-1]
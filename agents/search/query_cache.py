@@ -0,0 +1,157 @@
+# search/query_cache.py
+
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from pathlib import Path
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query"""
+    return ' '.join(query.lower().split())
+
+
+class QueryCache:
+    """
+    Search results keyed by normalized query and result count, kept for `ttl` seconds.
+
+    Entries live in memory and as one JSON file each under `directory`, so they
+    survive across sessions. Concurrent lookups of the same key share a single
+    upstream call: the first caller fetches, the others wait for its result.
+    """
+
+    def __init__(self, directory: Path, ttl: float):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._memory: Dict[str, Tuple[float, Any]] = {}
+        self._in_flight: Dict[str, Future] = {}
+
+    @staticmethod
+    def key(query: str, max_results: int) -> str:
+        return hashlib.sha1(f"{max_results}\0{normalize_query(query)}".encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _fresh(self, entry: Tuple[float, Any]) -> bool:
+        return time.time() - entry[0] < self.ttl
+
+    def _read(self, key: str) -> Optional[Tuple[float, Any]]:
+        """The unexpired (fetched_at, results) stored on disk for a key; called without the lock held"""
+        try:
+            data = json.loads(self._path(key).read_text(encoding='utf-8'))
+            entry = (data["fetched_at"], data["results"])
+        except (OSError, ValueError, KeyError):
+            return None
+        if not self._fresh(entry):
+            self._path(key).unlink(missing_ok=True)
+            return None
+        return entry
+
+    def _check(self, key: str) -> Optional[Tuple[Optional[Any], Optional[Future], bool]]:
+        """A claim answered from memory or an in-flight call, else None; needs the lock"""
+        entry = self._memory.get(key)
+        if entry is not None:
+            if self._fresh(entry):
+                return entry[1], None, False
+            del self._memory[key]
+        future = self._in_flight.get(key)
+        if future is not None:
+            return None, future, False
+        return None
+
+    def _claim(self, key: str) -> Tuple[Optional[Any], Optional[Future], bool]:
+        """(cached results, in-flight future, whether this caller must fetch) for a key"""
+        with self._lock:
+            claim = self._check(key)
+        if claim is not None:
+            return claim
+
+        # Disk is read outside the lock so a slow read never stalls lookups of other keys
+        stored = self._read(key)
+        with self._lock:
+            if stored is not None:
+                self._memory.setdefault(key, stored)
+            claim = self._check(key)
+            if claim is not None:
+                return claim
+            future = self._in_flight[key] = Future()
+            return None, future, True
+
+    def _resolve(self, key: str, future: Future, results: Any) -> float:
+        """Keep the results in memory and hand them to waiting callers; returns their fetch time"""
+        fetched_at = time.time()
+        with self._lock:
+            self._memory[key] = (fetched_at, results)
+        future.set_result(results)
+        return fetched_at
+
+    def _release(self, key: str, future: Future, error: Optional[BaseException]) -> None:
+        # Failures, cancellation included, are shared with waiting callers but never cached
+        if error is not None and not future.done():
+            future.set_exception(error)
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    def _persist(self, key: str, query: str, max_results: int, fetched_at: float, results: Any) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.directory / f".{key}.{threading.get_ident()}.tmp"
+            tmp_path.write_text(json.dumps({
+                "query": normalize_query(query),
+                "max_results": max_results,
+                "fetched_at": fetched_at,
+                "results": results
+            }), encoding='utf-8')
+            tmp_path.replace(self._path(key))
+        except (OSError, TypeError) as e:
+            print(f"Error persisting search results for '{query}': {e}")
+
+    def get_or_fetch(self, query: str, max_results: int, fetch: Callable[[], Any]) -> Any:
+        """Cached results for the query, else the result of `fetch`, which runs once per key at a time"""
+        key = self.key(query, max_results)
+        results, future, leader = self._claim(key)
+        if future is None:
+            return results
+        if not leader:
+            return future.result()
+
+        error = None
+        try:
+            results = fetch()
+            fetched_at = self._resolve(key, future, results)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._release(key, future, error)
+        self._persist(key, query, max_results, fetched_at, results)
+        return results
+
+    async def aget_or_fetch(self, query: str, max_results: int, afetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Async get_or_fetch; waits on the same in-flight calls as threaded callers"""
+        key = self.key(query, max_results)
+        results, future, leader = self._claim(key)
+        if future is None:
+            return results
+        if not leader:
+            # Shielded so a cancelled waiter cannot cancel the shared future
+            return await asyncio.shield(asyncio.wrap_future(future))
+
+        error = None
+        try:
+            results = await afetch()
+            fetched_at = self._resolve(key, future, results)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._release(key, future, error)
+        # Waiters already have the results, so a cancellation here only skips the disk write
+        await asyncio.to_thread(self._persist, key, query, max_results, fetched_at, results)
+        return results
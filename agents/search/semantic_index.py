@@ -0,0 +1,316 @@
+# search/semantic_index.py
+
+import re
+import zlib
+import hashlib
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Protocol
+
+import numpy as np
+
+from search.inverted_index import tokenize
+
+
+# Window used for non-Python files and for Python code outside any definition
+WINDOW_LINES = 40
+WINDOW_OVERLAP = 10
+# Definitions longer than this are split into windows as well
+MAX_CHUNK_LINES = 120
+EMBED_BATCH_SIZE = 64
+# Shards are merged into one file once there are more than this many
+MAX_CACHE_SHARDS = 32
+
+
+class Embedder(Protocol):
+    """Anything with the LangChain Embeddings interface, e.g. GoogleGenerativeAIEmbeddings"""
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]: ...
+
+    def embed_query(self, text: str) -> List[float]: ...
+
+
+class HashingEmbedder:
+    """
+    Deterministic feature-hashing embedder over code tokens.
+
+    Needs no network or model, so it is suitable for offline runs and tests; it
+    captures lexical overlap only, not meaning.
+    """
+
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+        self.model = f"hashing-{dimensions}"
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for token, _ in tokenize(text):
+            digest = zlib.crc32(token.encode('utf-8'))
+            vector[digest % self.dimensions] += 1.0 if (digest >> 16) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def embedder_key(embedder: Embedder) -> str:
+    """Filesystem-safe identifier used to keep each embedder's vectors apart"""
+    name = getattr(embedder, "model", None) or type(embedder).__name__
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', str(name))
+
+
+class Chunk:
+    __slots__ = ('file_path', 'start_line', 'end_line', 'label', 'content_hash')
+
+    def __init__(self, file_path: str, start_line: int, end_line: int, label: str, content_hash: bytes):
+        self.file_path = file_path
+        self.start_line = start_line
+        self.end_line = end_line
+        self.label = label
+        self.content_hash = content_hash
+
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            setattr(self, slot, value)
+
+
+def _windows(start: int, end: int, label: str) -> List[Tuple[int, int, str]]:
+    """Split the 1-based inclusive line range into overlapping windows"""
+    spans = []
+    step = WINDOW_LINES - WINDOW_OVERLAP
+    line = start
+    while line <= end:
+        spans.append((line, min(line + WINDOW_LINES - 1, end), label))
+        if line + WINDOW_LINES - 1 >= end:
+            break
+        line += step
+    return spans
+
+
+def chunk_spans(content: str, structure: Dict[str, Any], extension: str) -> List[Tuple[int, int, str]]:
+    """
+    Line spans to embed for one file.
+
+    Python files are chunked by definition: top-level functions, methods and
+    method-less classes, with anything in between windowed as module code.
+    Everything else is windowed.
+    """
+    line_count = content.count('\n') + 1
+    if extension != '.py':
+        return _windows(1, line_count, "window")
+
+    definitions = []
+    for func in structure.get("functions", []):
+        depth = func.get("qualname", func["name"]).count('.')
+        is_method = func.get("kind", "").endswith("method")
+        if (depth == 0 and not is_method) or (depth == 1 and is_method):
+            definitions.append((func["line"], func.get("end_line", func["line"]), func.get("qualname", func["name"])))
+    for cls in structure.get("classes", []):
+        if not cls.get("methods") and '.' not in cls.get("qualname", cls["name"]):
+            definitions.append((cls["line"], cls.get("end_line", cls["line"]), cls.get("qualname", cls["name"])))
+    definitions.sort()
+
+    spans = []
+    cursor = 1
+    for start, end, label in definitions:
+        if start < cursor:
+            continue
+        if start > cursor:
+            spans.extend(_windows(cursor, start - 1, "module"))
+        if end - start + 1 > MAX_CHUNK_LINES:
+            spans.extend(_windows(start, end, label))
+        else:
+            spans.append((start, end, label))
+        cursor = end + 1
+    if cursor <= line_count:
+        spans.extend(_windows(cursor, line_count, "module"))
+    return spans
+
+
+class EmbeddingCache:
+    """
+    On-disk vectors keyed by chunk content hash, one directory per embedder.
+
+    Each save writes only the vectors added since the previous save as a new
+    shard, so persisting after a small update costs O(new chunks).
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._rows: Dict[bytes, int] = {}
+        self._row_count = 0
+        self._blocks: List[np.ndarray] = []
+        self._pending_keys: List[bytes] = []
+        self._pending_vectors: List[np.ndarray] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._load()
+
+    def _load(self) -> None:
+        shards = sorted(self.directory.glob('shard-*.npz'))
+        for shard in shards:
+            try:
+                with np.load(shard) as data:
+                    self._append(list(data['keys']), data['vectors'])
+            except Exception as e:
+                print(f"Discarding unreadable embedding shard {shard}: {e}")
+        if len(shards) > MAX_CACHE_SHARDS:
+            self._compact(shards)
+
+    def _append(self, keys: List[bytes], vectors: np.ndarray) -> None:
+        for i, key in enumerate(keys):
+            self._rows.setdefault(bytes(key), self._row_count + i)
+        self._row_count += len(keys)
+        self._blocks.append(vectors.astype(np.float32, copy=False))
+        self._matrix = None
+
+    def _write_shard(self, path: Path, keys: List[bytes], vectors: np.ndarray) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.parent / f".{path.name}"
+        np.savez(tmp_path, keys=np.array(keys, dtype='S20'), vectors=vectors)
+        tmp_path.replace(path)
+
+    def _compact(self, shards: List[Path]) -> None:
+        ordered = sorted(self._rows.items(), key=lambda item: item[1])
+        keys = [key for key, _ in ordered]
+        self._write_shard(self.directory / 'shard-000000.npz', keys, self.vectors[[row for _, row in ordered]])
+        for shard in shards:
+            if shard.name != 'shard-000000.npz':
+                shard.unlink(missing_ok=True)
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._rows
+
+    @property
+    def vectors(self) -> np.ndarray:
+        if self._matrix is None:
+            self._matrix = np.vstack(self._blocks) if self._blocks else np.zeros((0, 0), dtype=np.float32)
+            self._blocks = [self._matrix]
+        return self._matrix
+
+    def row(self, key: bytes) -> Optional[int]:
+        return self._rows.get(key)
+
+    def put_many(self, keys: List[bytes], vectors: np.ndarray) -> None:
+        new = [(key, vector) for key, vector in zip(keys, vectors) if key not in self._rows]
+        if not new:
+            return
+        new_keys = [key for key, _ in new]
+        new_vectors = np.vstack([vector for _, vector in new]).astype(np.float32)
+        self._append(new_keys, new_vectors)
+        self._pending_keys.extend(new_keys)
+        self._pending_vectors.append(new_vectors)
+
+    def save(self) -> None:
+        if not self._pending_keys:
+            return
+        try:
+            existing = sorted(self.directory.glob('shard-*.npz'))
+            next_index = int(existing[-1].stem.split('-')[1]) + 1 if existing else 0
+            self._write_shard(self.directory / f'shard-{next_index:06d}.npz',
+                              self._pending_keys, np.vstack(self._pending_vectors))
+            self._pending_keys = []
+            self._pending_vectors = []
+        except Exception as e:
+            print(f"Error saving embeddings to {self.directory}: {e}")
+
+
+class SemanticIndex:
+    """
+    Chunk-level vector index over the workspace.
+
+    Chunk metadata is pickled with the rest of the search index; vectors live in
+    the EmbeddingCache, so unchanged chunks are never re-embedded. Queries are a
+    single matrix-vector product over L2-normalised rows.
+    """
+
+    def __init__(self):
+        self.file_chunks: Dict[str, List[Chunk]] = {}
+        self._reset_runtime()
+
+    def _reset_runtime(self) -> None:
+        self.embedder: Optional[Embedder] = None
+        self.cache: Optional[EmbeddingCache] = None
+        self._pending: Dict[bytes, str] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._row_chunks: List[Chunk] = []
+
+    def __getstate__(self):
+        return {"file_chunks": self.file_chunks}
+
+    def __setstate__(self, state):
+        self.file_chunks = state["file_chunks"]
+        self._reset_runtime()
+
+    def attach(self, embedder: Embedder, cache: EmbeddingCache) -> None:
+        self.embedder = embedder
+        self.cache = cache
+        self._matrix = None
+
+    def add_file(self, file_path: str, content: str, structure: Dict[str, Any], extension: str) -> None:
+        """Chunk a file and queue any chunk whose content has not been embedded yet"""
+        lines = content.split('\n')
+        chunks = []
+        for start, end, label in chunk_spans(content, structure, extension):
+            text = '\n'.join(lines[start - 1:end])
+            if not text.strip():
+                continue
+            content_hash = hashlib.sha1(text.encode('utf-8')).digest()
+            chunks.append(Chunk(file_path, start, end, label, content_hash))
+            if content_hash not in self.cache:
+                self._pending[content_hash] = text
+        self.file_chunks[file_path] = chunks
+        self._matrix = None
+
+    def remove_file(self, file_path: str) -> None:
+        if self.file_chunks.pop(file_path, None) is not None:
+            self._matrix = None
+
+    def flush(self) -> None:
+        """Embed queued chunks in batches and persist the new vectors"""
+        if not self._pending:
+            return
+        keys = list(self._pending)
+        for start in range(0, len(keys), EMBED_BATCH_SIZE):
+            batch = keys[start:start + EMBED_BATCH_SIZE]
+            vectors = np.asarray(self.embedder.embed_documents([self._pending[key] for key in batch]), dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            self.cache.put_many(batch, vectors / np.where(norms == 0, 1, norms))
+        self._pending = {}
+        self.cache.save()
+        self._matrix = None
+
+    def _build_matrix(self) -> None:
+        rows = []
+        self._row_chunks = []
+        for chunks in self.file_chunks.values():
+            for chunk in chunks:
+                row = self.cache.row(chunk.content_hash)
+                if row is not None:
+                    rows.append(row)
+                    self._row_chunks.append(chunk)
+        self._matrix = self.cache.vectors[rows] if rows else None
+
+    def search(self, query: str, k: int) -> List[Tuple[float, Chunk]]:
+        """Top-k chunks by cosine similarity to the query"""
+        self.flush()
+        if self._matrix is None:
+            self._build_matrix()
+        if self._matrix is None or k <= 0:
+            return []
+
+        query_vector = np.asarray(self.embedder.embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        if not norm:
+            return []
+        scores = self._matrix @ (query_vector / norm)
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self._row_chunks[i]) for i in top]
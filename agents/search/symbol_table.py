@@ -0,0 +1,217 @@
+# search/symbol_table.py
+
+from bisect import bisect_left
+from typing import Dict, List, Set, Tuple, Any, Optional
+
+
+def module_name(file_path: str) -> str:
+    """Dotted module name for a workspace-relative Python path"""
+    parts = file_path.replace('\\', '/').split('/')
+    parts[-1] = parts[-1].rsplit('.', 1)[0]
+    if parts[-1] == '__init__' and len(parts) > 1:
+        parts.pop()
+    return '.'.join(parts)
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"${text.lower()}$"
+    return {padded[i:i + 3] for i in range(max(len(padded) - 2, 1))}
+
+
+class Symbol:
+    __slots__ = ('name', 'qualname', 'qualified_name', 'file_path', 'line', 'kind')
+
+    def __init__(self, name: str, qualname: str, module: str, file_path: str, line: int, kind: str):
+        self.name = name
+        self.qualname = qualname
+        self.qualified_name = f"{module}.{qualname}"
+        self.file_path = file_path
+        self.line = line
+        self.kind = kind
+
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            setattr(self, slot, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "qualified_name": self.qualified_name,
+            "file_path": self.file_path,
+            "line": self.line,
+            "kind": self.kind
+        }
+
+
+class SymbolTable:
+    """
+    Workspace-wide index of definitions and imports built from extracted code structure.
+
+    Names are kept in a sorted key array for O(log n) prefix lookup, with a trigram
+    index on top for fuzzy matching. Imports are indexed by their full dotted path
+    and by their last component so importers of a module or a symbol can be found.
+    New keys are buffered and sorted in once, before the next lookup or removal,
+    so building the table does not pay a list insertion per key.
+    """
+
+    def __init__(self):
+        self._symbols: Dict[int, Symbol] = {}
+        self._file_symbols: Dict[str, List[int]] = {}
+        self._file_import_keys: Dict[str, List[str]] = {}
+        self._name_keys: List[Tuple[str, int]] = []
+        self._import_keys: List[Tuple[str, str]] = []
+        self._new_name_keys: List[Tuple[str, int]] = []
+        self._new_import_keys: List[Tuple[str, str]] = []
+        self._trigrams: Dict[str, Set[int]] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    @staticmethod
+    def _symbol_keys(symbol: Symbol) -> Set[str]:
+        return {symbol.name.lower(), symbol.qualname.lower(), symbol.qualified_name.lower()}
+
+    @staticmethod
+    def _import_keys_for(imported: str) -> Set[str]:
+        lowered = imported.lower().strip('.')
+        return {lowered, lowered.rsplit('.', 1)[-1]}
+
+    def add_file(self, file_path: str, structure: Dict[str, Any]) -> None:
+        """Index the definitions and imports of one file, replacing any earlier version"""
+        self.remove_file(file_path)
+
+        module = module_name(file_path)
+        symbol_ids = []
+        definitions = [(item, item.get("kind", "function")) for item in structure.get("functions", [])]
+        definitions += [(item, "class") for item in structure.get("classes", [])]
+
+        for item, kind in definitions:
+            symbol = Symbol(item["name"], item.get("qualname", item["name"]), module, file_path, item["line"], kind)
+            symbol_id = self._next_id
+            self._next_id += 1
+            self._symbols[symbol_id] = symbol
+            symbol_ids.append(symbol_id)
+
+            for key in self._symbol_keys(symbol):
+                self._new_name_keys.append((key, symbol_id))
+            for gram in trigrams(symbol.name):
+                self._trigrams.setdefault(gram, set()).add(symbol_id)
+
+        import_keys = set()
+        for imported in structure.get("imports", []):
+            import_keys |= self._import_keys_for(imported)
+        for key in import_keys:
+            self._new_import_keys.append((key, file_path))
+
+        if symbol_ids:
+            self._file_symbols[file_path] = symbol_ids
+        if import_keys:
+            self._file_import_keys[file_path] = sorted(import_keys)
+
+    def _merge_new_keys(self) -> None:
+        # Timsort sorts the new keys as one run and merges it into the sorted array
+        if self._new_name_keys:
+            self._name_keys += self._new_name_keys
+            self._name_keys.sort()
+            self._new_name_keys = []
+        if self._new_import_keys:
+            self._import_keys += self._new_import_keys
+            self._import_keys.sort()
+            self._new_import_keys = []
+
+    def remove_file(self, file_path: str) -> None:
+        if file_path in self._file_symbols or file_path in self._file_import_keys:
+            self._merge_new_keys()
+        for symbol_id in self._file_symbols.pop(file_path, []):
+            symbol = self._symbols.pop(symbol_id)
+            for key in self._symbol_keys(symbol):
+                index = bisect_left(self._name_keys, (key, symbol_id))
+                if index < len(self._name_keys) and self._name_keys[index] == (key, symbol_id):
+                    del self._name_keys[index]
+            for gram in trigrams(symbol.name):
+                ids = self._trigrams.get(gram)
+                if ids is not None:
+                    ids.discard(symbol_id)
+                    if not ids:
+                        del self._trigrams[gram]
+
+        for key in self._file_import_keys.pop(file_path, []):
+            index = bisect_left(self._import_keys, (key, file_path))
+            if index < len(self._import_keys) and self._import_keys[index] == (key, file_path):
+                del self._import_keys[index]
+
+    def _exact(self, key: str) -> List[Symbol]:
+        self._merge_new_keys()
+        index = bisect_left(self._name_keys, (key, -1))
+        results = []
+        while index < len(self._name_keys) and self._name_keys[index][0] == key:
+            results.append(self._symbols[self._name_keys[index][1]])
+            index += 1
+        return results
+
+    def prefix(self, prefix: str, limit: Optional[int] = None) -> List[Symbol]:
+        """Symbols whose name, class-relative or fully qualified name starts with the prefix"""
+        self._merge_new_keys()
+        prefix = prefix.lower()
+        seen = set()
+        results = []
+        index = bisect_left(self._name_keys, (prefix, -1))
+        while index < len(self._name_keys) and self._name_keys[index][0].startswith(prefix):
+            symbol_id = self._name_keys[index][1]
+            if symbol_id not in seen:
+                seen.add(symbol_id)
+                results.append(self._symbols[symbol_id])
+                if limit is not None and len(results) >= limit:
+                    break
+            index += 1
+        return results
+
+    def fuzzy(self, query: str, limit: int = 20, min_similarity: float = 0.5) -> List[Tuple[float, Symbol]]:
+        """
+        Symbols whose name shares enough trigrams with the query, best first.
+
+        Similarity is the fraction of the query's trigrams found in the name, so
+        substrings and small typos both score well; shorter names win ties.
+        """
+        query_grams = trigrams(query)
+        counts: Dict[int, int] = {}
+        for gram in query_grams:
+            for symbol_id in self._trigrams.get(gram, ()):
+                counts[symbol_id] = counts.get(symbol_id, 0) + 1
+
+        scored = []
+        for symbol_id, count in counts.items():
+            similarity = count / len(query_grams)
+            if similarity >= min_similarity:
+                symbol = self._symbols[symbol_id]
+                scored.append((similarity, -len(symbol.name), symbol_id))
+        scored.sort(reverse=True)
+        return [(similarity, self._symbols[symbol_id]) for similarity, _, symbol_id in scored[:limit]]
+
+    def find_definitions(self, name: str) -> List[Symbol]:
+        """Definitions whose short, class-relative or qualified name equals `name`"""
+        return self._exact(name.lower())
+
+    def find_importers(self, target: str) -> List[str]:
+        """
+        Files importing a module or symbol, matched by full dotted path, sub-module or
+        last name; when nothing matches exactly, by imports containing `target`.
+        """
+        self._merge_new_keys()
+        lowered = target.lower().strip('.')
+        files = set()
+        index = bisect_left(self._import_keys, (lowered, ''))
+        while index < len(self._import_keys):
+            key, file_path = self._import_keys[index]
+            if key != lowered and not key.startswith(lowered + '.'):
+                break
+            files.add(file_path)
+            index += 1
+        if not files and lowered:
+            # Partial names such as "request" for `requests` only show up in a scan of the keys
+            files = {file_path for key, file_path in self._import_keys if lowered in key}
+        return sorted(files)
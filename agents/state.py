@@ -1,11 +1,17 @@
 # state.py
 from __future__ import annotations
-from typing import TypedDict, Sequence, Optional, List, Dict, Any
+import operator
+from typing import TypedDict, Optional, List, Dict, Any
 from typing_extensions import Annotated
-from langchain_core.messages import BaseMessage
-from langgraph.graph.message import add_messages
 from enum import Enum
 
+from events import EventLog, append_events
+
+
+def merge_dicts(left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Reducer for dict fields: nodes return only the keys they changed"""
+    return {**(left or {}), **(right or {})}
+
 
 class TaskType(str, Enum):
     CREATE_FILE = "create_file"
@@ -45,19 +51,26 @@ class SearchResult(TypedDict):
     relevance_score: float
 
 
+class ValidationIssue(TypedDict):
+    file_path: str  # relative to the workspace
+    line: int  # 1-based; 0 when the error has no position
+    message: str
+    checker: str  # "python", "json", "yaml", "toml", "html"
+
+
 class PlannerState(TypedDict, total=False):
     # Input
     user_task: str
     workspace_path: str
     
     # Research Phase
-    research_queries: Annotated[Sequence[BaseMessage], add_messages]
-    internal_search_results: Annotated[Sequence[BaseMessage], add_messages]
-    external_search_results: Annotated[Sequence[BaseMessage], add_messages]
-    scraped_content: Annotated[Sequence[BaseMessage], add_messages]
+    research_queries: Annotated[EventLog, append_events]
+    internal_search_results: Annotated[EventLog, append_events]
+    external_search_results: Annotated[EventLog, append_events]
+    scraped_content: Annotated[EventLog, append_events]
     
     # Understanding Phase
-    research_conclusions: Annotated[Sequence[BaseMessage], add_messages]
+    research_conclusions: Annotated[EventLog, append_events]
     is_research_sufficient: bool
     understanding_summary: str
     
@@ -77,32 +90,40 @@ class DeveloperState(TypedDict, total=False):
     # Input from Planner
     atomic_tasks: List[AtomicTask]
     workspace_path: str
+    task_dependencies: Dict[str, List[str]]
     
     # Current Task Processing
     current_task: Optional[AtomicTask]
     current_task_index: int
+    task_order: List[str]  # topological order of task ids
+    current_batch: List[AtomicTask]  # tasks running together in this step
+    settled_tasks: Annotated[List[str], operator.add]  # succeeded or out of retries
     
     # Research for Current Task
-    task_research_queries: Annotated[Sequence[BaseMessage], add_messages]
-    task_internal_search: Annotated[Sequence[BaseMessage], add_messages]
-    task_external_search: Annotated[Sequence[BaseMessage], add_messages]
+    task_research_queries: Annotated[EventLog, append_events]
+    task_internal_search: Annotated[EventLog, append_events]
+    task_external_search: Annotated[EventLog, append_events]
     
     # Implementation
     implementation_plan: str
     code_changes: List[Dict[str, Any]]
-    files_modified: List[str]
-    files_created: List[str]
-    files_deleted: List[str]
+    files_modified: Annotated[List[str], operator.add]
+    files_created: Annotated[List[str], operator.add]
+    files_deleted: Annotated[List[str], operator.add]
     
     # Validation
-    task_completion_status: Dict[str, bool]  # task_id -> completed
-    validation_results: Annotated[Sequence[BaseMessage], add_messages]
-    errors_encountered: List[str]
+    task_completion_status: Annotated[Dict[str, bool], merge_dicts]  # task_id -> completed
+    validation_results: Annotated[EventLog, append_events]
+    errors_encountered: List[str]  # errors of every task's latest attempt, set when development completes
+    task_errors: Annotated[Dict[str, List[str]], merge_dicts]  # task_id -> errors from its latest attempt
+    validation_errors: Dict[str, List[ValidationIssue]]  # task_id -> issues found in its written files
     
     # State Management
     current_phase: str  # "research", "implementation", "validation", "complete"
     retry_count: int
+    retry_counts: Annotated[Dict[str, int], merge_dicts]  # task_id -> retries used
     max_retries: int
+    max_parallel_tasks: int
 
 
 class SearchConfig(TypedDict):
@@ -111,6 +132,22 @@ class SearchConfig(TypedDict):
     max_results_per_query: int
     relevance_threshold: float
     search_timeout: int
+    index_workers: int
+    compact_index: bool
+    index_dir: str
+    lazy_index_max_files: int
+    semantic_enabled: bool
+    embedding_backend: str
+    scrape_workers: int
+    scrape_connections_per_host: int
+    scrape_max_bytes: int
+    http_cache_enabled: bool
+    http_cache_dir: str
+    http_cache_max_mb: int
+    http_cache_ttl: float
+    search_backend: str
+    query_cache_dir: str
+    query_cache_ttl: float
 
 
 class WorkflowConfig(TypedDict):
@@ -121,6 +158,22 @@ class WorkflowConfig(TypedDict):
     search_config: SearchConfig
     logging_level: str
     max_retries: int
+    max_parallel_tasks: int
+    modify_mode: str  # "patch" (edit blocks) or "full" (regenerate the file)
+    context_token_budget: int  # Estimated tokens of file context in each modify prompt
+    stream_writes: bool  # Write generated files to disk while the response streams
+    validation_workers: int  # Processes for local syntax checks of written files (0 disables)
+    llm_max_concurrency: int
+    llm_requests_per_minute: float
+    llm_cache_enabled: bool
+    llm_cache_path: str
+    llm_cache_max_mb: int
+    checkpoints_enabled: bool  # Save workflow state after every step so a session can be resumed
+    checkpoint_path: str
+    event_log_cap: int  # Newest events kept in each event log
+    event_inline_chars: int  # Longer event payloads are moved to the blob store
+    event_blob_dir: str
+    event_blob_max_mb: int  # Least recently used blobs are deleted beyond this size
 
 
 class OverallState(TypedDict):
@@ -139,8 +192,8 @@ class OverallState(TypedDict):
     session_id: str
     
     # Logging and Feedback
-    execution_log: Annotated[Sequence[BaseMessage], add_messages]
-    feedback_messages: Annotated[Sequence[BaseMessage], add_messages]
+    execution_log: Annotated[EventLog, append_events]
+    feedback_messages: Annotated[EventLog, append_events]
     
     # Final Results
     completed_tasks: List[AtomicTask]
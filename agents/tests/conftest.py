@@ -0,0 +1,29 @@
+# tests/conftest.py
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENTS_DIR))
+os.environ.setdefault("GOOGLE_API_KEY", "test-placeholder")
+
+import config as app_config
+from search.clients import reset_clients
+
+
+@pytest.fixture
+def search_config(tmp_path, monkeypatch):
+    """SEARCH_CONFIG with every cache under tmp_path and a fresh client registry"""
+    config = {
+        **app_config.SEARCH_CONFIG,
+        "http_cache_dir": str(tmp_path / "http"),
+        "query_cache_dir": str(tmp_path / "queries"),
+        "index_dir": str(tmp_path / "index"),
+    }
+    monkeypatch.setattr(app_config, "SEARCH_CONFIG", config)
+    reset_clients()
+    yield config
+    reset_clients()
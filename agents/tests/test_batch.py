@@ -0,0 +1,89 @@
+# tests/test_batch.py
+
+import json
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+import batch
+import main
+
+PLAN = json.dumps([{"id": "1", "description": "Create app.py", "type": "create_file",
+                    "target_files": ["app.py"], "prerequisites": []}])
+
+
+class FakeLLM:
+    """Answers the planner with PLAN and every developer request with one line of code"""
+
+    def _answer(self, messages) -> str:
+        return PLAN if "software architect" in messages[0].content else "VALUE = 1\n"
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        return AIMessage(content=self._answer(messages))
+
+    async def astream(self, messages, config=None, **kwargs):
+        yield AIMessageChunk(content=self._answer(messages))
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    path = tmp_path / "manifest.jsonl"
+    path.write_text(json.dumps({"id": "ticket", "task": "Build an app", "workspace": str(tmp_path / "workspace"),
+                                "config": {"llm_cache_enabled": False, "validation_workers": 0}}) + "\n")
+    return path
+
+
+@pytest.fixture
+def finalize_failures(monkeypatch):
+    """Make the next N sessions raise in their last step, after everything else was checkpointed"""
+    failures = {"left": 0}
+    finalize = main.MainOrchestrator.finalize_session
+
+    def flaky_finalize(self, state):
+        if failures["left"]:
+            failures["left"] -= 1
+            raise RuntimeError("finalize failed")
+        return finalize(self, state)
+
+    monkeypatch.setattr(main.MainOrchestrator, "finalize_session", flaky_finalize)
+    return failures
+
+
+def run_batch(manifest, output, retry_failed):
+    done, failed_sessions = batch.finished_ids(output, retry_failed)
+    pending = [entry for entry in batch.read_manifest(manifest) if entry["id"] not in done]
+    runner = batch.BatchRunner(output, 1, {"checkpoint_path": str(output.parent / "checkpoints.sqlite")}, llm=FakeLLM())
+    asyncio.run(runner.run(pending, failed_sessions))
+    return [json.loads(line) for line in output.read_text().splitlines()]
+
+
+def test_retry_resumes_the_failed_session_from_its_checkpoint(manifest, tmp_path, finalize_failures, capsys):
+    output = tmp_path / "results.jsonl"
+    finalize_failures["left"] = 1
+
+    first = run_batch(manifest, output, retry_failed=True)
+    second = run_batch(manifest, output, retry_failed=True)
+
+    assert [r["success"] for r in second] == [False, True]
+    assert second[1]["session_id"] == first[0]["session_id"]
+    assert f"Resuming session {first[0]['session_id']} at finalize" in capsys.readouterr().out
+
+
+def test_a_retry_that_fails_again_prunes_the_session(manifest, tmp_path, finalize_failures):
+    output = tmp_path / "results.jsonl"
+    finalize_failures["left"] = 2
+
+    run_batch(manifest, output, retry_failed=True)
+    failed_twice = run_batch(manifest, output, retry_failed=True)
+    results = run_batch(manifest, output, retry_failed=True)
+
+    assert [r["success"] for r in results] == [False, False, True]
+    assert failed_twice[0]["session_id"] == failed_twice[1]["session_id"] != results[2]["session_id"]
+
+
+def test_rate_limiter_follows_the_batch_overrides(tmp_path):
+    runner = batch.BatchRunner(tmp_path / "results.jsonl", 1, {"llm_max_concurrency": 3, "llm_requests_per_minute": 12})
+
+    assert runner.rate_limiter.max_concurrent == 3
+    assert runner.rate_limiter.interval == 5.0
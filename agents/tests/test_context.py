@@ -0,0 +1,34 @@
+# tests/test_context.py
+
+from developer.context import build_modify_context
+from search.internal_search import InternalSearchEngine
+
+MODULE = "from helpers import scale_value\n\n\ndef target(value):\n    return scale_value(value, 2)\n"
+HELPER = "def scale_value(value, factor):\n    return value * factor\n"
+
+
+def workspace_with_helper(tmp_path):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    (workspace / "module.py").write_text(MODULE, encoding="utf-8")
+    (workspace / "helpers.py").write_text(HELPER, encoding="utf-8")
+    return workspace
+
+
+def test_first_modify_request_builds_the_index_for_related_definitions(tmp_path, search_config):
+    engine = InternalSearchEngine(str(workspace_with_helper(tmp_path)), search_config)
+
+    _, related, _ = build_modify_context(engine, "module.py", MODULE, "Triple the value", 1000)
+
+    assert engine.is_indexed
+    assert related == "# helpers.py:1\n" + HELPER.rstrip("\n")
+
+
+def test_workspaces_over_the_bound_are_not_indexed_by_a_modify_request(tmp_path, search_config):
+    search_config["lazy_index_max_files"] = 1
+    engine = InternalSearchEngine(str(workspace_with_helper(tmp_path)), search_config)
+
+    _, related, _ = build_modify_context(engine, "module.py", MODULE, "Triple the value", 1000)
+
+    assert not engine.is_indexed
+    assert related == ""
@@ -0,0 +1,55 @@
+# tests/test_events.py
+
+import os
+
+from events import Event, EventLog, EventKind, EventRecorder, BlobStore, append_events
+from main import CHECKPOINT_SERDE
+
+
+def test_event_log_keeps_the_newest_events_and_counts_the_rest():
+    log = EventLog(cap=3)
+    for number in range(5):
+        log = append_events(log, [Event(EventKind.FEEDBACK, "developer", str(number))])
+
+    assert [event.subject for event in log] == ["2", "3", "4"]
+    assert log.dropped == 2
+    assert append_events(log, EventLog(cap=3)).dropped == 0
+
+
+def test_appending_leaves_the_earlier_log_unchanged():
+    log = EventLog(cap=1, events=[Event(EventKind.FEEDBACK, "developer", "old")])
+
+    newer = log.appended([Event(EventKind.FEEDBACK, "developer", "new")])
+
+    assert [event.subject for event in log] == ["old"] and log.dropped == 0
+    assert [event.subject for event in newer] == ["new"] and newer.dropped == 1
+
+
+def test_event_logs_survive_the_checkpoint_serializer(tmp_path):
+    recorder = EventRecorder(BlobStore(tmp_path), inline_chars=10)
+    log = EventLog(cap=2).appended([
+        Event(EventKind.SESSION_STARTED, "initialize", "session"),
+        recorder.record(EventKind.TASK_FAILED, "developer", "1", "SyntaxError " * 20),
+        recorder.record(EventKind.TASK_SUCCEEDED, "developer", "2", "done"),
+    ])
+
+    restored = CHECKPOINT_SERDE.loads_typed(CHECKPOINT_SERDE.dumps_typed({"execution_log": log}))["execution_log"]
+
+    assert isinstance(restored, EventLog)
+    assert (restored.cap, restored.dropped) == (2, 1)
+    assert [(e.kind, e.source, e.subject, e.text, e.blob, e.timestamp) for e in restored] == \
+        [(e.kind, e.source, e.subject, e.text, e.blob, e.timestamp) for e in log]
+    assert restored.events[0].payload(recorder.blobs) == "SyntaxError " * 20
+
+
+def test_blob_store_evicts_least_recently_used_blobs_beyond_its_cap(tmp_path):
+    store = BlobStore(tmp_path, max_bytes=3500)
+    digests = [store.put(letter * 1000) for letter in "abc"]
+    for age, digest in enumerate(digests):
+        os.utime(store._path(digest), (1000 + age, 1000 + age))
+    assert store.get(digests[0]) == "a" * 1000  # Reading makes "a" the most recently used
+
+    newest = store.put("d" * 1000)
+
+    assert store.get(digests[1]) is None
+    assert [store.get(digest) for digest in (digests[0], digests[2], newest)] == ["a" * 1000, "c" * 1000, "d" * 1000]
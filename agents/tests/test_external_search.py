@@ -0,0 +1,121 @@
+# tests/test_external_search.py
+
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from search import external_search
+
+PAGE = b"<html><body><p>Cached page body</p></body></html>"
+ETAG = '"v1"'
+LAST_MODIFIED = "Wed, 21 Oct 2015 07:28:00 GMT"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the pages a scrape fetches; records each request's conditional headers"""
+    requests = []
+
+    def do_GET(self):
+        type(self).requests.append((self.path, dict(self.headers)))
+        if self.path == "/slow":
+            time.sleep(3)
+        if self.path == "/trickle":
+            # Headers at once, then the body dribbles in: each read is quick, the whole body is not
+            self._send_headers(200, {"Content-Type": "text/plain"})
+            try:
+                for _ in range(30):
+                    self.wfile.write(b"x" * 64)
+                    self.wfile.flush()
+                    time.sleep(0.1)
+            except OSError:
+                pass
+            return
+
+        validators = {"/etag": ("If-None-Match", ETAG), "/last-modified": ("If-Modified-Since", LAST_MODIFIED)}
+        if self.path in validators:
+            header, value = validators[self.path]
+            if self.headers.get(header) == value:
+                self._send_headers(304, {})
+                return
+            name = "ETag" if header == "If-None-Match" else "Last-Modified"
+            self._send_headers(200, {"Content-Type": "text/html", name: value, "Content-Length": str(len(PAGE))})
+        else:
+            self._send_headers(200, {"Content-Type": "text/html", "Content-Length": str(len(PAGE))})
+        self.wfile.write(PAGE)
+
+    def _send_headers(self, status, headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    StandInHandler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.mark.parametrize("path, header, value", [
+    ("/etag", "If-None-Match", ETAG),
+    ("/last-modified", "If-Modified-Since", LAST_MODIFIED),
+])
+def test_stale_entry_is_revalidated_with_a_304(server, search_config, path, header, value):
+    search_config["http_cache_ttl"] = 0  # Every cached entry needs revalidation
+    url = server + path
+
+    first = external_search._scrape_url(url, time.monotonic() + 5)
+    second = external_search._scrape_url(url, time.monotonic() + 5)
+
+    assert "Cached page body" in first["content"]
+    assert second == {"url": url, "content": first["content"]}
+    (_, first_headers), (_, second_headers) = StandInHandler.requests
+    assert header not in first_headers
+    assert second_headers[header] == value
+
+
+def test_fresh_entry_is_served_without_a_request(server, search_config):
+    search_config["http_cache_ttl"] = 60
+    url = server + "/etag"
+
+    external_search._scrape_url(url, time.monotonic() + 5)
+    result = external_search._scrape_url(url, time.monotonic() + 5)
+
+    assert "Cached page body" in result["content"]
+    assert len(StandInHandler.requests) == 1
+
+
+def test_scrape_content_returns_by_the_deadline(server, search_config):
+    search_config["search_timeout"] = 1
+    search_config["http_cache_enabled"] = False
+
+    start = time.monotonic()
+    results = json.loads(external_search.scrape_content.func([server + "/slow", server + "/page"]))
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 2
+    assert "timed out" in results[0]["error"]
+    assert "Cached page body" in results[1]["content"]
+
+
+def test_body_read_stops_at_the_deadline(server, search_config):
+    search_config["http_cache_enabled"] = False
+
+    start = time.monotonic()
+    result = external_search._scrape_url(server + "/trickle", time.monotonic() + 0.5)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 1.5
+    assert 0 < len(result["content"]) < 30 * 64
@@ -0,0 +1,52 @@
+# tests/test_incremental_index.py
+
+import json
+
+from langchain_core.messages import AIMessage
+
+from developer.developer import DeveloperAgent
+from search.internal_search import InternalSearchEngine, get_search_engine, internal_search
+
+CREATED = "def reticulate_splines(count):\n    return [spline for spline in range(count)]\n"
+
+
+class ScriptedLLM:
+    """Returns the given responses in order"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+
+    def invoke(self, messages, config=None, **kwargs):
+        return AIMessage(content=self.responses.pop(0))
+
+
+def search(workspace, query):
+    return json.loads(internal_search.invoke({"query": query, "workspace_path": str(workspace)}))
+
+
+def test_developer_writes_are_searchable_without_a_rebuild(tmp_path, search_config, monkeypatch):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    (workspace / "existing.py").write_text("def untouched():\n    return None\n", encoding="utf-8")
+    assert search(workspace, "reticulate")["results_count"] == 0
+    engine = get_search_engine(str(workspace))
+    assert engine.is_indexed
+
+    developer = DeveloperAgent(ScriptedLLM(CREATED))
+    task = {"id": "1", "description": "Add a spline helper", "type": "create_file", "target_files": ["splines.py"]}
+    files_created, errors = [], []
+    assert developer._create_file(task, workspace, files_created, errors)
+
+    # The write itself patched the index; the search may only run the stat walk
+    assert "splines.py" in engine.file_index
+    ingested = []
+    original_ingest = engine._ingest_files
+    monkeypatch.setattr(engine, "_ingest_files", lambda pending: ingested.extend(pending) or original_ingest(pending))
+    monkeypatch.setattr(InternalSearchEngine, "_index_workspace",
+                        lambda self, use_cache: (_ for _ in ()).throw(AssertionError("full rebuild")))
+
+    response = search(workspace, "reticulate")
+
+    assert [result["file_path"] for result in response["results"]] == ["splines.py"]
+    assert response["total_files_indexed"] == 2
+    assert ingested == []
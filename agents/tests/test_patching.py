@@ -0,0 +1,94 @@
+# tests/test_patching.py
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from developer.developer import DeveloperAgent
+from developer.patching import apply_patch, PatchError
+
+SOURCE = """def greet(name):
+    return f"Hello {name}"
+
+
+class Greeter:
+    def greet(self, name):
+        return f"Hello {name}"
+"""
+
+
+def search_replace(old: str, new: str) -> str:
+    return f"<<<<<<< SEARCH\n{old}\n=======\n{new}\n>>>>>>> REPLACE"
+
+
+def test_exact_match_is_replaced():
+    response = search_replace('def greet(name):\n    return f"Hello {name}"', 'def greet(name):\n    return f"Hi {name}"')
+
+    patched = apply_patch(SOURCE, response)
+
+    assert patched.startswith('def greet(name):\n    return f"Hi {name}"\n')
+    assert patched.endswith('    def greet(self, name):\n        return f"Hello {name}"\n')
+
+
+def test_uniformly_indented_match_keeps_the_file_indentation():
+    response = search_replace('def greet(self, name):\n    return f"Hello {name}"', 'def greet(self, name):\n    return f"Hey {name}"')
+
+    patched = apply_patch(SOURCE, response)
+
+    assert '        return f"Hey {name}"' in patched
+    assert patched.startswith('def greet(name):\n    return f"Hello {name}"\n')
+
+
+def test_ambiguous_match_is_refused():
+    with pytest.raises(PatchError, match="occur 2 times"):
+        apply_patch(SOURCE, search_replace('return f"Hello {name}"', 'return f"Hi {name}"'))
+
+
+def test_unified_diff_line_number_picks_one_of_several_matches():
+    diff = '@@ -7,1 +7,1 @@\n-        return f"Hello {name}"\n+        return f"Hi {name}"'
+
+    patched = apply_patch(SOURCE, diff)
+
+    assert patched.splitlines()[1] == '    return f"Hello {name}"'
+    assert patched.splitlines()[6] == '        return f"Hi {name}"'
+
+
+def test_missing_anchor_is_refused():
+    with pytest.raises(PatchError, match="could not find"):
+        apply_patch(SOURCE, search_replace("def farewell(name):", "def farewell(name, polite=True):"))
+
+
+def test_non_uniform_indentation_is_not_a_match():
+    with pytest.raises(PatchError, match="could not find"):
+        apply_patch(SOURCE, search_replace('class Greeter:\ndef greet(self, name):', 'class Greeter:\n    pass'))
+
+
+def test_response_without_edits_is_refused():
+    with pytest.raises(PatchError, match="neither"):
+        apply_patch(SOURCE, "Sure, here is the updated function.")
+
+
+class ScriptedLLM:
+    """Returns the given responses in order and records the prompts it was sent"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def invoke(self, messages, config=None, **kwargs):
+        self.prompts.append(messages[0].content)
+        return AIMessage(content=self.responses.pop(0))
+
+
+def test_unplaceable_patch_falls_back_to_a_full_rewrite(tmp_path, search_config):
+    (tmp_path / "greet.py").write_text(SOURCE, encoding="utf-8")
+    rewritten = 'def greet(name):\n    return f"Hi {name}"\n'
+    llm = ScriptedLLM(search_replace('return f"Hello {name}"', 'return f"Hi {name}"'), rewritten)
+    developer = DeveloperAgent(llm, modify_mode="patch")
+    task = {"id": "1", "description": "Say hi instead of hello", "type": "modify_file", "target_files": ["greet.py"]}
+    files_modified, errors = [], []
+
+    assert developer._modify_file(task, tmp_path, files_modified, errors)
+
+    assert (tmp_path / "greet.py").read_text(encoding="utf-8") == rewritten
+    assert "SEARCH/REPLACE" in llm.prompts[0] and "SEARCH/REPLACE" not in llm.prompts[1]
+    assert files_modified == [str(tmp_path / "greet.py")] and errors == []
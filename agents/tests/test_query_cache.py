@@ -0,0 +1,127 @@
+# tests/test_query_cache.py
+
+import json
+import time
+import asyncio
+import threading
+
+import pytest
+
+from search import external_search
+from search.external_search import MockSearchBackend
+from search.query_cache import QueryCache
+
+
+def test_external_search_reuses_cached_results(search_config):
+    search_config.update({"search_backend": "mock", "query_cache_ttl": 60})
+
+    first = json.loads(external_search.external_search.func("Python  asyncio", 3))
+    second = json.loads(external_search.external_search.func("python asyncio", 3))
+
+    assert second == first
+    assert len(first["results"]) == 3
+    assert external_search.get_search_backend(3).calls == 1
+
+
+def test_results_survive_a_new_cache_instance(tmp_path):
+    backend = MockSearchBackend()
+    QueryCache(tmp_path, ttl=60).get_or_fetch("pandas merge", 5, lambda: backend.invoke("pandas merge"))
+
+    results = QueryCache(tmp_path, ttl=60).get_or_fetch("pandas merge", 5, lambda: backend.invoke("pandas merge"))
+
+    assert results["query"] == "pandas merge"
+    assert backend.calls == 1
+
+
+def test_expired_results_are_fetched_again(tmp_path):
+    backend = MockSearchBackend()
+    cache = QueryCache(tmp_path, ttl=0.05)
+    cache.get_or_fetch("numpy", 5, lambda: backend.invoke("numpy"))
+    time.sleep(0.1)
+
+    cache.get_or_fetch("numpy", 5, lambda: backend.invoke("numpy"))
+
+    assert backend.calls == 2
+
+
+def test_concurrent_callers_share_one_upstream_call(tmp_path):
+    backend = MockSearchBackend(latency=0.2)
+    cache = QueryCache(tmp_path, ttl=60)
+
+    async def run():
+        threaded = [asyncio.to_thread(cache.get_or_fetch, "flask routing", 5, lambda: backend.invoke("flask routing"))
+                    for _ in range(4)]
+        awaited = [cache.aget_or_fetch("Flask Routing", 5, lambda: backend.ainvoke("flask routing")) for _ in range(4)]
+        return await asyncio.gather(*threaded, *awaited)
+
+    results = asyncio.run(run())
+
+    assert backend.calls == 1
+    assert all(result == results[0] for result in results)
+
+
+def test_failures_reach_waiters_and_are_not_cached(tmp_path):
+    cache = QueryCache(tmp_path, ttl=60)
+    release = threading.Event()
+
+    def failing_fetch():
+        release.wait(2)
+        raise RuntimeError("backend down")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_fetch("django", 5, failing_fetch)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+
+    assert errors == ["backend down"] * 3
+    assert cache.get_or_fetch("django", 5, lambda: {"results": []}) == {"results": []}
+
+
+def test_cancelled_leader_does_not_strand_threaded_waiters(tmp_path, monkeypatch):
+    cache = QueryCache(tmp_path, ttl=60)
+    persisting = threading.Event()
+
+    def slow_persist(*args):
+        persisting.set()
+        time.sleep(0.5)
+
+    monkeypatch.setattr(cache, "_persist", slow_persist)
+    waiter_results = []
+
+    async def run():
+        fetched = asyncio.Event()
+
+        async def afetch():
+            await fetched.wait()
+            return {"results": ["page"]}
+
+        leader = asyncio.create_task(cache.aget_or_fetch("react hooks", 5, afetch))
+        await asyncio.sleep(0.05)
+        waiter = threading.Thread(target=lambda: waiter_results.append(
+            cache.get_or_fetch("react hooks", 5, lambda: pytest.fail("waiter fetched instead of sharing"))
+        ))
+        waiter.start()
+        await asyncio.sleep(0.05)
+        fetched.set()
+        await asyncio.to_thread(persisting.wait, 2)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        await asyncio.to_thread(waiter.join, 2)
+        return waiter.is_alive()
+
+    still_waiting = asyncio.run(run())
+
+    assert not still_waiting
+    assert waiter_results == [{"results": ["page"]}]
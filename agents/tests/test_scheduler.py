@@ -0,0 +1,76 @@
+# tests/test_scheduler.py
+
+from developer.developer import DeveloperAgent
+from developer.scheduler import (
+    unique_task_ids, build_dependencies, topological_order, blocked_by_failures, next_batch
+)
+
+
+def task(task_id, prerequisites=(), target_files=None):
+    return {"id": task_id, "description": f"Task {task_id}", "type": "create_file",
+            "target_files": target_files or [f"{task_id}.py"], "prerequisites": list(prerequisites)}
+
+
+def test_cycles_are_broken_on_a_copy():
+    tasks = [task("a", ["b"]), task("b", ["a"]), task("c", ["a"])]
+    dependencies = build_dependencies(tasks)
+
+    order, acyclic = topological_order(tasks, dependencies)
+
+    assert order == ["a", "b", "c"]
+    assert acyclic == {"a": set(), "b": {"a"}, "c": {"a"}}
+    assert dependencies == {"a": {"b"}, "b": {"a"}, "c": {"a"}}
+
+
+def test_every_task_in_a_cycle_gets_scheduled():
+    tasks = [task("a", ["b"]), task("b", ["a"])]
+    order, dependencies = topological_order(tasks, build_dependencies(tasks))
+    tasks_by_id = {t["id"]: t for t in tasks}
+
+    settled = set()
+    batches = []
+    while batch := next_batch(order, tasks_by_id, dependencies, settled, max_parallel=4):
+        batches.append([t["id"] for t in batch])
+        settled.update(batches[-1])
+
+    assert batches == [["a"], ["b"]]
+
+
+def test_duplicate_ids_are_renamed_and_prerequisites_keep_the_first():
+    tasks = unique_task_ids([task("1"), task("1"), task("1-2"), task("2", ["1"])])
+
+    assert [t["id"] for t in tasks] == ["1", "1-3", "1-2", "2"]
+    assert build_dependencies(tasks)["2"] == {"1"}
+
+
+def test_dependents_of_a_failed_task_are_blocked_transitively():
+    tasks = [task("a"), task("b", ["a"]), task("c", ["b"]), task("d")]
+    order, dependencies = topological_order(tasks, build_dependencies(tasks))
+
+    blocked = blocked_by_failures(order, dependencies, settled={"a"}, failed={"a"})
+
+    assert blocked == {"b": ["a"], "c": ["b"]}
+
+
+def test_batches_keep_writes_to_one_file_in_plan_order():
+    tasks = [task("a", target_files=["app.py"]), task("b", target_files=["app.py"]), task("c")]
+    order, dependencies = topological_order(tasks, build_dependencies(tasks))
+
+    batch = next_batch(order, {t["id"]: t for t in tasks}, dependencies, settled=set(), max_parallel=4)
+
+    assert [t["id"] for t in batch] == ["a", "c"]
+
+
+def test_developer_skips_tasks_whose_prerequisite_failed():
+    developer = DeveloperAgent(llm=None)
+    state = {"atomic_tasks": [task("a"), task("b", ["a"]), task("c")], "max_parallel_tasks": 1}
+    state.update(developer.initialize_development(state))
+    assert [t["id"] for t in state["current_batch"]] == ["a"]
+
+    state.update({"settled_tasks": ["a"], "task_completion_status": {"a": False}, "task_errors": {"a": ["syntax error"]}})
+    update = developer.move_to_next_task(state)
+
+    assert [t["id"] for t in update["current_batch"]] == ["c"]
+    assert update["settled_tasks"] == ["b"]
+    assert update["task_completion_status"] == {"b": False}
+    assert update["task_errors"] == {"b": ["Skipped: prerequisite task(s) a failed"]}
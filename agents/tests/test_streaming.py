@@ -0,0 +1,66 @@
+# tests/test_streaming.py
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from developer.developer import DeveloperAgent
+from developer.streaming import FenceStripper, strip_fence
+
+CODE = "def area(width, height):\n    return width * height"
+FENCED = f"```python\n{CODE}\n```\n"
+
+
+def feed_in_chunks(text, size):
+    stripper = FenceStripper()
+    out = [stripper.feed(text[start:start + size]) for start in range(0, len(text), size)]
+    return "".join(out) + stripper.finish()
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 4, 5, 7, 11, len(FENCED)])
+def test_fences_split_across_chunks_are_removed(size):
+    assert feed_in_chunks(FENCED, size) == CODE
+
+
+@pytest.mark.parametrize("split", [1, 2, 3, 4])
+def test_chunks_split_inside_the_fences(split):
+    stripper = FenceStripper()
+    opening, closing = FENCED[:split], FENCED[split:-3]
+
+    assert stripper.feed(opening) == ""
+    body = stripper.feed(closing) + stripper.feed("``") + stripper.feed("`\n")
+
+    assert body + stripper.finish() == CODE
+
+
+@pytest.mark.parametrize("text", [
+    CODE + "\n",
+    "`inline` code comes first\n" + CODE,
+    "  \n" + CODE + "\n```",
+])
+def test_unfenced_responses_pass_through(text):
+    assert feed_in_chunks(text, 2) == text
+    assert strip_fence(text) == text
+
+
+def test_an_unclosed_fence_keeps_the_body():
+    assert feed_in_chunks(f"```\n{CODE}\n", 3) == CODE + "\n"
+
+
+class ScriptedLLM:
+    """Returns the given responses in order"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+
+    def invoke(self, messages, config=None, **kwargs):
+        return AIMessage(content=self.responses.pop(0))
+
+
+def test_whole_file_rewrites_strip_fences_like_streamed_ones(tmp_path, search_config):
+    (tmp_path / "shapes.py").write_text("def area(width, height):\n    pass\n", encoding="utf-8")
+    developer = DeveloperAgent(ScriptedLLM(FENCED), modify_mode="full", stream_writes=False)
+    task = {"id": "1", "description": "Implement area", "type": "modify_file", "target_files": ["shapes.py"]}
+
+    assert developer._modify_file(task, tmp_path, [], [])
+
+    assert (tmp_path / "shapes.py").read_text(encoding="utf-8") == CODE
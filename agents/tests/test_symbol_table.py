@@ -0,0 +1,36 @@
+# tests/test_symbol_table.py
+
+import pytest
+
+from search.symbol_table import SymbolTable
+
+
+@pytest.fixture
+def table():
+    table = SymbolTable()
+    table.add_file("client.py", {"imports": ["requests", "os.path"]})
+    table.add_file("adapters.py", {"imports": ["requests.adapters.HTTPAdapter"]})
+    table.add_file("config.py", {"imports": ["json"]})
+    return table
+
+
+@pytest.mark.parametrize("target, importers", [
+    ("requests", ["adapters.py", "client.py"]),
+    ("requests.adapters", ["adapters.py"]),
+    ("HTTPAdapter", ["adapters.py"]),
+    ("os", ["client.py"]),
+])
+def test_importers_by_dotted_path_or_last_name(table, target, importers):
+    assert table.find_importers(target) == importers
+
+
+def test_partial_names_fall_back_to_a_substring_match(table):
+    assert table.find_importers("request") == ["adapters.py", "client.py"]
+    assert table.find_importers("jso") == ["config.py"]
+    assert table.find_importers("missing") == []
+
+
+def test_exact_matches_do_not_pull_in_substring_matches(table):
+    table.add_file("paths.py", {"imports": ["pathlib"]})
+
+    assert table.find_importers("path") == ["client.py"]
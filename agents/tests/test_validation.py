@@ -0,0 +1,42 @@
+# tests/test_validation.py
+
+import os
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from developer.validation import validate_files, avalidate_files, _validation_pool
+
+
+@pytest.fixture
+def broken_pool(search_config):
+    """A registered validation pool whose worker has died"""
+    pool = _validation_pool(1)
+    with pytest.raises(BrokenProcessPool):
+        pool.submit(os._exit, 1).result()
+    return pool
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    (tmp_path / "ok.py").write_text("VALUE = 1\n", encoding="utf-8")
+    (tmp_path / "bad.json").write_text('{"key": }\n', encoding="utf-8")
+    return tmp_path
+
+
+def test_a_broken_pool_is_replaced(broken_pool, workspace, capsys):
+    issues = validate_files(workspace, ["ok.py", "bad.json"], workers=1)
+
+    assert [(issue["file_path"], issue["checker"]) for issue in issues] == [("bad.json", "json")]
+    rebuilt = _validation_pool(1)
+    assert rebuilt is not broken_pool and rebuilt._processes
+    assert "starting a new one" in capsys.readouterr().out
+
+
+def test_a_broken_pool_is_replaced_for_coroutines(broken_pool, workspace):
+    issues = asyncio.run(avalidate_files(workspace, ["ok.py", "bad.json"], workers=1))
+
+    assert [(issue["file_path"], issue["line"]) for issue in issues] == [("bad.json", 1)]
+    rebuilt = _validation_pool(1)
+    assert rebuilt is not broken_pool and rebuilt._processes